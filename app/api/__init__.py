@@ -1,14 +1,22 @@
 """FastAPI application factory"""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
-from app.api import vets, recommendations
+from fastapi.responses import ORJSONResponse
+from app.database import engine, init_db
+from app.compression import CompressionMiddleware
+from app.metrics import MetricsMiddleware, instrument_engine, router as metrics_router
+from app import profiling
+from app.events import lifespan
+from app.ml.snapshot import vet_snapshot
+from app.api import vets, recommendations, autocomplete
 
 def create_app():
     app = FastAPI(
         title="Sofia Vet Platform API",
         description="Complete API for veterinary clinic management",
-        version="2.0.0"
+        version="2.0.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
     
     app.add_middleware(
@@ -17,11 +25,20 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", "ETag"],
     )
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    profiling.install(app)
+    instrument_engine(engine)
     
     init_db()
+    vet_snapshot.open_latest()
     
     app.include_router(vets.router, prefix="/vets", tags=["vets"])
     app.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
+    app.include_router(autocomplete.router, prefix="/autocomplete", tags=["autocomplete"])
+    app.include_router(metrics_router)
+    app.include_router(profiling.router, prefix="/admin", tags=["admin"])
     
     return app
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Autocomplete API endpoint"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.autocomplete import AutocompleteIndex, KINDS
+from app.database import get_db
+from app.i18n import DEFAULT_LANGUAGE
+from app.models import Vet, Service
+from app.schemas import AutocompleteResponse
+
+router = APIRouter()
+
+# Shared by all requests of this process; vets.py keeps it in step with writes
+vet_autocomplete = AutocompleteIndex()
+
+def load_vets(index: AutocompleteIndex, db: Session):
+    """Fill the index with vet names and the conditions and equipment of their services"""
+    sources = [
+        ('clinic', Vet.name),
+        ('service', Service.condition),
+        ('equipment', Service.equipment),
+    ]
+    for kind, column in sources:
+        for value, count in db.query(column, func.count()).filter(column.isnot(None)).group_by(column):
+            index.load_term(kind, value, count)
+
+@router.get("", response_model=AutocompleteResponse)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Partly typed text"),
+    kind: Optional[str] = Query(None, description="Comma-separated kinds: clinic, service, equipment"),
+    lang: str = Query(DEFAULT_LANGUAGE, description="Language of the suggestion texts"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Suggest vet names, service conditions and equipment, tolerating typos"""
+    kinds = None
+    if kind:
+        kinds = [k.strip() for k in kind.split(',') if k.strip()]
+        unknown = [k for k in kinds if k not in KINDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(unknown)}")
+
+    vet_autocomplete.ensure_loaded(load_vets, db)
+    return {
+        'query': q,
+        'suggestions': vet_autocomplete.suggest(q, kinds=kinds, lang=lang, limit=limit)
+    }
@@ -1,15 +1,56 @@
 """Recommendation API endpoints"""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
+from datetime import datetime
+from itertools import islice
+import uuid
 
-from app.database import get_db
+import orjson
+
+from app.database import SessionLocal, get_db
 from app.models import Vet, Review
 from app.ml.recommender import VetRecommendationEngine
+from app.ml.hours import LOCAL_TIMEZONE, minute_of_week, working_hours_index
+from app.ml.routing import MAX_TRAVEL_MINUTES, get_travel_times
+from app.ml.tiles import MAX_RADIUS_KM, distance_tiles
+from app.geo.projection import project, vet_xy
+from app.http_cache import conditional_get, get_data_version
+from app.api.vets import MAX_POLYGON_LENGTH, polygon_vet_ids, require_district
+from app.events import event_log
+from app.schemas import (
+    FeedbackCreate, RecommendationsResponse, SimilarVetsResponse, PopularVetsResponse, NearbyVetsResponse
+)
 
 router = APIRouter()
 
-@router.post("")
+# Vets read per query while streaming; the first batch is small so that the first lines go out early
+STREAM_FIRST_BATCH = 8
+STREAM_BATCH = 64
+
+def nearby_vet(vet, distance: float) -> dict:
+    """One /nearby result from a Vet or a row with the same columns"""
+    return {
+        'vet_id': vet.id,
+        'name': vet.name,
+        'distance_km': round(distance, 2),
+        'rating': vet.rating,
+        'phone': vet.phone,
+        'address': vet.address,
+        'price_range': vet.price_range,
+        'location': {'lat': vet.location_lat, 'lon': vet.location_lon}
+    }
+
+def resolve_open_minute(open_now: bool, open_at: Optional[datetime]) -> Optional[int]:
+    """Minute of the week to filter open vets by, or None for no filter"""
+    if open_at is not None:
+        return minute_of_week(open_at)
+    if open_now:
+        return minute_of_week(datetime.now(LOCAL_TIMEZONE))
+    return None
+
+@router.post("", response_model=RecommendationsResponse, response_model_exclude_unset=True)
 async def get_vet_recommendations(
     user_lat: float = Query(..., description="User latitude"),
     user_lon: float = Query(..., description="User longitude"),
@@ -25,10 +66,26 @@ async def get_vet_recommendations(
     needs_emergency: bool = False,
     max_distance_km: float = 50,
     top_n: int = 5,
+    open_now: bool = False,
+    open_at: Optional[datetime] = Query(None, description="Only vets open at this time (Sofia local time if no offset)"),
+    max_travel_minutes: Optional[float] = Query(
+        None, gt=0, le=MAX_TRAVEL_MINUTES, description="Score by road travel time, up to this many minutes"
+    ),
+    district: Optional[str] = Query(None, description="Only vets in this district (see /vets/districts)"),
+    polygon: Optional[str] = Query(
+        None, max_length=MAX_POLYGON_LENGTH, description="Only vets inside this WKT or GeoJSON polygon (lon/lat)"
+    ),
     db: Session = Depends(get_db)
 ):
     """Get personalized vet recommendations"""
     
+    if max_travel_minutes is not None and get_travel_times() is None:
+        raise HTTPException(status_code=503, detail="Travel-time scoring is not configured (set VET_OSM_FILE)")
+    
+    if district:
+        require_district(db, district)
+    vet_ids = polygon_vet_ids(db, polygon) if polygon else None
+    
     required_services = []
     
     if conditions:
@@ -59,12 +116,32 @@ async def get_vet_recommendations(
         preferred_price=preferred_price,
         needs_emergency=needs_emergency,
         max_distance_km=max_distance_km,
-        top_n=top_n
+        top_n=top_n,
+        open_at_minute=resolve_open_minute(open_now, open_at),
+        max_travel_minutes=max_travel_minutes,
+        district=district or None,
+        vet_ids=vet_ids
     )
     
+    if polygon and 'filters' in recommendations:
+        recommendations['filters']['polygon'] = polygon
+    
+    if recommendations['recommendations']:
+        recommendations['request_id'] = uuid.uuid4().hex
+        event_log.record_impressions(
+            recommendations['request_id'], recommendations['recommendations'], recommendations['ranking'],
+            recommender.review_counts([r['vet_id'] for r in recommendations['recommendations']])
+        )
+    
     return recommendations
 
-@router.get("/{vet_id}/similar")
+@router.post("/feedback", status_code=status.HTTP_202_ACCEPTED)
+async def record_feedback(feedback: FeedbackCreate):
+    """Record that a user opened or contacted a vet from a recommendations response (request_id)"""
+    event_log.record(feedback.action, feedback.request_id, feedback.vet_id)
+    return {"accepted": True}
+
+@router.get("/{vet_id}/similar", response_model=SimilarVetsResponse, response_model_exclude_unset=True)
 async def get_similar_vets(
     vet_id: int,
     top_n: int = 3,
@@ -77,7 +154,7 @@ async def get_similar_vets(
     
     return similar_vets
 
-@router.get("/popular")
+@router.get("/popular", response_model=PopularVetsResponse, dependencies=[Depends(conditional_get)])
 async def get_popular_vets(
     top_n: int = 5,
     db: Session = Depends(get_db)
@@ -107,38 +184,37 @@ async def get_popular_vets(
     
     return {'top_popular_vets': popular_vets[:top_n]}
 
-@router.get("/nearby")
+@router.get("/nearby", response_model=NearbyVetsResponse, dependencies=[Depends(conditional_get)])
 async def get_nearby_vets(
     user_lat: float,
     user_lon: float,
     radius_km: float = 10,
+    open_now: bool = False,
+    open_at: Optional[datetime] = Query(None, description="Only vets open at this time (Sofia local time if no offset)"),
     db: Session = Depends(get_db)
 ):
     """Get all vets within a specific radius"""
     
     recommender = VetRecommendationEngine(db)
     user_location = {'lat': user_lat, 'lon': user_lon}
+    open_minute = resolve_open_minute(open_now, open_at)
+    if open_minute is not None:
+        working_hours_index.ensure_loaded(db)
     
     all_vets = db.query(Vet).all()
     nearby_vets = []
     
     for vet in all_vets:
+        if open_minute is not None and not working_hours_index.is_open(vet.id, open_minute):
+            continue
+        
         distance = recommender.calculate_distance(
             user_lat, user_lon,
             vet.location_lat, vet.location_lon
         )
         
         if distance <= radius_km:
-            nearby_vets.append({
-                'vet_id': vet.id,
-                'name': vet.name,
-                'distance_km': round(distance, 2),
-                'rating': vet.rating,
-                'phone': vet.phone,
-                'address': vet.address,
-                'price_range': vet.price_range,
-                'location': {'lat': vet.location_lat, 'lon': vet.location_lon}
-            })
+            nearby_vets.append(nearby_vet(vet, distance))
     
     nearby_vets.sort(key=lambda x: x['distance_km'])
     
@@ -147,4 +223,76 @@ async def get_nearby_vets(
         'radius_km': radius_km,
         'found': len(nearby_vets),
         'nearby_vets': nearby_vets
-    }
\ No newline at end of file
+    }
+
+@router.get("/nearby/stream")
+async def stream_nearby_vets(
+    request: Request,
+    user_lat: float,
+    user_lon: float,
+    radius_km: float = Query(10, gt=0, le=MAX_RADIUS_KM),
+    open_now: bool = False,
+    open_at: Optional[datetime] = Query(None, description="Only vets open at this time (Sofia local time if no offset)"),
+    db: Session = Depends(get_db)
+):
+    """Stream vets within a radius nearest first, as NDJSON or as Server-Sent Events (Accept: text/event-stream).
+    
+    Each line or event is one /nearby result. Vets come from an expanding
+    ring search over the origin's distance tile (vet ids and coordinates
+    only), and their details are read in batches as the ring releases
+    them, so the first lines go out before farther vets are read or
+    ordered; a client that disconnects stops the search.
+    """
+    
+    recommender = VetRecommendationEngine(db)
+    open_minute = resolve_open_minute(open_now, open_at)
+    if open_minute is not None:
+        working_hours_index.ensure_loaded(db)
+    
+    # Read before the vets, which are only read if the tile has to be built
+    location_version = get_data_version(db, 'location_version')
+    tile = distance_tiles.get(user_lat, user_lon, _vet_points(db), location_version)
+    
+    sse = 'text/event-stream' in request.headers.get('accept', '')
+    
+    async def stream():
+        ring = tile.nearest_first(*project(user_lat, user_lon), radius_km)
+        batch_size = STREAM_FIRST_BATCH
+        # The request's session is closed once streaming starts
+        with SessionLocal() as session:
+            while True:
+                vet_ids = [tile.vet_ids[i] for _, i in islice(ring, batch_size)]
+                if not vet_ids:
+                    break
+                batch_size = STREAM_BATCH
+                if open_minute is not None:
+                    vet_ids = [vet_id for vet_id in vet_ids if working_hours_index.is_open(vet_id, open_minute)]
+                rows = {
+                    row.id: row
+                    for row in session.query(
+                        Vet.id, Vet.name, Vet.rating, Vet.phone, Vet.address, Vet.price_range,
+                        Vet.location_lat, Vet.location_lon
+                    ).filter(Vet.id.in_(vet_ids))
+                }
+                for vet_id in vet_ids:
+                    vet = rows.get(vet_id)
+                    if vet is None:
+                        # Deleted since the tile was built
+                        continue
+                    distance = recommender.calculate_distance(user_lat, user_lon, vet.location_lat, vet.location_lon)
+                    line = orjson.dumps(nearby_vet(vet, distance))
+                    # Starlette stops iterating at the next yield once the client has gone
+                    yield b"data: " + line + b"\n\n" if sse else line + b"\n"
+        if sse:
+            yield b"event: end\ndata: {}\n\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _vet_points(db: Session):
+    """(id, x, y) of every vet, queried only when iterated"""
+    for vet in db.query(Vet.id, Vet.location_lat, Vet.location_lon, Vet.location_x, Vet.location_y):
+        yield (vet.id, *vet_xy(vet))
@@ -1,22 +1,57 @@
 """Vet management API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional
+import base64
 import logging
+import math
 from datetime import datetime
 
 from app.database import get_db
-from app.models import Vet, Service, Review, WorkingHours
+from app.models import Vet, Service, Review, WorkingHours, RatingHistogram
+from app.fts import VET_WEIGHTS, match_query
+from app.geo.districts import district_of, ensure_districts
+from app.geo.polygons import parse_polygon, vet_points
+from app.geo.projection import project
+from app.ml.hours import hours_to_intervals
+from app.ml.tiles import invalidate_tiles
+from app.ml.recommender import VetRecommendationEngine
+from app.ml.snapshot import VET_FIELDS, vet_snapshot
+from app.http_cache import bump_data_version, conditional_get
+from app.api.autocomplete import vet_autocomplete
 from app.schemas import (
     VetCreate, VetUpdate, VetResponse,
-    ServiceCreate, ReviewCreate, WorkingHoursCreate
+    ServiceCreate, ReviewCreate, WorkingHoursCreate,
+    VetListResponse, VetServicesResponse, VetReviewsResponse, VetWorkingHoursResponse,
+    VetDetailResponse, VetSearchResponse, DistrictListResponse
 )
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register_vet(vet_data: VetCreate, db: Session = Depends(get_db)):
+MAX_POLYGON_LENGTH = 20000
+
+def require_district(db: Session, district: str):
+    """Make sure district filters can be answered: boundaries loaded and the name known"""
+    districts = ensure_districts(db)
+    if districts is None:
+        raise HTTPException(status_code=503, detail="District filters are not configured (set VET_DISTRICTS_FILE)")
+    if districts.geometry(district) is None:
+        raise HTTPException(status_code=404, detail=f"District not found: {district}")
+
+def polygon_vet_ids(db: Session, polygon: str) -> set:
+    """Ids of the vets inside a WKT or GeoJSON polygon"""
+    try:
+        geometry = parse_polygon(polygon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return vet_points.within(db, geometry)
+
+@router.post("/register", status_code=status.HTTP_201_CREATED, response_model=VetResponse)
+async def register_vet(vet_data: VetCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Register a new veterinary clinic"""
     existing_vet = db.query(Vet).filter(Vet.email == vet_data.email).first()
     if existing_vet:
@@ -26,6 +61,7 @@ async def register_vet(vet_data: VetCreate, db: Session = Depends(get_db)):
         )
     
     try:
+        location_x, location_y = project(vet_data.location_lat, vet_data.location_lon)
         new_vet = Vet(
             name=vet_data.name,
             email=vet_data.email,
@@ -33,16 +69,24 @@ async def register_vet(vet_data: VetCreate, db: Session = Depends(get_db)):
             address=vet_data.address,
             location_lat=vet_data.location_lat,
             location_lon=vet_data.location_lon,
+            location_x=location_x,
+            location_y=location_y,
             price_range=vet_data.price_range,
             description=vet_data.description,
             website=vet_data.website,
             emergency_service=vet_data.emergency_service,
+            district=district_of(vet_data.location_lat, vet_data.location_lon),
             rating=0.0
         )
         
         db.add(new_vet)
+        bump_data_version(db, 'location_version', 'scoring_version')
         db.commit()
         db.refresh(new_vet)
+        background_tasks.add_task(vet_snapshot.refresh)
+        invalidate_tiles()
+        vet_points.invalidate()
+        vet_autocomplete.add('clinic', new_vet.name)
         
         logger.info(f"New vet registered: {new_vet.name} (ID: {new_vet.id})")
         return new_vet
@@ -55,7 +99,83 @@ async def register_vet(vet_data: VetCreate, db: Session = Depends(get_db)):
             detail=f"Error: {str(e)}"
         )
 
-@router.get("/{vet_id}")
+KM_PER_DEGREE_LAT = 111.0
+
+@router.get("/search", response_model=VetSearchResponse, dependencies=[Depends(conditional_get)])
+async def search_vets(
+    q: str = Query(..., min_length=1, description="Words to match in names, addresses, descriptions, services and reviews"),
+    user_lat: Optional[float] = None,
+    user_lon: Optional[float] = None,
+    radius_km: Optional[float] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over vets, ranked by BM25, optionally within a radius"""
+    match = match_query(q)
+    if not match:
+        return {"query": q, "found": 0, "results": []}
+    
+    use_distance = user_lat is not None and user_lon is not None and radius_km is not None
+    sql = f"""
+        SELECT v.id, v.name, v.address, v.rating, v.price_range, v.emergency_service,
+               v.location_lat, v.location_lon, -bm25(vets_fts, {', '.join(map(str, VET_WEIGHTS))}) AS score
+        FROM vets_fts JOIN vets v ON v.id = vets_fts.rowid
+        WHERE vets_fts MATCH :match
+    """
+    params = {"match": match}
+    if use_distance:
+        # Bounding box in SQL, exact distance below
+        lat_delta = radius_km / KM_PER_DEGREE_LAT
+        lon_delta = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(user_lat)), 0.01))
+        sql += " AND v.location_lat BETWEEN :min_lat AND :max_lat AND v.location_lon BETWEEN :min_lon AND :max_lon"
+        params.update(min_lat=user_lat - lat_delta, max_lat=user_lat + lat_delta,
+                      min_lon=user_lon - lon_delta, max_lon=user_lon + lon_delta)
+    # Words in most documents score near zero in BM25, so ties fall back to rating
+    sql += " ORDER BY score DESC, v.rating DESC"
+    if not use_distance:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    
+    try:
+        rows = db.execute(text(sql), params).all()
+    except OperationalError as e:
+        logger.error(f"Full-text search failed: {e}")
+        raise HTTPException(status_code=503, detail="Full-text search is not available")
+    
+    recommender = VetRecommendationEngine(db)
+    results = []
+    for row in rows:
+        distance = None
+        if use_distance:
+            distance = recommender.calculate_distance(user_lat, user_lon, row.location_lat, row.location_lon)
+            if distance > radius_km:
+                continue
+        results.append({
+            "vet_id": row.id,
+            "name": row.name,
+            "address": row.address,
+            "rating": row.rating,
+            "price_range": row.price_range,
+            "emergency_service": row.emergency_service,
+            "score": round(row.score, 6),
+            "distance_km": round(distance, 2) if distance is not None else None,
+            "location": {"lat": row.location_lat, "lon": row.location_lon}
+        })
+        if len(results) == limit:
+            break
+    
+    return {"query": q, "found": len(results), "results": results}
+
+@router.get("/districts", response_model=DistrictListResponse)
+async def list_districts(db: Session = Depends(get_db)):
+    """Districts of VET_DISTRICTS_FILE with the number of vets in each"""
+    districts = ensure_districts(db)
+    if districts is None:
+        raise HTTPException(status_code=503, detail="District filters are not configured (set VET_DISTRICTS_FILE)")
+    counts = dict(db.query(Vet.district, func.count(Vet.id)).filter(Vet.district.isnot(None)).group_by(Vet.district))
+    return {"districts": [{"name": name, "vet_count": counts.get(name, 0)} for name in districts.names]}
+
+@router.get("/{vet_id}", response_model=VetResponse)
 async def get_vet(vet_id: int, db: Session = Depends(get_db)):
     """Get a specific vet by ID"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
@@ -63,21 +183,84 @@ async def get_vet(vet_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Vet not found")
     return vet
 
-@router.put("/{vet_id}")
-async def update_vet(vet_id: int, vet_data: VetUpdate, db: Session = Depends(get_db)):
+DETAIL_SECTIONS = ('services', 'working_hours', 'reviews')
+
+@router.get("/{vet_id}/detail", response_model=VetDetailResponse, response_model_exclude_unset=True,
+            dependencies=[Depends(conditional_get)])
+async def get_vet_detail(
+    vet_id: int,
+    include: str = Query(",".join(DETAIL_SECTIONS), description="Comma-separated sections: services, working_hours, reviews"),
+    reviews_limit: int = Query(10, ge=0, le=100),
+    reviews_offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Get a vet with its services, working hours and latest reviews in one request"""
+    sections = {section.strip() for section in include.split(',') if section.strip()}
+    unknown = sections - set(DETAIL_SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(sorted(unknown))}")
+    
+    query = db.query(Vet).filter(Vet.id == vet_id)
+    if 'services' in sections:
+        query = query.options(selectinload(Vet.services))
+    if 'working_hours' in sections:
+        query = query.options(selectinload(Vet.working_hours))
+    vet = query.first()
+    if not vet:
+        raise HTTPException(status_code=404, detail="Vet not found")
+    
+    detail = {"vet": vet}
+    if 'services' in sections:
+        detail["services"] = vet.services
+    if 'working_hours' in sections:
+        detail["working_hours"] = vet.working_hours
+    if 'reviews' in sections:
+        # Reviews can be many, so only a page of them is loaded
+        detail["reviews"] = {
+            "total": db.query(func.count(Review.id)).filter(Review.vet_id == vet_id).scalar(),
+            "offset": reviews_offset,
+            "limit": reviews_limit,
+            "items": db.query(Review).filter(Review.vet_id == vet_id)
+                .order_by(Review.created_at.desc(), Review.id.desc())
+                .offset(reviews_offset).limit(reviews_limit).all()
+        }
+    return detail
+
+@router.put("/{vet_id}", response_model=VetResponse)
+async def update_vet(
+    vet_id: int, vet_data: VetUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
     """Update veterinary clinic information"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
     if not vet:
         raise HTTPException(status_code=404, detail="Vet not found")
     
     try:
+        old_name = vet.name
         update_data = vet_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(vet, field, value)
+        moved = 'location_lat' in update_data or 'location_lon' in update_data
+        if moved:
+            vet.location_x, vet.location_y = project(vet.location_lat, vet.location_lon)
+            vet.district = district_of(vet.location_lat, vet.location_lon)
+        
+        counters = ['location_version'] if moved else []
+        if any(field in update_data for field in VET_FIELDS):
+            counters.append('scoring_version')
         
         vet.updated_at = datetime.utcnow()
+        bump_data_version(db, *counters)
         db.commit()
         db.refresh(vet)
+        if 'scoring_version' in counters:
+            background_tasks.add_task(vet_snapshot.refresh)
+        if moved:
+            invalidate_tiles()
+            vet_points.invalidate()
+        if vet.name != old_name:
+            vet_autocomplete.remove('clinic', old_name)
+            vet_autocomplete.add('clinic', vet.name)
         
         logger.info(f"Vet updated: {vet.name} (ID: {vet.id})")
         return vet
@@ -88,15 +271,24 @@ async def update_vet(vet_id: int, vet_data: VetUpdate, db: Session = Depends(get
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{vet_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_vet(vet_id: int, db: Session = Depends(get_db)):
+async def delete_vet(vet_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Delete a veterinary clinic"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
     if not vet:
         raise HTTPException(status_code=404, detail="Vet not found")
     
     try:
+        terms = [('clinic', vet.name)]
+        for service in vet.services:
+            terms += [('service', service.condition), ('equipment', service.equipment)]
         db.delete(vet)
+        bump_data_version(db, 'location_version', 'scoring_version', 'hours_version')
         db.commit()
+        background_tasks.add_task(vet_snapshot.refresh)
+        invalidate_tiles()
+        vet_points.invalidate()
+        for kind, value in terms:
+            vet_autocomplete.remove(kind, value)
         logger.info(f"Vet deleted: ID {vet_id}")
         return None
     except Exception as e:
@@ -104,7 +296,9 @@ async def delete_vet(vet_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{vet_id}/services", status_code=status.HTTP_201_CREATED)
-async def add_service(vet_id: int, service_data: ServiceCreate, db: Session = Depends(get_db)):
+async def add_service(
+    vet_id: int, service_data: ServiceCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
     """Add services offered by a veterinary clinic"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
     if not vet:
@@ -126,8 +320,12 @@ async def add_service(vet_id: int, service_data: ServiceCreate, db: Session = De
         )
         
         db.add(new_service)
+        bump_data_version(db, 'scoring_version')
         db.commit()
         db.refresh(new_service)
+        background_tasks.add_task(vet_snapshot.refresh)
+        vet_autocomplete.add('service', new_service.condition)
+        vet_autocomplete.add('equipment', new_service.equipment)
         
         return {
             "success": True,
@@ -140,7 +338,7 @@ async def add_service(vet_id: int, service_data: ServiceCreate, db: Session = De
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{vet_id}/services")
+@router.get("/{vet_id}/services", response_model=VetServicesResponse)
 async def get_vet_services(vet_id: int, db: Session = Depends(get_db)):
     """Get all services offered by a specific vet"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
@@ -168,6 +366,11 @@ async def add_working_hours(vet_id: int, hours_data: WorkingHoursCreate, db: Ses
             detail=f"Working hours for {hours_data.day_of_week} already exist"
         )
     
+    try:
+        hours_to_intervals(hours_data.day_of_week, hours_data.open_time, hours_data.close_time, hours_data.is_closed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid working hours: {e}")
+    
     try:
         new_hours = WorkingHours(
             vet_id=vet_id,
@@ -178,6 +381,7 @@ async def add_working_hours(vet_id: int, hours_data: WorkingHoursCreate, db: Ses
         )
         
         db.add(new_hours)
+        bump_data_version(db, 'hours_version')
         db.commit()
         db.refresh(new_hours)
         
@@ -187,7 +391,7 @@ async def add_working_hours(vet_id: int, hours_data: WorkingHoursCreate, db: Ses
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{vet_id}/working-hours")
+@router.get("/{vet_id}/working-hours", response_model=VetWorkingHoursResponse)
 async def get_working_hours(vet_id: int, db: Session = Depends(get_db)):
     """Get all working hours for a vet"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
@@ -197,17 +401,28 @@ async def get_working_hours(vet_id: int, db: Session = Depends(get_db)):
     hours = db.query(WorkingHours).filter(WorkingHours.vet_id == vet_id).all()
     return {"vet_name": vet.name, "working_hours": hours}
 
-@router.get("")
+@router.get("", response_model=VetListResponse, dependencies=[Depends(conditional_get)])
 async def list_vets(
     skip: int = 0,
     limit: int = 100,
     price_range: Optional[str] = None,
     emergency_only: bool = False,
+    district: Optional[str] = Query(None, description="Only vets in this district (see /vets/districts)"),
+    polygon: Optional[str] = Query(
+        None, max_length=MAX_POLYGON_LENGTH, description="Only vets inside this WKT or GeoJSON polygon (lon/lat)"
+    ),
     db: Session = Depends(get_db)
 ):
     """List all veterinary clinics with optional filters"""
     query = db.query(Vet)
     
+    if district:
+        require_district(db, district)
+        query = query.filter(Vet.district == district)
+    
+    if polygon:
+        query = query.filter(Vet.id.in_(polygon_vet_ids(db, polygon)))
+    
     if price_range:
         query = query.filter(Vet.price_range == price_range)
     
@@ -234,7 +449,9 @@ async def list_vets(
     }
 
 @router.post("/{vet_id}/reviews", status_code=status.HTTP_201_CREATED)
-async def add_review(vet_id: int, review_data: ReviewCreate, db: Session = Depends(get_db)):
+async def add_review(
+    vet_id: int, review_data: ReviewCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
     """Add a review for a vet"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
     if not vet:
@@ -250,12 +467,14 @@ async def add_review(vet_id: int, review_data: ReviewCreate, db: Session = Depen
         
         db.add(new_review)
         
-        all_reviews = db.query(Review).filter(Review.vet_id == vet_id).all()
-        total_rating = sum(r.rating for r in all_reviews) + review_data.rating
-        vet.rating = total_rating / (len(all_reviews) + 1)
+        # The histogram gives the new average without scanning the vet's reviews
+        histogram = _increment_rating_histogram(db, vet_id, review_data.rating)
+        vet.rating = sum(stars * count for stars, count in histogram.items()) / sum(histogram.values())
         
+        bump_data_version(db, 'scoring_version')
         db.commit()
         db.refresh(new_review)
+        background_tasks.add_task(vet_snapshot.refresh)
         
         return {
             "success": True,
@@ -267,18 +486,58 @@ async def add_review(vet_id: int, review_data: ReviewCreate, db: Session = Depen
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{vet_id}/reviews")
-async def get_reviews(vet_id: int, db: Session = Depends(get_db)):
-    """Get all reviews for a vet"""
+def _increment_rating_histogram(db: Session, vet_id: int, rating: int) -> dict:
+    column = f"stars_{rating}"
+    statement = sqlite_insert(RatingHistogram).values(vet_id=vet_id, **{column: 1})
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[RatingHistogram.vet_id],
+        set_={column: getattr(RatingHistogram, column) + 1}
+    ))
+    return db.query(RatingHistogram).filter(RatingHistogram.vet_id == vet_id).populate_existing().one().counts()
+
+def encode_review_cursor(review: Review) -> str:
+    value = f"{review.created_at.isoformat()}|{review.id}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+def decode_review_cursor(cursor: str):
+    """(created_at, id) of the last review on the previous page"""
+    try:
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, review_id = value.split("|")
+        return datetime.fromisoformat(created_at), int(review_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/{vet_id}/reviews", response_model=VetReviewsResponse, dependencies=[Depends(conditional_get)])
+async def get_reviews(
+    vet_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Get a vet's reviews, newest first, a page at a time"""
     vet = db.query(Vet).filter(Vet.id == vet_id).first()
     if not vet:
         raise HTTPException(status_code=404, detail="Vet not found")
     
-    reviews = db.query(Review).filter(Review.vet_id == vet_id).order_by(Review.created_at.desc()).all()
+    query = db.query(Review).filter(Review.vet_id == vet_id)
+    if cursor:
+        created_at, review_id = decode_review_cursor(cursor)
+        query = query.filter(or_(
+            Review.created_at < created_at,
+            and_(Review.created_at == created_at, Review.id < review_id)
+        ))
+    reviews = query.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(reviews) > limit
+    reviews = reviews[:limit]
+    histogram = vet.rating_histogram.counts() if vet.rating_histogram else {stars: 0 for stars in range(1, 6)}
     
     return {
         "vet_name": vet.name,
         "average_rating": vet.rating,
-        "total_reviews": len(reviews),
-        "reviews": reviews
-    }
\ No newline at end of file
+        "total_reviews": sum(histogram.values()),
+        "rating_histogram": histogram,
+        "reviews": reviews,
+        "next_cursor": encode_review_cursor(reviews[-1]) if has_more else None
+    }
@@ -0,0 +1,224 @@
+"""In-memory, typo-tolerant autocomplete over clinic names, services, equipment and lab tests.
+
+Terms are normalized (lowercase, diacritics stripped) and every word
+suffix of a term ("cat hotel", "hotel") is kept in one sorted key list, so
+a prefix lookup is a bisect plus a short scan (a flattened prefix trie).
+When prefixes alone do not fill the result, a trigram index proposes
+candidates that are checked with a bounded edit distance against the
+closest prefix of each key; only the candidates sharing the most trigrams
+with the query are checked, and outside the index lock. Service and equipment names are also indexed
+under their catalog translations and always map back to the English value.
+"""
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+from itertools import chain
+import re
+import threading
+import unicodedata
+
+from app.i18n import DEFAULT_LANGUAGE, available_languages, translate_equipment_name, translate_service_name
+
+KINDS = ('clinic', 'service', 'equipment', 'lab_test')
+
+# Kinds with a translation catalog: English value -> display name
+CATALOGS = {
+    'service': translate_service_name,
+    'equipment': translate_equipment_name,
+}
+
+# Upper bound on prefix keys inspected per query, so one-letter queries stay cheap
+MAX_SCAN = 500
+# Upper bound on typo candidates checked with the edit distance, by most shared trigrams
+MAX_TYPO_CANDIDATES = 200
+
+def normalize(text: str) -> str:
+    """Lowercase words without diacritics, separated by single spaces"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r"\w+", text))
+
+def max_distance(query: str) -> int:
+    """Edits tolerated for a normalized query: none for very short ones"""
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+def trigrams(text: str) -> set:
+    """Trigrams of each word, padded at the word start"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word}"
+        grams.update(padded[i:i + 3] for i in range(max(1, len(padded) - 2)))
+    return grams
+
+def prefix_distance(query: str, key: str, bound: int) -> int:
+    """Edit distance between query and the closest prefix of key, or bound + 1 if it exceeds bound"""
+    previous = list(range(len(query) + 1))
+    best = previous[-1]
+    for i, key_char in enumerate(key[:len(query) + bound], 1):
+        current = [i]
+        for j, query_char in enumerate(query, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_char != key_char)))
+        best = min(best, current[-1])
+        if min(current) > bound:
+            break
+        previous = current
+    return best if best <= bound else bound + 1
+
+class AutocompleteIndex:
+    """Prefix keys plus a trigram index over (kind, value) terms, updated in place"""
+
+    def __init__(self):
+        self._terms = {}      # (kind, value) -> {'weight': int, 'labels': {lang: text}}
+        self._keys = []       # sorted (normalized word suffix, kind, value, word position)
+        self._grams = {}      # trigram -> set of (kind, value)
+        self._loaded = False
+        self._bulk = False    # while loading, keys are appended and sorted once at the end
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, load, *args):
+        """Fill the index with load(index, *args) on first use"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._bulk = True
+            try:
+                load(self, *args)
+            finally:
+                self._bulk = False
+                self._keys = sorted(set(self._keys))
+            self._loaded = True
+
+    def _labels(self, kind: str, value: str) -> dict:
+        translate = CATALOGS.get(kind)
+        if not translate:
+            return {}
+        labels = {}
+        for lang in available_languages():
+            label = translate(value, lang)
+            if label != value:
+                labels[lang] = label
+        return labels
+
+    def _index_text(self, kind: str, value: str, text: str):
+        normalized = normalize(text)
+        words = normalized.split()
+        for position in range(len(words)):
+            entry = (' '.join(words[position:]), kind, value, position)
+            if self._bulk:
+                self._keys.append(entry)
+                continue
+            i = bisect_left(self._keys, entry)
+            if i == len(self._keys) or self._keys[i] != entry:
+                insort(self._keys, entry, lo=i)
+        for gram in trigrams(normalized):
+            self._grams.setdefault(gram, set()).add((kind, value))
+
+    def load_term(self, kind: str, value: str, weight: int = 1):
+        """Add a term while loading (no lock, no loaded check)"""
+        value = value.strip() if value else ''
+        if not value:
+            return
+        term = self._terms.get((kind, value))
+        if term:
+            term['weight'] += weight
+            return
+        labels = self._labels(kind, value)
+        self._terms[(kind, value)] = {'weight': weight, 'labels': labels}
+        for text in {value, *labels.values()}:
+            self._index_text(kind, value, text)
+
+    def add(self, kind: str, value: str, weight: int = 1):
+        """Add a term after it was stored; a no-op before the index is loaded"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self.load_term(kind, value, weight)
+
+    def remove(self, kind: str, value: str, weight: int = 1):
+        """Drop one occurrence of a term, and the term itself with its last occurrence"""
+        value = value.strip() if value else ''
+        if not self._loaded or not value:
+            return
+        with self._lock:
+            term = self._terms.get((kind, value))
+            if not term:
+                return
+            term['weight'] -= weight
+            if term['weight'] > 0:
+                return
+            del self._terms[(kind, value)]
+            self._keys = [entry for entry in self._keys if (entry[1], entry[2]) != (kind, value)]
+            for refs in self._grams.values():
+                refs.discard((kind, value))
+
+    def values(self, kind: str) -> list:
+        """All English values of a kind, sorted"""
+        with self._lock:
+            return sorted(value for term_kind, value in self._terms if term_kind == kind)
+
+    def label(self, kind: str, value: str, lang: str = DEFAULT_LANGUAGE) -> str:
+        term = self._terms.get((kind, value))
+        return term['labels'].get(lang, value) if term else value
+
+    def suggest(self, query: str, kinds=None, lang: str = DEFAULT_LANGUAGE, limit: int = 10) -> list:
+        """Best matching terms for a partly typed query, in any indexed language.
+
+        Exact prefixes rank before typo matches, matches at the start of a
+        term before matches of a later word, then more frequent terms first.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        kinds = set(kinds or KINDS)
+        found = {}  # (kind, value) -> rank tuple
+
+        def consider(kind, value, weight, distance, position):
+            rank = (distance, position > 0, -weight, len(value), value)
+            if (kind, value) not in found or rank < found[(kind, value)]:
+                found[(kind, value)] = rank
+
+        bound = max_distance(normalized)
+        postings = []
+        with self._lock:
+            start = bisect_left(self._keys, (normalized,))
+            for key, kind, value, position in self._keys[start:start + MAX_SCAN]:
+                if not key.startswith(normalized):
+                    break
+                if kind in kinds:
+                    consider(kind, value, self._terms[(kind, value)]['weight'], 0, position)
+            if bound and len(found) < limit:
+                query_grams = trigrams(normalized)
+                postings = [tuple(self._grams.get(gram, ())) for gram in query_grams]
+
+        # The typo pass works on copies, so a slow query does not hold up the others
+        if postings:
+            shared = Counter(chain.from_iterable(postings))
+            # Each edit destroys at most three trigrams of the query
+            needed = max(1, len(query_grams) - 3 * bound)
+            candidates = []
+            for ref, count in shared.items():
+                term = self._terms.get(ref)
+                if count >= needed and ref[0] in kinds and ref not in found and term:
+                    candidates.append((-count, -term['weight'], len(ref[1]), ref[1], ref[0], term))
+            for _, negative_weight, _, value, kind, term in nsmallest(MAX_TYPO_CANDIDATES, candidates):
+                for text in {value, *term['labels'].values()}:
+                    words = normalize(text).split()
+                    for position in range(len(words)):
+                        distance = prefix_distance(normalized, ' '.join(words[position:]), bound)
+                        if distance <= bound:
+                            consider(kind, value, -negative_weight, distance, position)
+
+        best = sorted(found.items(), key=lambda item: item[1])[:limit]
+        return [
+            {
+                'text': self.label(kind, value, lang),
+                'value': value,
+                'kind': kind,
+                'distance': rank[0],
+            }
+            for (kind, value), rank in best
+        ]
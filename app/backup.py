@@ -0,0 +1,333 @@
+"""Streaming full and incremental backup and restore for the clinic database"""
+import gzip
+import io
+import json
+import logging
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+BACKUP_FORMAT = "vet-platform-backup"
+BACKUP_VERSION = 3
+
+# Parent tables first so that rows can be restored in file order
+BACKUP_TABLES = ['clinics', 'services', 'equipment', 'lab_tests', 'reviews']
+
+BATCH_SIZE = 1000
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Millisecond resolution so that changes made right after a backup are not missed
+SQL_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+def install_change_tracking(conn):
+    """Create the updated_at columns, triggers and bookkeeping tables used by incremental backups"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS backup_manifests (
+            backup_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            parent_id TEXT,
+            since TEXT,
+            watermark TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS backup_tombstones (
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            deleted_at TEXT NOT NULL
+        )
+    """)
+
+    for table in BACKUP_TABLES:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if 'updated_at' not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TEXT")
+            conn.execute(f"UPDATE {table} SET updated_at = {SQL_NOW}")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)")
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_touch_insert AFTER INSERT ON {table}
+            WHEN NEW.updated_at IS NULL
+            BEGIN
+                UPDATE {table} SET updated_at = {SQL_NOW} WHERE id = NEW.id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_touch_update AFTER UPDATE ON {table}
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = {SQL_NOW} WHERE id = NEW.id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_tombstone AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO backup_tombstones (table_name, row_id, deleted_at)
+                VALUES ('{table}', OLD.id, {SQL_NOW});
+            END
+        """)
+
+    conn.commit()
+
+def _write_record(stream, record):
+    stream.write(json.dumps(record, default=str, ensure_ascii=False).encode('utf-8') + b'\n')
+
+def _write_rows(stream, cursor):
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            break
+        stream.write(b''.join(
+            json.dumps(list(row), default=str, ensure_ascii=False).encode('utf-8') + b'\n'
+            for row in rows
+        ))
+
+def get_last_manifest(conn):
+    """Return the manifest of the most recently recorded backup taken from (or restored into) this database"""
+    row = conn.execute("""
+        SELECT backup_id, kind, parent_id, since, watermark
+        FROM backup_manifests
+        ORDER BY rowid DESC
+        LIMIT 1
+    """).fetchone()
+    if row is None:
+        return None
+    return dict(zip(['backup_id', 'kind', 'parent_id', 'since', 'watermark'], row))
+
+def _record_manifest(conn, manifest):
+    conn.execute(
+        "INSERT OR REPLACE INTO backup_manifests (backup_id, kind, parent_id, since, watermark) VALUES (?, ?, ?, ?, ?)",
+        (manifest['backup_id'], manifest['kind'], manifest['parent_id'], manifest['since'], manifest['watermark'])
+    )
+
+def record_backup(conn, manifest):
+    """Make a backup the parent of the next incremental backup, once its file has been handed over"""
+    _record_manifest(conn, manifest)
+    if manifest['since'] is not None:
+        # Deletions before the previous watermark are already part of an earlier backup
+        conn.execute("DELETE FROM backup_tombstones WHERE deleted_at < ?", (manifest['since'],))
+    conn.commit()
+    logger.info(f"{manifest['kind'].capitalize()} backup {manifest['backup_id']} recorded")
+
+def _read_watermark(conn, since):
+    """Latest change stamp in the current read snapshot, and never before since.
+
+    Writes that are not in the snapshot commit after it was taken, and
+    since writes are serialized they are stamped at or after every stamp
+    in it, so a next backup from this watermark cannot miss them.
+    """
+    stamps = [conn.execute(f"SELECT max(updated_at) FROM {table}").fetchone()[0] for table in BACKUP_TABLES]
+    stamps.append(conn.execute("SELECT max(deleted_at) FROM backup_tombstones").fetchone()[0])
+    # An empty database has no stamps: the next backup then starts from the beginning
+    return max([stamp for stamp in stamps if stamp is not None] + [since or ''])
+
+def write_backup(conn, fileobj, incremental=False):
+    """Stream the clinic tables into fileobj as gzip-compressed NDJSON.
+
+    The file starts with a header object carrying the backup manifest,
+    followed by one {"table": ..., "columns": [...]} object per table and
+    that table's rows as JSON arrays, so memory use is bounded by
+    BATCH_SIZE rows. An incremental backup only contains rows whose
+    updated_at is at or after the previous backup's watermark, plus
+    {"table": ..., "deleted": true} sections listing deleted row ids.
+    Falls back to a full backup when there is no previous manifest.
+
+    Returns the manifest of the written backup. Pass it to record_backup
+    once the file has been handed over, so that a backup that was never
+    saved does not become the parent of the next incremental one.
+    """
+    parent = get_last_manifest(conn) if incremental else None
+
+    # Read every table from the same snapshot
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+    try:
+        watermark = _read_watermark(conn, parent['watermark'] if parent else None)
+        manifest = {
+            'backup_id': uuid.uuid4().hex,
+            'kind': 'delta' if parent else 'full',
+            'parent_id': parent['backup_id'] if parent else None,
+            'since': parent['watermark'] if parent else None,
+            'watermark': watermark
+        }
+
+        with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+            _write_record(gz, {
+                'format': BACKUP_FORMAT,
+                'version': BACKUP_VERSION,
+                'backup_date': datetime.now().isoformat(),
+                **manifest
+            })
+
+            for table in BACKUP_TABLES:
+                if parent:
+                    cursor = conn.execute(f"SELECT * FROM {table} WHERE updated_at >= ?", (parent['watermark'],))
+                else:
+                    cursor = conn.execute(f"SELECT * FROM {table}")
+                columns = [description[0] for description in cursor.description]
+                _write_record(gz, {'table': table, 'columns': columns})
+                _write_rows(gz, cursor)
+
+            if parent:
+                for table in BACKUP_TABLES:
+                    cursor = conn.execute(
+                        "SELECT row_id FROM backup_tombstones WHERE table_name = ? AND deleted_at >= ?",
+                        (table, parent['watermark'])
+                    )
+                    _write_record(gz, {'table': table, 'columns': ['id'], 'deleted': True})
+                    _write_rows(gz, cursor)
+    finally:
+        conn.rollback()
+
+    logger.info(f"{manifest['kind'].capitalize()} backup {manifest['backup_id']} written")
+    return manifest
+
+def get_insert_statement(conn, table, columns, replace=False):
+    """Build a prepared INSERT for a backed-up table, validating table and column names"""
+    if table not in BACKUP_TABLES:
+        raise ValueError(f"Unknown table in backup: {table}")
+
+    known_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    unknown = [column for column in columns if column not in known_columns]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table} in backup: {', '.join(unknown)}")
+
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    placeholders = ', '.join(['?'] * len(columns))
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+def _open_lines(fileobj):
+    fileobj.seek(0)
+    return io.TextIOWrapper(gzip.GzipFile(fileobj=fileobj, mode='rb'), encoding='utf-8')
+
+def _read_header(lines):
+    header = json.loads(next(lines, 'null'))
+    if not isinstance(header, dict) or header.get('format') != BACKUP_FORMAT:
+        raise ValueError("Not a vet platform backup file")
+    if header.get('version', 0) > BACKUP_VERSION:
+        raise ValueError(f"Unsupported backup version: {header.get('version')}")
+    header.setdefault('kind', 'full')
+    header.setdefault('backup_id', None)
+    header.setdefault('parent_id', None)
+    return header
+
+def _iter_sections(lines):
+    """Yield (section, row_batch) for each table section of an NDJSON backup"""
+    _read_header(lines)
+
+    section, batch = None, []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, dict):
+            if section is not None:
+                yield section, batch
+            section, batch = record, []
+        else:
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                yield section, batch
+                batch = []
+
+    if section is not None:
+        yield section, batch
+
+def _iter_legacy_sections(backup_data):
+    """Yield sections from a version 1 (single JSON document) backup"""
+    for table in BACKUP_TABLES:
+        records = backup_data.get(table, [])
+        if not records:
+            continue
+        columns = list(records[0].keys())
+        yield {'table': table, 'columns': columns}, [[record.get(column) for column in columns] for record in records]
+
+class _BackupFile:
+    """A backup file opened for restore, with its header read up front"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        fileobj.seek(0)
+        self.legacy = fileobj.read(2) != GZIP_MAGIC
+        if self.legacy:
+            self.header = {'kind': 'full', 'backup_id': None, 'parent_id': None}
+        else:
+            self.header = _read_header(_open_lines(fileobj))
+
+    def sections(self):
+        if self.legacy:
+            self.fileobj.seek(0)
+            return _iter_legacy_sections(json.load(self.fileobj))
+        return _iter_sections(_open_lines(self.fileobj))
+
+def order_backup_chain(backups):
+    """Order backup files as a full base followed by its chain of deltas"""
+    bases = [backup for backup in backups if backup.header['kind'] == 'full']
+    if len(bases) != 1:
+        raise ValueError("Exactly one full backup is required as the base of a restore")
+
+    deltas = {backup.header['parent_id']: backup for backup in backups if backup.header['kind'] == 'delta'}
+    chain = [bases[0]]
+    while chain[-1].header['backup_id'] in deltas:
+        chain.append(deltas.pop(chain[-1].header['backup_id']))
+
+    if deltas:
+        raise ValueError("Incremental backups do not form a chain from the full backup")
+    return chain
+
+def restore_backup(conn, *fileobjs):
+    """Replace the clinic tables with the contents of a backup chain.
+
+    Takes one full backup and any number of incremental backups taken
+    after it, in any order. Accepts both the compressed NDJSON format
+    written by write_backup and legacy JSON backups. All rows are restored
+    in a single transaction using executemany with one prepared statement
+    per table.
+    """
+    chain = order_backup_chain([_BackupFile(fileobj) for fileobj in fileobjs])
+
+    try:
+        # Clear existing data
+        for table in reversed(BACKUP_TABLES):
+            conn.execute(f"DELETE FROM {table}")
+
+        statements = {}
+        restored = 0
+        for backup in chain:
+            is_delta = backup.header['kind'] == 'delta'
+            for section, rows in backup.sections():
+                table = section['table']
+                if section.get('deleted'):
+                    if table not in BACKUP_TABLES:
+                        raise ValueError(f"Unknown table in backup: {table}")
+                    conn.executemany(f"DELETE FROM {table} WHERE id = ?", rows)
+                    continue
+
+                key = (table, tuple(section['columns']), is_delta)
+                if key not in statements:
+                    statements[key] = get_insert_statement(conn, table, section['columns'], replace=is_delta)
+                conn.executemany(statements[key], rows)
+                restored += len(rows)
+
+        # Continue the incremental chain from the restored backup
+        conn.execute("DELETE FROM backup_tombstones")
+        conn.execute("DELETE FROM backup_manifests")
+        for backup in chain:
+            if backup.header['backup_id']:
+                _record_manifest(conn, {
+                    'backup_id': backup.header['backup_id'],
+                    'kind': backup.header['kind'],
+                    'parent_id': backup.header['parent_id'],
+                    'since': backup.header.get('since'),
+                    'watermark': backup.header['watermark']
+                })
+
+        conn.commit()
+        logger.info(f"Database restored from {len(chain)} backup file(s) ({restored} rows)")
+        return restored
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,193 @@
+"""SQLite storage for the Streamlit clinic directory"""
+import os
+import sqlite3
+
+import pandas as pd
+
+from app.backup import install_change_tracking, restore_backup
+from app.fts import CLINIC_WEIGHTS, bulk_load, install_clinics_fts, match_query
+from app.migrations import add_column, migrate
+
+DB_PATH = "vet_platform.db"
+
+def get_db_connection():
+    """Create a database connection"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def _create_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS clinics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            latitude REAL,
+            longitude REAL,
+            rating REAL DEFAULT 0,
+            emergency_available INTEGER DEFAULT 0,
+            inpatient_care INTEGER DEFAULT 0,
+            wild_animal_care INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS services (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clinic_id INTEGER,
+            service_name TEXT NOT NULL,
+            price REAL,
+            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS equipment (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clinic_id INTEGER,
+            equipment_name TEXT NOT NULL,
+            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lab_tests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clinic_id INTEGER,
+            test_name TEXT NOT NULL,
+            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reviews (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clinic_id INTEGER,
+            rating INTEGER,
+            comment TEXT,
+            price_rating INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
+        )
+    """)
+
+def _add_care_type_and_price_columns(conn):
+    # Databases created before care types and price ratings existed
+    add_column(conn, 'clinics', 'inpatient_care', 'INTEGER DEFAULT 0')
+    add_column(conn, 'clinics', 'wild_animal_care', 'INTEGER DEFAULT 0')
+    add_column(conn, 'reviews', 'price_rating', 'INTEGER')
+
+CLINIC_MIGRATIONS = [
+    (1, "Create clinic tables", _create_tables),
+    (2, "Add care type and price rating columns", _add_care_type_and_price_columns),
+    (3, "Track row changes for incremental backups", install_change_tracking),
+    (4, "Add full-text search index", install_clinics_fts),
+]
+
+def init_db():
+    """Initialize database - apply pending schema migrations once per process"""
+    return migrate(os.path.abspath(DB_PATH), 'clinics', CLINIC_MIGRATIONS, get_db_connection)
+
+def restore_clinics(conn, *fileobjs):
+    """Restore a backup chain (see app.backup.restore_backup), re-indexing search once at the end"""
+    with bulk_load(conn, 'clinics_fts'):
+        return restore_backup(conn, *fileobjs)
+
+def search_clinics(conn, services=None, equipment=None, emergency_only=False,
+                   inpatient_only=False, wild_animal_only=False, min_rating=0.0, text=None):
+    """Search clinics by free text, services, equipment, care types and rating.
+    
+    Returns one row per clinic with its average price rating and
+    comma-separated services, equipment and lab tests. With text, only
+    clinics matching every word (as a prefix) in their name, address,
+    services or equipment are returned, with a text_rank column (lower
+    is better).
+    """
+    text_query = match_query(text) if text else None
+    params = []
+    
+    text_join = ""
+    if text_query:
+        text_join = f"""
+            JOIN (
+                SELECT rowid AS clinic_id, bm25(clinics_fts, {', '.join(map(str, CLINIC_WEIGHTS))}) AS text_rank
+                FROM clinics_fts WHERE clinics_fts MATCH ?
+                LIMIT -1  -- keeps SQLite from flattening the subquery, which bm25() cannot run in
+            ) f ON f.clinic_id = c.id
+        """
+        params.append(text_query)
+    
+    # Build query with subqueries for service and equipment filtering
+    query = f"""
+        SELECT DISTINCT c.*, {'f.text_rank,' if text_query else ''}
+               AVG(r.price_rating) as avg_price_rating,
+               GROUP_CONCAT(DISTINCT s.service_name) as services,
+               GROUP_CONCAT(DISTINCT e.equipment_name) as equipment,
+               GROUP_CONCAT(DISTINCT l.test_name) as lab_tests
+        FROM clinics c
+        {text_join}
+        LEFT JOIN reviews r ON c.id = r.clinic_id
+        LEFT JOIN services s ON c.id = s.clinic_id
+        LEFT JOIN equipment e ON c.id = e.clinic_id
+        LEFT JOIN lab_tests l ON c.id = l.clinic_id
+        WHERE 1=1
+    """
+    
+    # Filter by selected services (clinic must have ALL selected services)
+    if services:
+        service_conditions = []
+        for service in services:
+            service_conditions.append("""
+                c.id IN (
+                    SELECT clinic_id FROM services WHERE service_name = ?
+                )
+            """)
+            params.append(service)
+        query += " AND " + " AND ".join(service_conditions)
+    
+    # Filter by selected equipment (clinic must have ALL selected equipment)
+    if equipment:
+        equipment_conditions = []
+        for equip in equipment:
+            equipment_conditions.append("""
+                c.id IN (
+                    SELECT clinic_id FROM equipment WHERE equipment_name = ?
+                )
+            """)
+            params.append(equip)
+        query += " AND " + " AND ".join(equipment_conditions)
+    
+    if emergency_only:
+        query += " AND c.emergency_available = 1"
+    
+    if inpatient_only:
+        query += " AND c.inpatient_care = 1"
+    
+    if wild_animal_only:
+        query += " AND c.wild_animal_care = 1"
+    
+    query += " AND c.rating >= ?"
+    params.append(min_rating)
+    
+    query += " GROUP BY c.id"
+    if text_query:
+        query += " ORDER BY f.text_rank"
+    
+    return pd.read_sql_query(query, conn, params=params)
+
+# (kind, SQL listing each distinct term with its number of occurrences)
+AUTOCOMPLETE_SOURCES = [
+    ('clinic', "SELECT name, COUNT(*) FROM clinics GROUP BY name"),
+    ('service', "SELECT service_name, COUNT(*) FROM services WHERE service_name IS NOT NULL GROUP BY service_name"),
+    ('equipment', "SELECT equipment_name, COUNT(*) FROM equipment WHERE equipment_name IS NOT NULL GROUP BY equipment_name"),
+    ('lab_test', "SELECT test_name, COUNT(*) FROM lab_tests WHERE test_name IS NOT NULL GROUP BY test_name"),
+]
+
+def load_autocomplete(index, conn):
+    """Fill an app.autocomplete.AutocompleteIndex from the clinic tables"""
+    for kind, query in AUTOCOMPLETE_SOURCES:
+        for value, count in conn.execute(query):
+            index.load_term(kind, value, count)
@@ -0,0 +1,106 @@
+"""Brotli/gzip response compression"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6
+# Low brotli qualities compress about as well as gzip -6 at a fraction of the cost
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/x-ndjson')
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    encodings = {}
+    for part in accept_encoding.split(','):
+        name, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            encodings[name.lower()] = quality
+    return encodings
+
+def choose_encoding(accept_encoding: str):
+    """'br', 'gzip' or None for an Accept-Encoding header"""
+    encodings = _accepted_encodings(accept_encoding)
+    wildcard = encodings.get('*', 0.0)
+    candidates = (['br'] if brotli else []) + ['gzip']
+    best = max(candidates, key=lambda name: encodings.get(name, wildcard))
+    return best if encodings.get(best, wildcard) > 0 else None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses of at least minimum_size bytes.
+
+    Streaming responses pass through unchanged. ETags of compressed
+    responses get an encoding suffix, since the bytes differ per encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        accept_encoding = ''
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+        encoding = choose_encoding(accept_encoding)
+        if not encoding:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body' or start is None:
+                return await send(message)
+
+            body = message.get('body', b'')
+            headers = {name.lower(): value for name, value in start.get('headers', [])}
+            content_type = headers.get(b'content-type', b'').decode('latin-1')
+            if (message.get('more_body') or len(body) < self.minimum_size or b'content-encoding' in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                start = None
+                return await send(message)
+
+            compressed = compress(body, encoding)
+            new_headers = []
+            for name, value in start.get('headers', []):
+                lowered = name.lower()
+                if lowered == b'content-length':
+                    continue
+                if lowered == b'etag' and value.endswith(b'"'):
+                    value = value[:-1] + f'-{encoding}"'.encode()
+                if lowered == b'vary':
+                    continue
+                new_headers.append((name, value))
+            vary = headers.get(b'vary')
+            new_headers += [
+                (b'content-encoding', encoding.encode()),
+                (b'content-length', str(len(compressed)).encode()),
+                (b'vary', vary + b', Accept-Encoding' if vary else b'Accept-Encoding'),
+            ]
+            await send({**start, 'headers': new_headers})
+            start = None
+            await send({**message, 'body': compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,13 @@
 """Database configuration and session management"""
+from fastapi import HTTPException
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 import logging
+import os
+import sqlite3
+
+from app.fts import install_vets_fts
+from app.migrations import add_column, migrate
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,10 @@ def get_db():
     try:
         yield db
         db.commit()
+    except HTTPException:
+        # 304s and 404s are answers, not database errors
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"Database error: {e}")
@@ -30,7 +40,66 @@ def get_db():
     finally:
         db.close()
 
-def init_db():
-    """Initialize database tables"""
+def connect_raw():
+    """Open a plain sqlite3 connection to the API database"""
+    return sqlite3.connect(engine.url.database)
+
+def _create_tables(conn):
+    Base.metadata.create_all(engine)
+
+def _create_data_version(conn):
+    Base.metadata.create_all(engine)
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+def _add_review_index_and_histograms(conn):
     Base.metadata.create_all(engine)
-    logger.info("Database initialized")
\ No newline at end of file
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_reviews_vet_id_created_at ON reviews (vet_id, created_at, id)")
+    conn.execute("""
+        INSERT OR IGNORE INTO vet_rating_histograms (vet_id, stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT vet_id, SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+        FROM reviews GROUP BY vet_id
+    """)
+
+def _add_vet_district(conn):
+    add_column(conn, 'vets', 'district', 'VARCHAR(100)')
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_vets_district ON vets (district)")
+
+def _add_projected_locations(conn):
+    from app.geo.projection import project_many
+    
+    add_column(conn, 'vets', 'location_x', 'FLOAT')
+    add_column(conn, 'vets', 'location_y', 'FLOAT')
+    rows = conn.execute("SELECT id, location_lat, location_lon FROM vets WHERE location_x IS NULL").fetchall()
+    if rows:
+        xs, ys = project_many([row[1] for row in rows], [row[2] for row in rows])
+        conn.executemany(
+            "UPDATE vets SET location_x = ?, location_y = ? WHERE id = ?",
+            zip(xs.tolist(), ys.tolist(), [row[0] for row in rows])
+        )
+
+def _add_location_version(conn):
+    add_column(conn, 'data_version', 'location_version', 'INTEGER NOT NULL DEFAULT 0')
+
+def _add_scoring_version(conn):
+    add_column(conn, 'data_version', 'scoring_version', 'INTEGER NOT NULL DEFAULT 0')
+
+def _add_hours_version(conn):
+    add_column(conn, 'data_version', 'hours_version', 'INTEGER NOT NULL DEFAULT 0')
+
+API_MIGRATIONS = [
+    (1, "Create ORM tables", _create_tables),
+    (2, "Add data version counter for ETags", _create_data_version),
+    (3, "Add review keyset index and rating histograms", _add_review_index_and_histograms),
+    (4, "Add full-text search index", install_vets_fts),
+    (5, "Add recommendation event log", _create_tables),
+    (6, "Add vet districts", _add_vet_district),
+    (7, "Add projected vet locations", _add_projected_locations),
+    (8, "Add vet location version", _add_location_version),
+    (9, "Add vet snapshot version", _add_scoring_version),
+    (10, "Add working hours version", _add_hours_version),
+]
+
+def init_db():
+    """Initialize database - apply pending schema migrations once per process"""
+    version = migrate(os.path.abspath(engine.url.database), 'api', API_MIGRATIONS, connect_raw)
+    logger.info(f"Database initialized (schema version {version})")
\ No newline at end of file
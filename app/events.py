@@ -0,0 +1,210 @@
+"""Buffered recommendation feedback log.
+
+Requests only append events to an in-memory buffer. A background task
+flushes it every FLUSH_INTERVAL seconds, as one batched insert into the
+recommendation_events table or, when VET_EVENTS_DIR is set, as one gzip
+member appended to a rotating NDJSON file. If the buffer fills up between
+flushes the oldest events are dropped rather than slowing requests down.
+
+    VET_EVENTS_DIR      write gzip NDJSON files here instead of the database
+    VET_EVENTS_FILE_MB  rotate files at this compressed size (default 64)
+
+Export impressions labelled with whether they got an action, as training
+data for app.ml.ranking:
+
+    python -m app.events --out feedback.ndjson [--dir EVENTS_DIR]
+"""
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal, engine, init_db
+from app.models import RecommendationEvent, Review
+from app.ml.ranking import FEATURES, feature_row
+
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = ('distance_score', 'service_match_score', 'rating_score', 'price_match_score', 'emergency_score')
+
+FLUSH_INTERVAL = 1.0
+MAX_BUFFER = 100_000
+
+class DatabaseSink:
+    """Batched inserts into the recommendation_events table"""
+
+    def write(self, events: list):
+        rows = [{**event, 'payload': json.dumps(event['payload']) if event['payload'] else None} for event in events]
+        with engine.begin() as conn:
+            conn.execute(insert(RecommendationEvent.__table__), rows)
+
+class NdjsonSink:
+    """Rotating gzip NDJSON files, one per process at a time"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._path = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _current_path(self) -> str:
+        if self._path is None or os.path.getsize(self._path) >= self.max_bytes:
+            name = f"events-{datetime.utcnow():%Y%m%d-%H%M%S}-{os.getpid()}.ndjson.gz"
+            self._path = os.path.join(self.directory, name)
+        return self._path
+
+    def write(self, events: list):
+        lines = "".join(
+            json.dumps({**event, 'created_at': event['created_at'].isoformat()}) + "\n" for event in events
+        )
+        # Each flush appends a gzip member; readers see one continuous stream
+        with gzip.open(self._current_path(), 'at', encoding='utf-8') as f:
+            f.write(lines)
+
+def default_sink():
+    directory = os.environ.get('VET_EVENTS_DIR')
+    if directory:
+        return NdjsonSink(directory, int(float(os.environ.get('VET_EVENTS_FILE_MB', 64)) * 1024 * 1024))
+    return DatabaseSink()
+
+class EventLog:
+    """In-memory event buffer drained by flush()"""
+
+    def __init__(self, sink=None, max_buffer: int = MAX_BUFFER):
+        self.sink = sink or default_sink()
+        self._buffer = deque(maxlen=max_buffer)
+        self.dropped = 0
+
+    def record(self, event_type: str, request_id: str, vet_id: int, position: int = None, payload: dict = None):
+        """Buffer one event; payloads are serialized at flush time"""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append({
+            'event_type': event_type,
+            'request_id': request_id,
+            'vet_id': vet_id,
+            'position': position,
+            'payload': payload,
+            'created_at': datetime.utcnow(),
+        })
+
+    def record_impressions(self, request_id: str, recommendations: list, ranking: str, review_counts: dict):
+        """One impression per recommended vet, with the scores it was ranked by and its review count at the time"""
+        for position, recommendation in enumerate(recommendations, 1):
+            payload = {field: recommendation[field] for field in SCORE_FIELDS}
+            payload['ranking'] = ranking
+            payload['review_count'] = review_counts.get(recommendation['vet_id'], 0)
+            self.record('impression', request_id, recommendation['vet_id'], position, payload)
+
+    def drain(self) -> list:
+        events = []
+        while True:
+            try:
+                events.append(self._buffer.popleft())
+            except IndexError:
+                return events
+
+    def flush(self) -> int:
+        """Write all buffered events to the sink; returns how many were written"""
+        events = self.drain()
+        if self.dropped:
+            logger.warning(f"Event buffer was full, dropped {self.dropped} events")
+            self.dropped = 0
+        if not events:
+            return 0
+        try:
+            self.sink.write(events)
+        except Exception as e:
+            logger.error(f"Could not write {len(events)} recommendation events: {e}")
+            return 0
+        return len(events)
+
+    async def run(self, interval: float = FLUSH_INTERVAL):
+        """Flush periodically, off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.flush)
+
+event_log = EventLog()
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run the event flusher for the lifetime of the app, flushing what is left at shutdown"""
+    task = asyncio.create_task(event_log.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        event_log.flush()
+
+def read_events(directory: str = None):
+    """All logged events, from NDJSON files in directory or else from the database"""
+    if directory:
+        for path in sorted(glob.glob(os.path.join(directory, "events-*.ndjson.gz"))):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return
+    with engine.connect() as conn:
+        for row in conn.execute(RecommendationEvent.__table__.select().order_by(RecommendationEvent.id)):
+            event = dict(row._mapping)
+            event['payload'] = json.loads(event['payload']) if event['payload'] else None
+            yield event
+
+def training_rows(events, review_counts: dict):
+    """Ranking feedback rows: each impression labelled 1 if the user acted on that vet.
+    
+    Features use the review count recorded with the impression, so reviews
+    written after it do not leak into training. Impressions logged before
+    counts were recorded fall back to review_counts (current counts).
+    """
+    impressions, acted = [], set()
+    for event in events:
+        if event['event_type'] == 'impression':
+            impressions.append(event)
+        else:
+            acted.add((event['request_id'], event['vet_id']))
+    for event in impressions:
+        review_count = event['payload'].get('review_count')
+        if review_count is None:
+            review_count = review_counts.get(event['vet_id'], 0)
+        row = feature_row(event['payload'], review_count)
+        yield {
+            'features': dict(zip(FEATURES, row)),
+            'label': int((event['request_id'], event['vet_id']) in acted),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help='feedback NDJSON file to write')
+    parser.add_argument('--dir', help='read events from this VET_EVENTS_DIR instead of the database')
+    args = parser.parse_args(argv)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        review_counts = dict(db.query(Review.vet_id, func.count(Review.id)).group_by(Review.vet_id).all())
+    finally:
+        db.close()
+
+    written = positives = 0
+    with open(args.out, 'w') as f:
+        for row in training_rows(read_events(args.dir), review_counts):
+            f.write(json.dumps(row) + "\n")
+            written += 1
+            positives += row['label']
+    print(f"Wrote {written} impressions ({positives} with an action) to {args.out}")
+
+if __name__ == '__main__':
+    main()
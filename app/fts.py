@@ -0,0 +1,179 @@
+"""SQLite FTS5 full-text indexes over the API vets and the Streamlit clinics.
+
+Each vet/clinic is one FTS document (rowid = its id) holding its name,
+address, description, services and (for vets) review text. Triggers on
+the source tables rebuild a document whenever anything it is built from
+changes, so the index never needs a separate sync job. Bulk loads pause
+the triggers and rebuild the index once instead (see bulk_load).
+"""
+from contextlib import contextmanager
+import logging
+import re
+
+from app.migrations import get_table_columns
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+# Words that carry no meaning for matching ("cat dentist near me")
+STOPWORDS = {
+    'a', 'an', 'and', 'at', 'by', 'for', 'in', 'me', 'my', 'near', 'nearby', 'of', 'on', 'or',
+    'the', 'to', 'with', 'close', 'around', 'best', 'good',
+}
+
+# Searchable words for the boolean service flags of the API schema
+SERVICE_FLAG_TERMS = {
+    'hotel_cats': 'cat hotel boarding',
+    'hotel_dogs': 'dog hotel boarding',
+    'grooming': 'grooming',
+    'wild_animals': 'wild animals exotic',
+    'surgery': 'surgery',
+    'vaccination': 'vaccination vaccines',
+    'dental_care': 'dental care dentist',
+}
+
+# bm25 column weights, in column order
+VET_WEIGHTS = (10.0, 2.0, 3.0, 5.0, 1.0)     # name, address, description, services, reviews
+CLINIC_WEIGHTS = (10.0, 2.0, 5.0, 3.0)       # name, address, services, equipment
+
+def match_query(text: str):
+    """FTS5 MATCH expression requiring every meaningful word as a prefix, or None"""
+    words = [word for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS]
+    if not words:
+        return None
+    return " AND ".join(f'"{word}"*' for word in words)
+
+def fts5_available(conn) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except Exception:
+        return False
+
+def _install(conn, table, columns, document_sql, triggers, required_columns):
+    """Create an FTS5 table, its sync triggers and fill it.
+
+    document_sql(ref) returns the statements rebuilding the document of
+    row id ref (all documents for None); triggers is a list of
+    (name, event, refs), and refs may be empty for a plain delete.
+    """
+    for source, column in required_columns:
+        if column not in get_table_columns(conn, source):
+            # Another schema owns a table of this name in the same database file
+            logger.warning(f"Not indexing {table}: {source} has no {column} column")
+            return
+    if not fts5_available(conn):
+        logger.warning(f"Not indexing {table}: SQLite was built without FTS5")
+        return
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            {', '.join(columns)}, tokenize='{TOKENIZER}', prefix='2 3'
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS fts_sync (name TEXT PRIMARY KEY, paused INTEGER NOT NULL DEFAULT 0)")
+    conn.execute("INSERT OR IGNORE INTO fts_sync (name) VALUES (?)", (table,))
+
+    guard = f"coalesce((SELECT paused FROM fts_sync WHERE name = '{table}'), 0) = 0"
+    for name, trigger_event, refs in triggers:
+        body = "\n".join(document_sql(ref) for ref in refs) or f"DELETE FROM {table} WHERE rowid = OLD.id;"
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(f"CREATE TRIGGER {name} AFTER {trigger_event} WHEN {guard} BEGIN\n{body}\nEND")
+
+    rebuild(conn, table)
+
+def _service_text_sql():
+    flags = " || ".join(
+        f"CASE WHEN s.{flag} THEN ' {terms}' ELSE '' END" for flag, terms in SERVICE_FLAG_TERMS.items()
+    )
+    return f"coalesce(s.condition, '') || ' ' || coalesce(s.equipment, '') || ' ' || coalesce(s.special_food, '') || {flags}"
+
+def _vet_document_sql(ref):
+    where = f"WHERE v.id = {ref}" if ref else ""
+    delete = f"DELETE FROM vets_fts WHERE rowid = {ref};" if ref else ""
+    return f"""{delete}
+        INSERT INTO vets_fts (rowid, name, address, description, services, reviews)
+        SELECT v.id, v.name, coalesce(v.address, ''), coalesce(v.description, ''),
+               coalesce((SELECT group_concat({_service_text_sql()}, ' ') FROM services s WHERE s.vet_id = v.id), ''),
+               coalesce((SELECT group_concat(r.text, ' ') FROM reviews r WHERE r.vet_id = v.id), '')
+        FROM vets v {where};"""
+
+def install_vets_fts(conn):
+    """Index API vets with their services and review text"""
+    _install(
+        conn, 'vets_fts', ['name', 'address', 'description', 'services', 'reviews'], _vet_document_sql,
+        [
+            ('vets_fts_vet_insert', 'INSERT ON vets', ['NEW.id']),
+            ('vets_fts_vet_update', 'UPDATE OF name, address, description ON vets', ['NEW.id']),
+            ('vets_fts_vet_delete', 'DELETE ON vets', []),
+            ('vets_fts_service_insert', 'INSERT ON services', ['NEW.vet_id']),
+            ('vets_fts_service_update', 'UPDATE ON services', ['OLD.vet_id', 'NEW.vet_id']),
+            ('vets_fts_service_delete', 'DELETE ON services', ['OLD.vet_id']),
+            ('vets_fts_review_insert', 'INSERT ON reviews', ['NEW.vet_id']),
+            ('vets_fts_review_update', 'UPDATE OF text, vet_id ON reviews', ['OLD.vet_id', 'NEW.vet_id']),
+            ('vets_fts_review_delete', 'DELETE ON reviews', ['OLD.vet_id']),
+        ],
+        [('services', 'vet_id'), ('reviews', 'vet_id')]
+    )
+
+def _clinic_document_sql(ref):
+    where = f"WHERE c.id = {ref}" if ref else ""
+    delete = f"DELETE FROM clinics_fts WHERE rowid = {ref};" if ref else ""
+    return f"""{delete}
+        INSERT INTO clinics_fts (rowid, name, address, services, equipment)
+        SELECT c.id, c.name, coalesce(c.address, ''),
+               coalesce((SELECT group_concat(s.service_name, ' ') FROM services s WHERE s.clinic_id = c.id), ''),
+               coalesce((SELECT group_concat(e.equipment_name, ' ') FROM equipment e WHERE e.clinic_id = c.id), '')
+        FROM clinics c {where};"""
+
+def install_clinics_fts(conn):
+    """Index Streamlit clinics with their services and equipment"""
+    _install(
+        conn, 'clinics_fts', ['name', 'address', 'services', 'equipment'], _clinic_document_sql,
+        [
+            ('clinics_fts_clinic_insert', 'INSERT ON clinics', ['NEW.id']),
+            ('clinics_fts_clinic_update', 'UPDATE OF name, address ON clinics', ['NEW.id']),
+            ('clinics_fts_clinic_delete', 'DELETE ON clinics', []),
+            ('clinics_fts_service_insert', 'INSERT ON services', ['NEW.clinic_id']),
+            ('clinics_fts_service_update', 'UPDATE ON services', ['OLD.clinic_id', 'NEW.clinic_id']),
+            ('clinics_fts_service_delete', 'DELETE ON services', ['OLD.clinic_id']),
+            ('clinics_fts_equipment_insert', 'INSERT ON equipment', ['NEW.clinic_id']),
+            ('clinics_fts_equipment_update', 'UPDATE ON equipment', ['OLD.clinic_id', 'NEW.clinic_id']),
+            ('clinics_fts_equipment_delete', 'DELETE ON equipment', ['OLD.clinic_id']),
+        ],
+        [('services', 'clinic_id'), ('equipment', 'clinic_id')]
+    )
+
+DOCUMENTS = {
+    'vets_fts': _vet_document_sql,
+    'clinics_fts': _clinic_document_sql,
+}
+
+def rebuild(conn, table):
+    """Rebuild every document of an FTS index from its source tables"""
+    conn.execute(f"DELETE FROM {table}")
+    conn.execute(DOCUMENTS[table](None))
+
+@contextmanager
+def bulk_load(conn, table):
+    """Pause trigger sync of an FTS index during a bulk load, then rebuild it once and commit.
+
+    Rebuilding per row from triggers makes large restores an order of
+    magnitude slower. Does nothing if the index is not installed.
+    """
+    installed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    if not installed:
+        yield
+        return
+
+    conn.execute("UPDATE fts_sync SET paused = 1 WHERE name = ?", (table,))
+    try:
+        yield
+    finally:
+        conn.execute("UPDATE fts_sync SET paused = 0 WHERE name = ?", (table,))
+        rebuild(conn, table)
+        conn.commit()
@@ -0,0 +1 @@
+"""Geographic filtering: administrative districts and polygon queries over vet locations"""
@@ -0,0 +1,141 @@
+"""Administrative districts from a local GeoPackage.
+
+    VET_DISTRICTS_FILE   GeoPackage (or any format pyogrio reads) with district polygons
+    VET_DISTRICTS_LAYER  layer to read (default: the first one)
+    VET_DISTRICTS_FIELD  attribute holding the district name (default: name)
+
+Each vet's district is stored in vets.district. It is filled for all vets
+by one STRtree spatial join when the boundaries are first loaded, and on
+every write that sets coordinates, so district filters are plain indexed
+equality lookups. After replacing the boundaries file, re-assign everyone:
+
+    python -m app.geo.districts --reassign
+"""
+import argparse
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Vet
+
+logger = logging.getLogger(__name__)
+
+class DistrictIndex:
+    """District polygons (WGS84) with an STRtree for point lookups"""
+
+    def __init__(self, names: list, geometries: list):
+        from shapely import STRtree
+        
+        self.names = names
+        self.geometries = geometries
+        self._by_name = dict(zip(names, geometries))
+        self._tree = STRtree(geometries)
+
+    def geometry(self, name: str):
+        return self._by_name.get(name)
+
+    def locate_many(self, lats, lons) -> list:
+        """District name of each point (None outside all districts; the first listed wins on shared borders)"""
+        import shapely
+        
+        points = shapely.points(lons, lats)
+        found = [None] * len(points)
+        point_index, district_index = self._tree.query(points, predicate='intersects')
+        for point, district in sorted(zip(point_index.tolist(), district_index.tolist()), reverse=True):
+            found[point] = self.names[district]
+        return found
+
+    def locate(self, lat: float, lon: float) -> Optional[str]:
+        return self.locate_many([lat], [lon])[0]
+
+def load_districts(path: str, layer: str = None, name_field: str = 'name') -> DistrictIndex:
+    """Read district polygons, reprojected to WGS84"""
+    import geopandas
+
+    frame = geopandas.read_file(path, layer=layer, engine='pyogrio')
+    if name_field not in frame.columns:
+        raise ValueError(f"{path} has no '{name_field}' attribute (columns: {', '.join(frame.columns)})")
+    if frame.crs is not None and frame.crs.to_epsg() != 4326:
+        frame = frame.to_crs(epsg=4326)
+    frame = frame[frame.geometry.notna() & ~frame.geometry.is_empty]
+    return DistrictIndex(frame[name_field].astype(str).tolist(), list(frame.geometry))
+
+_districts = None
+_districts_loaded = False
+_assigned = False
+_lock = threading.Lock()
+
+def get_districts() -> Optional[DistrictIndex]:
+    """The VET_DISTRICTS_FILE boundaries, loaded on first use (None if not configured)"""
+    global _districts, _districts_loaded
+    if not _districts_loaded:
+        with _lock:
+            if not _districts_loaded:
+                path = os.environ.get('VET_DISTRICTS_FILE')
+                if path:
+                    try:
+                        _districts = load_districts(
+                            path, os.environ.get('VET_DISTRICTS_LAYER'), os.environ.get('VET_DISTRICTS_FIELD', 'name')
+                        )
+                        logger.info(f"Loaded {len(_districts.names)} districts from {path}")
+                    except Exception as e:
+                        logger.error(f"Could not load districts from {path}: {e}")
+                _districts_loaded = True
+    return _districts
+
+def assign_districts(db: Session, districts: DistrictIndex, only_missing: bool = True) -> int:
+    """Spatially join vets to districts in one bulk STRtree query and store the result"""
+    query = db.query(Vet.id, Vet.location_lat, Vet.location_lon, Vet.district)
+    if only_missing:
+        query = query.filter(Vet.district.is_(None))
+    rows = query.all()
+    if not rows:
+        return 0
+    names = districts.locate_many([row.location_lat for row in rows], [row.location_lon for row in rows])
+    changes = [{'id': row.id, 'district': name} for row, name in zip(rows, names) if name != row.district]
+    if changes:
+        db.bulk_update_mappings(Vet, changes)
+        db.commit()
+    return len(changes)
+
+def ensure_districts(db: Session) -> Optional[DistrictIndex]:
+    """The district index, after assigning unassigned vets once per process"""
+    global _assigned
+    districts = get_districts()
+    if districts is not None and not _assigned:
+        with _lock:
+            if not _assigned:
+                assigned = assign_districts(db, districts)
+                if assigned:
+                    logger.info(f"Assigned {assigned} vets to districts")
+                _assigned = True
+    return districts
+
+def district_of(lat: float, lon: float) -> Optional[str]:
+    """District of a point, or None without boundaries or outside all districts"""
+    districts = get_districts()
+    return districts.locate(lat, lon) if districts else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reassign', action='store_true', help='recompute the district of every vet')
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal, init_db
+
+    districts = get_districts()
+    if districts is None:
+        parser.error("set VET_DISTRICTS_FILE to a readable boundaries file")
+    init_db()
+    db = SessionLocal()
+    try:
+        changed = assign_districts(db, districts, only_missing=not args.reassign)
+    finally:
+        db.close()
+    print(f"Updated the district of {changed} vets")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Polygon filters over vet locations.
+
+Vet points are kept in an STRtree, so a polygon query only tests the
+points whose bounding boxes it overlaps, against the polygon prepared once
+per query (shapely prepares the query geometry of predicate queries).
+"""
+import json
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.http_cache import get_data_version
+from app.models import Vet
+
+def parse_polygon(text: str):
+    """A (Multi)Polygon from WKT or GeoJSON (geometry or Feature) in lon/lat order; ValueError if invalid"""
+    import shapely
+    from shapely.geometry import shape
+    
+    text = text.strip()
+    try:
+        if text.startswith('{'):
+            data = json.loads(text)
+            geometry = shape(data.get('geometry', data))
+        else:
+            geometry = shapely.from_wkt(text)
+    except Exception as e:
+        raise ValueError(f"Invalid polygon: {e}")
+    if geometry.geom_type not in ('Polygon', 'MultiPolygon') or geometry.is_empty:
+        raise ValueError(f"Expected a Polygon or MultiPolygon, got {geometry.geom_type}")
+    if not geometry.is_valid:
+        raise ValueError(f"Invalid polygon: {shapely.is_valid_reason(geometry)}")
+    return geometry
+
+class VetPointIndex:
+    """STRtree over vet locations, rebuilt on first use after the location version changes"""
+
+    def __init__(self):
+        # (location version, ids, tree), replaced as a whole
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, db: Session) -> tuple:
+        """(ids, tree) for the current location version, so vets added or moved by other processes show up too"""
+        version = get_data_version(db, 'location_version')
+        loaded = self._loaded
+        if loaded is not None and loaded[0] == version:
+            return loaded[1:]
+        with self._lock:
+            loaded = self._loaded
+            if loaded is not None and loaded[0] == version:
+                return loaded[1:]
+            import shapely
+            from shapely import STRtree
+            
+            rows = db.query(Vet.id, Vet.location_lat, Vet.location_lon).all()
+            ids = np.array([row.id for row in rows], dtype=np.int64)
+            tree = STRtree(shapely.points([row.location_lon for row in rows], [row.location_lat for row in rows]))
+            self._loaded = (version, ids, tree)
+            return ids, tree
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = None
+
+    def within(self, db: Session, geometry) -> set:
+        """Ids of the vets inside (or on the border of) a geometry"""
+        ids, tree = self.ensure_loaded(db)
+        return set(ids[tree.query(geometry, predicate='intersects')].tolist())
+
+vet_points = VetPointIndex()
@@ -0,0 +1,68 @@
+"""ETags and conditional GET based on a data version counter.
+
+Every API write bumps the counter in the data_version table (in the same
+transaction), so an ETag built from it and the request URL stays valid
+until anything changes. Caches that only depend on part of the data key
+on a narrower counter of the same row (VERSION_COUNTERS), bumped only by
+the writes that change that part.
+"""
+from datetime import datetime
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.ml.hours import LOCAL_TIMEZONE, minute_of_week
+
+# Suffixes app.compression adds to ETags of compressed responses
+ENCODING_SUFFIXES = ('-br', '-gzip')
+
+# Narrower counters: the vet set and vet coordinates; the columns of the vet snapshot
+# (app.ml.snapshot); working hours
+VERSION_COUNTERS = ('location_version', 'scoring_version', 'hours_version')
+
+def get_data_version(db: Session, counter: str = 'version') -> int:
+    """The data version, or one of the VERSION_COUNTERS"""
+    if counter != 'version' and counter not in VERSION_COUNTERS:
+        raise ValueError(f"Unknown version counter: {counter}")
+    return db.execute(text(f"SELECT {counter} FROM data_version WHERE id = 1")).scalar() or 0
+
+def bump_data_version(db: Session, *counters: str):
+    """Invalidate all ETags, and the caches keyed on the given VERSION_COUNTERS; call before committing a write"""
+    unknown = [counter for counter in counters if counter not in VERSION_COUNTERS]
+    if unknown:
+        raise ValueError(f"Unknown version counter: {', '.join(unknown)}")
+    assignments = ', '.join(f"{counter} = {counter} + 1" for counter in ('version', *counters))
+    db.execute(text(f"UPDATE data_version SET {assignments} WHERE id = 1"))
+
+def make_etag(version: int, request: Request) -> str:
+    key = f"{version}:{request.url.path}?{request.url.query}"
+    # open_now answers depend on the clock as well as the data
+    if request.query_params.get('open_now', '').lower() in ('1', 'true', 'yes', 'on'):
+        key += f":{minute_of_week(datetime.now(LOCAL_TIMEZONE))}"
+    return f'"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+def _strip_encoding(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+def conditional_get(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Dependency answering 304 when If-None-Match matches the current ETag"""
+    etag = make_etag(get_data_version(db), request)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        for candidate in if_none_match.split(','):
+            if candidate.strip() == '*' or _strip_encoding(candidate) == etag:
+                # Echo the tag the client holds, which may carry an encoding suffix
+                raise HTTPException(status_code=304, headers={**headers, 'ETag': candidate.strip()})
+
+    response.headers.update(headers)
@@ -0,0 +1,478 @@
+"""Translation catalog for the English/Bulgarian interface.
+
+The catalog is compiled once at import into flat per-language lookup
+dicts, including service/equipment name maps in both directions, so
+translating a rendered list is a plain dict lookup per item. Additional
+languages can be loaded from JSON files.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = 'en'
+
+TRANSLATIONS = {
+    'en': {
+        # Page titles
+        'app_title': 'Sofia Vet Platform',
+        'app_subtitle': 'Find the best veterinary clinic for your pet',
+        'navigation': 'Navigation',
+        'search_clinics': 'Search Clinics',
+        'add_clinic': 'Add Clinic',
+        'add_review': 'Add Review',
+        'view_all_clinics': 'View All Clinics',
+        
+        # AI Recommendations page
+        'ai_recommendations': 'AI Recommendations',
+        'ai_recommendations_header': 'AI-Powered Clinic Recommendations',
+        'ai_recommendations_subtitle': 'Get personalized clinic recommendations based on your needs',
+        'your_preferences': 'Your Preferences',
+        'match_score': 'Match Score',
+        'score_breakdown': 'Score Breakdown',
+        'distance_score': 'Distance Score',
+        'service_match': 'Service Match',
+        'rating_score': 'Rating Score',
+        'price_match': 'Price Match',
+        'emergency_score': 'Emergency Score',
+        'get_recommendations': 'Get Recommendations',
+        'top_recommendations': 'Top Recommendations for You',
+        'showing_results': 'Showing top {count} matches',
+        'no_recommendations': 'No clinics found matching your criteria. Try adjusting your preferences.',
+        'recommendation_for': 'Recommendation #{num}',
+        'overall_match': 'Overall Match',
+        'why_recommended': 'Why This Clinic?',
+        'max_price_pref': 'Maximum Price Preference',
+        'any_price': 'Any Price',
+        
+        # Search page
+        'search_header': 'Search for Veterinary Clinics',
+        'your_location': 'Your Location (Optional)',
+        'location_help': 'Enter your location to find the nearest clinics and see distances',
+        'your_latitude': 'Your Latitude',
+        'your_longitude': 'Your Longitude',
+        'max_distance': 'Max Distance (km)',
+        'search_by_location': 'Search by location (find nearest clinics)',
+        'search_filters': 'Search Filters',
+        'quick_searches': 'Quick Searches (Click to auto-fill)',
+        'common_searches': 'Common Searches:',
+        'hotels_btn': 'Hotels',
+        'vaccination_btn': 'Vaccination',
+        'diagnostics_btn': 'Diagnostics',
+        'emergency_btn': 'Emergency',
+        'services': 'Services',
+        'equipment': 'Equipment',
+        'available': 'available',
+        'select_services': 'Select services (leave empty for all)',
+        'select_equipment': 'Select equipment (leave empty for all)',
+        'service_help': 'Select one or more services you\'re looking for',
+        'equipment_help': 'Select equipment the clinic should have',
+        'text_search': 'Search by name, address, service or equipment',
+        'text_search_placeholder': 'e.g. cat hotel lozenets',
+        'did_you_mean': 'Did you mean:',
+        'emergency_care': 'Emergency Care',
+        'inpatient_care': 'Inpatient Care',
+        'wild_animal_care': 'Wild Animal Care',
+        'minimum_rating': 'Minimum rating',
+        'search_btn': 'Search',
+        'clear_btn': 'Clear',
+        'found_clinics': 'Found {count} clinic(s)',
+        'active_filters': 'Active Filters:',
+        'rating_filter': 'Rating',
+        'clinic_locations': 'Clinic Locations',
+        'clinic_details': 'Clinic Details',
+        'no_clinics_found': 'No clinics found matching your criteria',
+        'adjust_filters': 'Try adjusting your search filters or expanding the search radius.',
+        'use_search_filters': 'Use the search filters above and click \'Search\' to find veterinary clinics',
+        'km_away': '{distance:.2f} km away',
+        'your_location_marker': 'Your Location',
+        'you_are_here': 'You are here',
+        
+        # Clinic details
+        'contact_info': 'Contact Information',
+        'address': 'Address',
+        'phone': 'Phone',
+        'email': 'Email',
+        'location': 'Location',
+        'coordinates': 'Coordinates',
+        'distance_from_you': 'Distance from you',
+        'services_offered': 'Services Offered',
+        'equipment_available': 'Equipment Available',
+        'lab_tests': 'Laboratory Tests',
+        'not_specified': 'Not specified',
+        'and_more': '...and {count} more',
+        'standard_care': 'Standard Care',
+        
+        # Add clinic page
+        'register_clinic': 'Register New Clinic',
+        'basic_info': 'Basic Information',
+        'clinic_name': 'Clinic Name*',
+        'clinic_name_placeholder': 'e.g., Sofia Pet Care',
+        'address_placeholder': 'e.g., 123 Iveto St, Sofia',
+        'phone_placeholder': 'e.g., +359 2 123 4567',
+        'email_placeholder': 'e.g., info@sofiavetcare.com',
+        'latitude': 'Latitude',
+        'longitude': 'Longitude',
+        'care_types': 'Care Types Available',
+        'services_offered_label': 'Services Offered',
+        'other_services': 'Other Services (comma-separated)',
+        'other_services_placeholder': 'e.g., behavioral training, nutritional counseling',
+        'equipment_available_label': 'Equipment Available',
+        'other_equipment': 'Other Equipment (comma-separated)',
+        'other_equipment_placeholder': 'e.g., ECG machine, anesthesia machine',
+        'lab_tests_label': 'Laboratory Tests Available',
+        'lab_tests_placeholder': 'Blood tests\nUrine analysis\nFecal examination\nBiochemistry panel\nX-ray imaging\nUltrasound diagnostics',
+        
+        # Service name translations
+        'service_cat_hotel': 'Cat Hotel',
+        'service_dog_hotel': 'Dog Hotel',
+        'service_grooming': 'Grooming',
+        'service_deworming': 'Deworming',
+        'service_prophylaxis': 'Prophylaxis',
+        'service_dental_care': 'Dental Care',
+        'service_surgery': 'Surgery',
+        'service_vaccination': 'Vaccination',
+        'service_ophthalmology': 'Ophthalmology',
+        'service_microchipping': 'Microchipping',
+        'service_travel_documents': 'Travel Documents',
+        
+        # Equipment name translations
+        'equipment_xray': 'X-Ray',
+        'equipment_ultrasound': 'Ultrasound',
+        'equipment_incubator': 'Incubator',
+        'equipment_oxygen': 'Oxygen Machine',
+        'register_btn': 'Register Clinic',
+        'clinic_registered': 'Clinic \'{name}\' registered successfully!',
+        'added_items': 'Added {services} services, {equipment} equipment items, and {tests} lab tests.',
+        'fill_required': 'Please fill in all required fields (marked with *)',
+        'registration_error': 'Error registering clinic: {error}',
+        'check_db': 'Please check if the database has the correct structure. Try deleting vet_platform.db and restart the app.',
+        
+        # Review page
+        'add_review_header': 'Add a Review',
+        'select_clinic': 'Select Clinic',
+        'rating': 'Rating',
+        'price_rating': 'Price Rating',
+        'price_rating_help': 'How expensive is this clinic?',
+        'price_cheap': '$ - Affordable',
+        'price_moderate': '$$ - Moderate',
+        'price_expensive': '$$$ - Expensive',
+        'your_review': 'Your review',
+        'review_placeholder': 'Share your experience...',
+        'submit_review': 'Submit Review',
+        'review_submitted': 'Review submitted successfully!',
+        'no_clinics_yet': 'No clinics available yet. Please add a clinic first.',
+        
+        # View all page
+        'all_clinics_header': 'All Registered Clinics',
+        'clinics_list': 'Clinics List',
+        'clinic_name_col': 'Clinic Name',
+        'address_col': 'Address',
+        'phone_col': 'Phone',
+        'rating_col': 'Rating',
+        'care_types_col': 'Care Types Available',
+        'detailed_info': 'Detailed Clinic Information',
+        'select_clinic_details': 'Select a clinic to view details:',
+        'clinic_location': 'Clinic Location',
+        'platform_stats': 'Platform Statistics',
+        'total_clinics': 'Total Clinics',
+        'average_rating': 'Average Rating',
+        'emergency_clinics': 'Emergency Clinics',
+        'inpatient_clinics': 'Inpatient Care',
+        'no_clinics_registered': 'No clinics registered yet. Add your first clinic!',
+        
+        # Backup features
+        'backup_restore': 'Backup & Restore',
+        'download_backup': 'Download Database Backup',
+        'upload_backup': 'Upload Database Backup',
+        'backup_success': 'Database backed up successfully!',
+        'restore_success': 'Database restored successfully!',
+        'restore_error': 'Error restoring database',
+        
+        # About
+        'about': 'About',
+        'about_text': 'Sofia Vet Platform - Find the best veterinary care for your pet. Search clinics by services, location, and ratings.',
+    },
+    'bg': {
+        # Page titles
+        'app_title': 'София Вет Платформа',
+        'app_subtitle': 'Намерете най-добрата ветеринарна клиника за вашия любимец',
+        'navigation': 'Навигация',
+        'search_clinics': 'Търсене на клиники',
+        'add_clinic': 'Добави клиника',
+        'add_review': 'Добави отзив',
+        'view_all_clinics': 'Всички клиники',
+        
+        # AI Recommendations page
+        'ai_recommendations': 'AI Препоръки',
+        'ai_recommendations_header': 'AI препоръки за клиники',
+        'ai_recommendations_subtitle': 'Получете персонализирани препоръки за клиники според вашите нужди',
+        'your_preferences': 'Вашите предпочитания',
+        'match_score': 'Съвпадение',
+        'score_breakdown': 'Разбивка на оценката',
+        'distance_score': 'Оценка за разстояние',
+        'service_match': 'Съвпадение на услуги',
+        'rating_score': 'Оценка на рейтинг',
+        'price_match': 'Ценово съвпадение',
+        'emergency_score': 'Оценка за спешност',
+        'get_recommendations': 'Вземи препоръки',
+        'top_recommendations': 'Топ препоръки за вас',
+        'showing_results': 'Показване на топ {count} резултата',
+        'no_recommendations': 'Не са намерени клиники, отговарящи на критериите. Опитайте да промените предпочитанията си.',
+        'recommendation_for': 'Препоръка #{num}',
+        'overall_match': 'Общо съвпадение',
+        'why_recommended': 'Защо тази клиника?',
+        'max_price_pref': 'Максимално ценово предпочитание',
+        'any_price': 'Всяка цена',
+        
+        # Search page
+        'search_header': 'Търсене на ветеринарни клиники',
+        'your_location': 'Вашето местоположение (по избор)',
+        'location_help': 'Въведете вашето местоположение, за да намерите най-близките клиники и да видите разстоянията',
+        'your_latitude': 'Вашата географскаширина',
+        'your_longitude': 'Вашата географска дължина',
+        'max_distance': 'Макс. разстояние (км)',
+        'search_by_location': 'Търсене по местоположение (намери най-близки клиники)',
+        'search_filters': 'Филтри за търсене',
+        'quick_searches': 'Бързо търсене (Кликнете за автоматично попълване)',
+        'common_searches': 'Често търсени:',
+        'hotels_btn': 'Хотели',
+        'vaccination_btn': 'Ваксинация',
+        'diagnostics_btn': 'Диагностика',
+        'emergency_btn': 'Спешни',
+        'services': 'Услуги',
+        'equipment': 'Оборудване',
+        'available': 'налични',
+        'select_services': 'Изберете услуги (оставете празно за всички)',
+        'select_equipment': 'Изберете оборудване (оставете празно за всички)',
+        'service_help': 'Изберете една или повече услуги, които търсите',
+        'equipment_help': 'Изберете оборудването, което клиниката трябва да има',
+        'text_search': 'Търсене по име, адрес, услуга или оборудване',
+        'text_search_placeholder': 'напр. cat hotel лозенец',
+        'did_you_mean': 'Имахте предвид:',
+        'emergency_care': 'Спешна помощ',
+        'inpatient_care': 'Болнична грижа',
+        'wild_animal_care': 'Грижа за диви животни',
+        'minimum_rating': 'Минимална оценка',
+        'search_btn': 'Търси',
+        'clear_btn': 'Изчисти',
+        'found_clinics': 'Намерени {count} клиники',
+        'active_filters': 'Активни филтри:',
+        'rating_filter': 'Оценка',
+        'clinic_locations': 'Местоположения на клиники',
+        'clinic_details': 'Детайли за клиниките',
+        'no_clinics_found': 'Не са намерени клиники, отговарящи на критериите',
+        'adjust_filters': 'Опитайте да промените филтрите за търсене или да увеличите радиуса на търсене.',
+        'use_search_filters': 'Използвайте филтрите по-горе и натиснете \'Търси\', за да намерите ветеринарни клиники',
+        'km_away': '{distance:.2f} км разстояние',
+        'your_location_marker': 'Вашето местоположение',
+        'you_are_here': 'Вие сте тук',
+        
+        # Clinic details
+        'contact_info': 'Информация за контакт',
+        'address': 'Адрес',
+        'phone': 'Телефон',
+        'email': 'Имейл',
+        'location': 'Местоположение',
+        'coordinates': 'Координати',
+        'distance_from_you': 'Разстояние от вас',
+        'services_offered': 'Предлагани услуги',
+        'equipment_available': 'Налично оборудване',
+        'lab_tests': 'Лабораторни изследвания',
+        'not_specified': 'Не е посочено',
+        'and_more': '...и още {count}',
+        'standard_care': 'Стандартна грижа',
+        
+        # Add clinic page
+        'register_clinic': 'Регистрирай нова клиника',
+        'basic_info': 'Основна информация',
+        'clinic_name': 'Име на клиниката*',
+        'clinic_name_placeholder': 'напр., София Пет Кеър',
+        'address_placeholder': 'напр., ул. Главна 123, София',
+        'phone_placeholder': 'напр., +359 2 123 4567',
+        'email_placeholder': 'напр., info@sofiavetcare.com',
+        'latitude': 'Географска широчина',
+        'longitude': 'Географска дължина',
+        'care_types': 'Видове грижи',
+        'services_offered_label': 'Предлагани услуги',
+        'other_services': 'Други услуги (разделени със запетая)',
+        'other_services_placeholder': 'напр., поведенческо обучение, хранителни консултации',
+        'equipment_available_label': 'Налично оборудване',
+        'other_equipment': 'Друго оборудване (разделено със запетая)',
+        'other_equipment_placeholder': 'напр., ЕКГ апарат, апарат за анестезия',
+        'lab_tests_label': 'Налични лабораторни изследвания',
+        'lab_tests_placeholder': 'Кръвни изследвания\nУринен анализ\nИзследване на фецес\nБиохимичен панел\nРентгенови снимки\nУлтразвукова диагностика',
+        
+        # Service name translations
+        'service_cat_hotel': 'Котешки хотел',
+        'service_dog_hotel': 'Кучешки хотел',
+        'service_grooming': 'Груминг',
+        'service_deworming': 'Обезпаразитяване',
+        'service_prophylaxis': 'Профилактика',
+        'service_dental_care': 'Дентална грижа',
+        'service_surgery': 'Хирургия',
+        'service_vaccination': 'Ваксинация',
+        'service_ophthalmology': 'Офталмология',
+        'service_microchipping': 'Чипиране',
+        'service_travel_documents': 'Пътни документи',
+        
+        # Equipment name translations
+        'equipment_xray': 'Рентген',
+        'equipment_ultrasound': 'Ултразвук',
+        'equipment_incubator': 'Инкубатор',
+        'equipment_oxygen': 'Кислородна машина',
+        
+        # Additional translations
+        'register_btn': 'Регистрирай клиника',
+        'clinic_registered': 'Клиниката \'{name}\' е регистрирана успешно!',
+        'added_items': 'Добавени {services} услуги, {equipment} единици оборудване и {tests} лабораторни изследвания.',
+        'fill_required': 'Моля, попълнете всички задължителни полета (означени с *)',
+        'registration_error': 'Грешка при регистрация на клиника: {error}',
+        'check_db': 'Моля, проверете дали базата данни има правилната структура. Опитайте да изтриете vet_platform.db и рестартирайте приложението.',
+        
+        # Review page
+        'add_review_header': 'Добави отзив',
+        'select_clinic': 'Изберете клиника',
+        'rating': 'Оценка',
+        'price_rating': 'Ценова категория',
+        'price_rating_help': 'Колко скъпа е тази клиника?',
+        'price_cheap': '$ - Достъпна',
+        'price_moderate': '$$ - Средна',
+        'price_expensive': '$$$ - Скъпа',
+        'your_review': 'Вашият отзив',
+        'review_placeholder': 'Споделете вашия опит...',
+        'submit_review': 'Изпрати отзив',
+        'review_submitted': 'Отзивът е изпратен успешно!',
+        'no_clinics_yet': 'Все още няма налични клиники. Моля, първо добавете клиника.',
+        
+        # View all page
+        'all_clinics_header': 'Всички регистрирани клиники',
+        'clinics_list': 'Списък на клиниките',
+        'clinic_name_col': 'Име на клиниката',
+        'address_col': 'Адрес',
+        'phone_col': 'Телефон',
+        'rating_col': 'Оценка',
+        'care_types_col': 'Налични видове грижи',
+        'detailed_info': 'Подробна информация за клиниката',
+        'select_clinic_details': 'Изберете клиника за детайли:',
+        'clinic_location': 'Местоположение на клиниката',
+        'platform_stats': 'Статистики на платформата',
+        'total_clinics': 'Общо клиники',
+        'average_rating': 'Средна оценка',
+        'emergency_clinics': 'Спешни клиники',
+        'inpatient_clinics': 'Болнична грижа',
+        'no_clinics_registered': 'Все още няма регистрирани клиники. Добавете първата си клиника!',
+        
+        # Backup features
+        'backup_restore': 'Архивиране и възстановяване',
+        'download_backup': 'Изтегли архив на базата данни',
+        'upload_backup': 'Качи архив на базата данни',
+        'backup_success': 'Базата данни е архивирана успешно!',
+        'restore_success': 'Базата данни е възстановена успешно!',
+        'restore_error': 'Грешка при възстановяване на базата данни',
+        
+        # About
+        'about': 'За нас',
+        'about_text': 'София Вет Платформа - Намерете най-добрата ветеринарна грижа за вашия любимец. Търсете клиники по услуги, местоположение и оценки.',
+    }
+}
+
+# English service/equipment names as stored in the database -> translation keys
+SERVICE_KEYS = {
+    'Cat Hotel': 'service_cat_hotel',
+    'Dog Hotel': 'service_dog_hotel',
+    'Grooming': 'service_grooming',
+    'Deworming': 'service_deworming',
+    'Prophylaxis': 'service_prophylaxis',
+    'Dental Care': 'service_dental_care',
+    'Surgery': 'service_surgery',
+    'Vaccination': 'service_vaccination',
+    'Ophthalmology': 'service_ophthalmology',
+    'Microchipping': 'service_microchipping',
+    'Travel Documents': 'service_travel_documents',
+}
+
+EQUIPMENT_KEYS = {
+    'X-Ray': 'equipment_xray',
+    'Ultrasound': 'equipment_ultrasound',
+    'Incubator': 'equipment_incubator',
+    'Oxygen Machine': 'equipment_oxygen',
+}
+
+# Compiled lookup tables, keyed by language code
+_catalog = {}
+_service_names = {}
+_service_english = {}
+_equipment_names = {}
+_equipment_english = {}
+
+def register_language(lang, strings):
+    """Compile a language's strings into the lookup tables.
+
+    Keys missing from strings fall back to English.
+    """
+    TRANSLATIONS[lang] = strings
+    catalog = {**TRANSLATIONS[DEFAULT_LANGUAGE], **strings}
+    _catalog[lang] = catalog
+
+    _service_names[lang] = {name: catalog[key] for name, key in SERVICE_KEYS.items()}
+    _service_english[lang] = {display: name for name, display in _service_names[lang].items()}
+    _equipment_names[lang] = {name: catalog[key] for name, key in EQUIPMENT_KEYS.items()}
+    _equipment_english[lang] = {display: name for name, display in _equipment_names[lang].items()}
+
+def load_language_file(path):
+    """Load an additional language from a JSON file of key -> text.
+
+    The language code is the file name without extension (e.g. de.json).
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        strings = json.load(f)
+    register_language(path.stem, strings)
+    logger.info(f"Loaded language '{path.stem}' from {path}")
+    return path.stem
+
+def load_language_dir(directory):
+    """Load every *.json language file in a directory"""
+    return [load_language_file(path) for path in sorted(Path(directory).glob('*.json'))]
+
+def available_languages():
+    """Language codes with a compiled catalog"""
+    return list(_catalog)
+
+def language_name(lang):
+    """Display name of a language, from its optional 'language_name' string"""
+    return TRANSLATIONS.get(lang, {}).get('language_name', lang)
+
+def t(key, lang=DEFAULT_LANGUAGE, **kwargs):
+    """Translation helper function"""
+    catalog = _catalog.get(lang) or _catalog[DEFAULT_LANGUAGE]
+    text = catalog.get(key, key)
+    if kwargs:
+        return text.format(**kwargs)
+    return text
+
+def translate_service_name(english_name, lang):
+    """Translate service name from English to selected language"""
+    return _service_names.get(lang, {}).get(english_name, english_name)
+
+def translate_equipment_name(english_name, lang):
+    """Translate equipment name from English to selected language"""
+    return _equipment_names.get(lang, {}).get(english_name, english_name)
+
+def service_from_display(display_name, lang):
+    """Map a displayed (translated) service name back to its English name"""
+    return _service_english.get(lang, {}).get(display_name, display_name)
+
+def equipment_from_display(display_name, lang):
+    """Map a displayed (translated) equipment name back to its English name"""
+    return _equipment_english.get(lang, {}).get(display_name, display_name)
+
+for _lang, _strings in list(TRANSLATIONS.items()):
+    register_language(_lang, _strings)
+
+# Extra languages, e.g. VET_LOCALES_DIR=/etc/vet/locales containing de.json
+if os.environ.get('VET_LOCALES_DIR'):
+    load_language_dir(os.environ['VET_LOCALES_DIR'])
@@ -0,0 +1,178 @@
+"""Request timing, SQL query counting and Prometheus metrics"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+class RequestStats:
+    """Time spent in SQL and named stages during one request"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.stages = {}
+
+_current = ContextVar('request_stats', default=None)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_seconds = {}
+        self.requests = {}
+        self.sql_statements = {}
+        self.sql_seconds = {}
+        self.sql_per_request = {}
+        self.stage_seconds = {}
+
+    def observe_request(self, method, route, status, seconds, stats):
+        key = (method, route)
+        with self._lock:
+            self.request_seconds.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.requests[key + (str(status),)] = self.requests.get(key + (str(status),), 0) + 1
+            self.sql_statements[key] = self.sql_statements.get(key, 0) + stats.sql_count
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + stats.sql_seconds
+            self.sql_per_request.setdefault(key, Histogram(COUNT_BUCKETS)).observe(stats.sql_count)
+
+    def observe_stage(self, stage, seconds):
+        with self._lock:
+            self.stage_seconds.setdefault((stage,), Histogram(LATENCY_BUCKETS)).observe(seconds)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            _render_histogram(lines, 'vet_http_request_duration_seconds', 'Request latency by route',
+                              ('method', 'route'), self.request_seconds)
+            _render_counter(lines, 'vet_http_requests_total', 'Requests by route and status',
+                            ('method', 'route', 'status'), self.requests)
+            _render_counter(lines, 'vet_sql_statements_total', 'SQL statements executed by route',
+                            ('method', 'route'), self.sql_statements)
+            _render_counter(lines, 'vet_sql_duration_seconds_total', 'Time spent in SQL by route',
+                            ('method', 'route'), self.sql_seconds)
+            _render_histogram(lines, 'vet_sql_statements_per_request', 'SQL statements per request',
+                              ('method', 'route'), self.sql_per_request)
+            _render_histogram(lines, 'vet_stage_duration_seconds', 'Time spent in named stages (e.g. scoring)',
+                              ('stage',), self.stage_seconds)
+        return '\n'.join(lines) + '\n'
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _render_counter(lines, name, help_text, label_names, values):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(values.items()):
+        lines.append(f"{name}{_labels(label_names, key)} {value}")
+
+def _render_histogram(lines, name, help_text, label_names, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(label_names, key, ('le', bound))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(label_names, key)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(label_names, key)} {cumulative}")
+
+registry = MetricsRegistry()
+
+@contextmanager
+def timed(stage: str):
+    """Time a block, adding it to the current request's Server-Timing and the stage histogram"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        registry.observe_stage(stage, seconds)
+        stats = _current.get()
+        if stats is not None:
+            stats.stages[stage] = stats.stages.get(stage, 0.0) + seconds
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+def instrument_engine(engine):
+    """Count statements and SQL time per request using engine events"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def server_timing(total_seconds: float, stats: RequestStats) -> str:
+    parts = [f"app;dur={total_seconds * 1000:.1f}",
+             f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_count} queries"']
+    parts += [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stats.stages.items()]
+    return ', '.join(parts)
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route.
+
+    Adds a Server-Timing header with total, SQL and stage timings.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', server_timing(time.perf_counter() - started, stats).encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get('route')
+            # Unmatched paths share one label so they cannot blow up the series count
+            route_path = getattr(route, 'path', None) or 'unmatched'
+            registry.observe_request(scope['method'], route_path, status, time.perf_counter() - started, stats)
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,64 @@
+"""Versioned schema migrations shared by the Streamlit app and the API"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# (database, component) -> schema version, so each process migrates at most once
+_versions = {}
+_lock = threading.Lock()
+
+def get_table_columns(conn, table):
+    """Get column names for a table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def add_column(conn, table, column, definition):
+    """Add a column to a table unless it already exists"""
+    if column not in get_table_columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def apply_migrations(conn, component, migrations):
+    """Apply the migrations of a component newer than its recorded schema version.
+
+    migrations is an ordered list of (version, description, migrate) where
+    migrate takes a sqlite3 connection. Migrations must be idempotent, since
+    two processes starting at the same time may both apply them.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT version FROM schema_version WHERE component = ?", (component,)).fetchone()
+    current = row[0] if row else 0
+
+    for version, description, migrate in migrations:
+        if version <= current:
+            continue
+        migrate(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_version (component, version, applied_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (component, version)
+        )
+        conn.commit()
+        current = version
+        logger.info(f"Applied {component} migration {version}: {description}")
+
+    return current
+
+def migrate(database, component, migrations, connect):
+    """Bring a component's schema up to date, at most once per process per database"""
+    key = (database, component)
+    if key in _versions:
+        return _versions[key]
+
+    with _lock:
+        if key not in _versions:
+            conn = connect()
+            try:
+                _versions[key] = apply_migrations(conn, component, migrations)
+            finally:
+                conn.close()
+    return _versions[key]
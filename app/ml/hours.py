@@ -0,0 +1,138 @@
+"""Minute-of-week interval index over clinic working hours"""
+from bisect import bisect_right
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import logging
+import threading
+
+from sqlalchemy.orm import Session
+from app.models import WorkingHours
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Clinic opening hours are local to Sofia
+LOCAL_TIMEZONE = ZoneInfo("Europe/Sofia")
+
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+def parse_day(day_of_week: str) -> int:
+    """Parse a day name ('Monday', 'mon') or number (0 = Monday) into 0-6"""
+    value = day_of_week.strip().lower()
+    if value.isdigit() and int(value) < 7:
+        return int(value)
+    for index, name in enumerate(DAY_NAMES):
+        if len(value) >= 3 and name.startswith(value):
+            return index
+    raise ValueError(f"Unknown day of week: {day_of_week}")
+
+def parse_time(value: str) -> int:
+    """Parse 'HH:MM' (00:00-24:00) into minutes since midnight"""
+    try:
+        hours, minutes = value.strip().split(':')
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time (expected HH:MM): {value}")
+    if not (0 <= minutes < 60 and 0 <= hours <= 24) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time (expected HH:MM): {value}")
+    return hours * 60 + minutes
+
+def hours_to_intervals(day_of_week: str, open_time: str, close_time: str, is_closed: bool) -> list:
+    """Convert one working-hours row into [start, end) minute-of-week intervals.
+
+    Hours closing at or before their opening time run past midnight into
+    the next day; Sunday night wraps around to Monday morning.
+    """
+    day = parse_day(day_of_week)
+    if is_closed:
+        return []
+    if not open_time or not close_time:
+        raise ValueError("open_time and close_time are required unless the day is closed")
+
+    start = day * MINUTES_PER_DAY + parse_time(open_time)
+    end = day * MINUTES_PER_DAY + parse_time(close_time)
+    if end <= start:
+        end += MINUTES_PER_DAY
+
+    if end > MINUTES_PER_WEEK:
+        return [(start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK)]
+    return [(start, end)]
+
+def minute_of_week(moment: datetime) -> int:
+    """Minute of the week (Monday 00:00 = 0) of a moment in Sofia local time.
+
+    Naive datetimes are taken to already be in local time.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(LOCAL_TIMEZONE)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def _merge(intervals: list) -> list:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class WorkingHoursIndex:
+    """Per-vet sorted, non-overlapping opening intervals for O(log n) open-at lookups.
+
+    Rebuilt on first use after the hours version (app.http_cache) changes,
+    so hours written by any process show up on the next lookup.
+    """
+
+    def __init__(self):
+        # (hours version, starts by vet, ends by vet), replaced as a whole
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, db: Session):
+        """Build the index from the working_hours table unless it is current"""
+        # Imported here: app.http_cache uses this module's clock helpers
+        from app.http_cache import get_data_version
+
+        version = get_data_version(db, 'hours_version')
+        loaded = self._loaded
+        if loaded is not None and loaded[0] == version:
+            return
+        with self._lock:
+            loaded = self._loaded
+            if loaded is not None and loaded[0] == version:
+                return
+            per_vet = {}
+            for hours in db.query(WorkingHours).all():
+                vet_intervals = per_vet.setdefault(hours.vet_id, [])
+                try:
+                    vet_intervals.extend(
+                        hours_to_intervals(hours.day_of_week, hours.open_time, hours.close_time, hours.is_closed)
+                    )
+                except ValueError as e:
+                    logger.warning(f"Skipping working hours {hours.id} of vet {hours.vet_id}: {e}")
+            starts, ends = {}, {}
+            for vet_id, intervals in per_vet.items():
+                merged = _merge(intervals)
+                starts[vet_id] = [start for start, _ in merged]
+                ends[vet_id] = [end for _, end in merged]
+            self._loaded = (version, starts, ends)
+
+    def has_hours(self, vet_id: int) -> bool:
+        loaded = self._loaded
+        return loaded is not None and vet_id in loaded[1]
+
+    def is_open(self, vet_id: int, minute: int) -> bool:
+        """Whether a vet is open at a minute of the week; vets without hours count as closed"""
+        loaded = self._loaded
+        if loaded is None:
+            return False
+        _, starts_by_vet, ends_by_vet = loaded
+        starts = starts_by_vet.get(vet_id)
+        if not starts:
+            return False
+        position = bisect_right(starts, minute) - 1
+        return position >= 0 and minute < ends_by_vet[vet_id][position]
+
+working_hours_index = WorkingHoursIndex()
@@ -0,0 +1,183 @@
+"""Optional learned ranking of recommendation candidates.
+
+A scikit-learn classifier trained offline on recommendation feedback
+(was a recommended vet opened/contacted) predicts a relevance score from
+the component scores VetRecommendationEngine already computes. When a
+model file exists it re-ranks the best linear candidates in one batched
+predict call; otherwise the linear weights are used unchanged.
+
+    VET_RANKING_MODEL      model file (default ranker.joblib; missing = linear ranking)
+    VET_RANKING_BUDGET_MS  latency budget of one predict call (default 5)
+
+Train from feedback rows ({"features": {...}, "label": 0/1} per line):
+
+    python -m app.ml.ranking feedback.ndjson --out ranker.joblib --model gbm
+"""
+from datetime import datetime
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = (
+    'distance_score', 'service_match_score', 'rating_score',
+    'price_match_score', 'emergency_score', 'review_count',
+)
+
+# Only this many of the best linear candidates are re-ranked, which bounds predict cost
+RERANK_TOP_K = 200
+
+DEFAULT_MODEL_PATH = "ranker.joblib"
+DEFAULT_BUDGET_MS = 5.0
+
+def feature_row(score_data: dict, review_count: int) -> list:
+    """Model features of one scored candidate (component scores are 0-100 in score_data)"""
+    return [
+        score_data['distance_score'] / 100,
+        score_data['service_match_score'] / 100,
+        score_data['rating_score'] / 100,
+        score_data['price_match_score'] / 100,
+        score_data['emergency_score'] / 100,
+        math.log1p(review_count),
+    ]
+
+class LearnedRanker:
+    """A fitted classifier scoring candidate feature rows within a latency budget"""
+
+    def __init__(self, model, budget_ms: float = DEFAULT_BUDGET_MS):
+        self.model = model
+        self.budget_seconds = budget_ms / 1000
+
+    def predict(self, rows) -> np.ndarray:
+        """Relevance in [0, 1] for each feature row, in one batched call"""
+        features = np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+        started = time.perf_counter()
+        scores = self.model.predict_proba(features)[:, 1]
+        elapsed = time.perf_counter() - started
+        if elapsed > self.budget_seconds:
+            logger.warning(f"Ranking model took {elapsed * 1000:.1f} ms for {len(features)} candidates, "
+                           f"over its {self.budget_seconds * 1000:.1f} ms budget")
+        return scores
+
+    def fits_budget(self, repeat: int = 3) -> bool:
+        """Whether predicting RERANK_TOP_K candidates stays within the budget"""
+        rows = np.random.default_rng(0).random((RERANK_TOP_K, len(FEATURES)))
+        slowest = 0.0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.model.predict_proba(rows)
+            slowest = max(slowest, time.perf_counter() - started)
+        return slowest <= self.budget_seconds
+
+def load_ranker(path: str, budget_ms: float = DEFAULT_BUDGET_MS) -> Optional[LearnedRanker]:
+    """Load a model saved by save_model, or None if it is missing, incompatible or too slow"""
+    if not os.path.exists(path):
+        return None
+    import joblib
+
+    try:
+        saved = joblib.load(path)
+    except Exception as e:
+        logger.error(f"Could not load ranking model {path}: {e}")
+        return None
+    if tuple(saved.get('features', ())) != FEATURES:
+        logger.error(f"Ranking model {path} was trained on other features: {saved.get('features')}")
+        return None
+
+    ranker = LearnedRanker(saved['model'], budget_ms)
+    if not ranker.fits_budget():
+        logger.error(f"Ranking model {path} is too slow for its {budget_ms} ms budget, using linear ranking")
+        return None
+    logger.info(f"Loaded ranking model {path} (trained {saved.get('trained_at')} on {saved.get('samples')} samples)")
+    return ranker
+
+_ranker = None
+_ranker_loaded = False
+_ranker_lock = threading.Lock()
+
+def get_ranker() -> Optional[LearnedRanker]:
+    """The process-wide ranker from VET_RANKING_MODEL, loaded on first use"""
+    global _ranker, _ranker_loaded
+    if not _ranker_loaded:
+        with _ranker_lock:
+            if not _ranker_loaded:
+                _ranker = load_ranker(
+                    os.environ.get('VET_RANKING_MODEL', DEFAULT_MODEL_PATH),
+                    float(os.environ.get('VET_RANKING_BUDGET_MS', DEFAULT_BUDGET_MS))
+                )
+                _ranker_loaded = True
+    return _ranker
+
+def reset_ranker():
+    """Forget the loaded ranker so the next request reloads the model file"""
+    global _ranker, _ranker_loaded
+    with _ranker_lock:
+        _ranker, _ranker_loaded = None, False
+
+def load_feedback(path: str):
+    """Feature matrix and labels from an NDJSON feedback file"""
+    rows, labels = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows.append([float(record['features'][name]) for name in FEATURES])
+            labels.append(int(record['label']))
+    return np.asarray(rows, dtype=np.float64), np.asarray(labels)
+
+def train(features, labels, kind: str = 'logistic'):
+    """Fit a logistic regression or a small gradient-boosted tree ensemble"""
+    if kind == 'gbm':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        model = HistGradientBoostingClassifier(max_iter=100, max_depth=4, learning_rate=0.1)
+    elif kind == 'logistic':
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    else:
+        raise ValueError(f"Unknown model kind: {kind}")
+    return model.fit(features, labels)
+
+def save_model(model, path: str, samples: int):
+    import joblib
+
+    joblib.dump({
+        'model': model,
+        'features': FEATURES,
+        'samples': samples,
+        'trained_at': datetime.utcnow().isoformat(),
+    }, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('feedback', help='NDJSON feedback file')
+    parser.add_argument('--out', default=DEFAULT_MODEL_PATH, help='model file to write')
+    parser.add_argument('--model', choices=['logistic', 'gbm'], default='logistic')
+    args = parser.parse_args(argv)
+
+    features, labels = load_feedback(args.feedback)
+    if len(set(labels.tolist())) < 2:
+        parser.error("feedback needs both positive and negative examples")
+
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    train_x, test_x, train_y, test_y = train_test_split(features, labels, test_size=0.2, random_state=42, stratify=labels)
+    auc = roc_auc_score(test_y, train(train_x, train_y, args.model).predict_proba(test_x)[:, 1])
+    print(f"Held-out AUC: {auc:.3f} ({len(test_y)} samples)")
+
+    save_model(train(features, labels, args.model), args.out, len(labels))
+    print(f"Saved {args.model} model trained on {len(labels)} samples to {args.out}")
+
+if __name__ == '__main__':
+    main()
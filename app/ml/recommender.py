@@ -1,7 +1,42 @@
 """Intelligent Vet Recommendation System"""
-from geopy.distance import geodesic
+from heapq import heappush, heapreplace
+import numpy as np
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models import Vet, Service, Review
+from app.geo.projection import planar_km, project
+from app.ml.hours import working_hours_index
+from app.ml.ranking import RERANK_TOP_K, feature_row, get_ranker
+from app.ml.tiles import MAX_RADIUS_KM, distance_tiles
+from app.ml.routing import get_travel_times
+from app.ml.snapshot import SERVICE_FEATURES, vet_snapshot
+from app.metrics import timed
+from app.http_cache import get_data_version
+
+# Vets whose services one query loads, in the order scoring visits them
+SERVICE_BATCH = 200
+
+class ServiceBatches:
+    """Services of the vets a scoring pass visits, loaded for a batch of upcoming vets per query"""
+    
+    def __init__(self, db: Session, vet_ids: list, batch: int = SERVICE_BATCH):
+        self.db = db
+        self.vet_ids = vet_ids
+        self.batch = batch
+        self._order = {vet_id: i for i, vet_id in enumerate(vet_ids)}
+        self._services = {}
+    
+    def get(self, vet_id: int) -> list:
+        if vet_id not in self._services:
+            start = self._order.get(vet_id)
+            batch = [vet_id] if start is None else [
+                batch_id for batch_id in self.vet_ids[start:start + self.batch] if batch_id not in self._services
+            ]
+            for batch_id in batch:
+                self._services[batch_id] = []
+            for service in self.db.query(Service).filter(Service.vet_id.in_(batch)):
+                self._services[service.vet_id].append(service)
+        return self._services[vet_id]
 
 class VetRecommendationEngine:
     """AI-powered recommendation system for veterinary clinics"""
@@ -11,6 +46,8 @@ class VetRecommendationEngine:
     
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points in kilometers"""
+        from geopy.distance import geodesic
+        
         try:
             return geodesic((lat1, lon1), (lat2, lon2)).kilometers
         except:
@@ -62,34 +99,40 @@ class VetRecommendationEngine:
             return 1.0
         return 1.0 if vet_emergency else 0.0
     
-    def calculate_vet_score(
+    def get_distance_score(
         self,
-        vet: Vet,
-        user_location: dict,
+        distance: float,
+        max_distance_km: float,
+        travel_minutes: float = None,
+        max_travel_minutes: float = None
+    ) -> float:
+        """Distance score in [0, 1] (by travel time when given), or None when out of range"""
+        if travel_minutes is not None:
+            if travel_minutes > max_travel_minutes:
+                return None
+            return max(0, 1.0 - (travel_minutes / max_travel_minutes))
+        if distance > max_distance_km:
+            return None
+        return max(0, 1.0 - (distance / max_distance_km))
+    
+    def score_components(
+        self,
+        distance: float,
+        distance_score: float,
+        vet_services: list,
+        rating: float,
+        price_range: str,
+        emergency_service: bool,
         required_services: list = None,
         preferred_price: str = None,
-        needs_emergency: bool = False,
-        max_distance_km: float = 50
+        needs_emergency: bool = False
     ) -> dict:
-        """Calculate comprehensive recommendation score"""
-        
-        distance = self.calculate_distance(
-            user_location['lat'], user_location['lon'],
-            vet.location_lat, vet.location_lon
-        )
-        
-        if distance > max_distance_km:
-            return None
-        
-        distance_score = 1.0 - (distance / max_distance_km)
-        distance_score = max(0, distance_score)
-        
-        vet_services = self.db.query(Service).filter(Service.vet_id == vet.id).all()
+        """Total and component scores (0-100) of a vet in range"""
         service_score = self.get_service_match_score(vet_services, required_services or [])
         
-        rating_score = vet.rating / 5.0 if vet.rating else 0.5
-        price_score = self.get_price_match_score(vet.price_range, preferred_price)
-        emergency_score = self.get_emergency_score(vet.emergency_service, needs_emergency)
+        rating_score = rating / 5.0 if rating else 0.5
+        price_score = self.get_price_match_score(price_range, preferred_price)
+        emergency_score = self.get_emergency_score(emergency_service, needs_emergency)
         
         total_score = (
             distance_score * 0.30 +
@@ -100,8 +143,6 @@ class VetRecommendationEngine:
         )
         
         return {
-            'vet_id': vet.id,
-            'vet_name': vet.name,
             'total_score': round(total_score * 100, 2),
             'distance_km': round(distance, 2),
             'distance_score': round(distance_score * 100, 2),
@@ -109,17 +150,121 @@ class VetRecommendationEngine:
             'rating_score': round(rating_score * 100, 2),
             'price_match_score': round(price_score * 100, 2),
             'emergency_score': round(emergency_score * 100, 2),
-            'vet_details': {
-                'phone': vet.phone,
-                'address': vet.address,
-                'rating': vet.rating,
-                'price_range': vet.price_range,
-                'emergency_service': vet.emergency_service,
-                'website': vet.website,
-                'location': {'lat': vet.location_lat, 'lon': vet.location_lon}
-            }
         }
     
+    def vet_details(self, vet: Vet) -> dict:
+        return {
+            'phone': vet.phone,
+            'address': vet.address,
+            'rating': vet.rating,
+            'price_range': vet.price_range,
+            'emergency_service': vet.emergency_service,
+            'website': vet.website,
+            'location': {'lat': vet.location_lat, 'lon': vet.location_lon}
+        }
+    
+    def calculate_vet_score(
+        self,
+        vet: Vet,
+        user_location: dict,
+        required_services: list = None,
+        preferred_price: str = None,
+        needs_emergency: bool = False,
+        max_distance_km: float = 50,
+        travel_minutes: float = None,
+        max_travel_minutes: float = None,
+        distance_km: float = None
+    ) -> dict:
+        """Calculate comprehensive recommendation score.
+        
+        With travel_minutes (see app.ml.routing) the distance score and
+        cut-off use road travel time instead of straight-line distance.
+        A precomputed distance_km (e.g. planar, see app.geo.projection)
+        saves the geodesic calculation.
+        """
+        
+        if distance_km is not None:
+            distance = distance_km
+        else:
+            distance = self.calculate_distance(
+                user_location['lat'], user_location['lon'],
+                vet.location_lat, vet.location_lon
+            )
+        
+        distance_score = self.get_distance_score(distance, max_distance_km, travel_minutes, max_travel_minutes)
+        if distance_score is None:
+            return None
+        
+        vet_services = self.db.query(Service).filter(Service.vet_id == vet.id).all()
+        
+        score_data = {
+            'vet_id': vet.id,
+            'vet_name': vet.name,
+            **self.score_components(
+                distance, distance_score, vet_services, vet.rating, vet.price_range, vet.emergency_service,
+                required_services, preferred_price, needs_emergency
+            ),
+            'vet_details': self.vet_details(vet)
+        }
+        if travel_minutes is not None:
+            score_data['travel_minutes'] = round(travel_minutes, 1)
+        return score_data
+    
+    def score_snapshot_vet(
+        self,
+        snapshot,
+        position: int,
+        services,
+        distance_km: float,
+        required_services: list = None,
+        preferred_price: str = None,
+        needs_emergency: bool = False,
+        max_distance_km: float = 50,
+        travel_minutes: float = None,
+        max_travel_minutes: float = None
+    ) -> dict:
+        """calculate_vet_score for a vet of the snapshot (see app.ml.snapshot), without name and details.
+        
+        services (a ServiceBatches) is only asked for the vet's services
+        when there are required services to match; add_vet_details fills in
+        the rest for the vets that are returned.
+        """
+        distance_score = self.get_distance_score(distance_km, max_distance_km, travel_minutes, max_travel_minutes)
+        if distance_score is None:
+            return None
+        
+        vet_id = int(snapshot.ids[position])
+        rating = float(snapshot.rating[position])
+        price = int(snapshot.price[position])
+        score_data = {
+            'vet_id': vet_id,
+            **self.score_components(
+                distance_km, distance_score, services.get(vet_id) if required_services else [],
+                None if np.isnan(rating) else rating,
+                snapshot.price_ranges[price] if price >= 0 else None,
+                bool(snapshot.emergency[position]),
+                required_services, preferred_price, needs_emergency
+            )
+        }
+        if travel_minutes is not None:
+            score_data['travel_minutes'] = round(travel_minutes, 1)
+        return score_data
+    
+    def add_vet_details(self, recommendations: list) -> list:
+        """Recommendations with the name and details of their vets, loaded in one query (vets deleted meanwhile are dropped)"""
+        vets = {
+            vet.id: vet
+            for vet in self.db.query(Vet).filter(Vet.id.in_([r['vet_id'] for r in recommendations]))
+        }
+        detailed = []
+        for recommendation in recommendations:
+            vet = vets.get(recommendation['vet_id'])
+            if vet is not None:
+                recommendation['vet_name'] = vet.name
+                recommendation['vet_details'] = self.vet_details(vet)
+                detailed.append(recommendation)
+        return detailed
+    
     def get_recommendations(
         self,
         user_location: dict,
@@ -127,73 +272,300 @@ class VetRecommendationEngine:
         preferred_price: str = None,
         needs_emergency: bool = False,
         max_distance_km: float = 50,
-        top_n: int = 5
+        top_n: int = 5,
+        open_at_minute: int = None,
+        max_travel_minutes: float = None,
+        district: str = None,
+        vet_ids: set = None
     ) -> dict:
-        """Get top N vet recommendations"""
+        """Get top N vet recommendations.
         
-        all_vets = self.db.query(Vet).all()
+        open_at_minute (minute of the week, see app.ml.hours) restricts the
+        results to vets open at that time. max_travel_minutes switches
+        distance scoring to road travel time when a road network is loaded
+        (see app.ml.routing); max_distance_km is then not applied. district
+        and vet_ids (e.g. the vets inside a polygon) restrict the candidates.
         
-        if not all_vets:
+        Candidates are scored from the vet snapshot (see app.ml.snapshot) by
+        planar distance between projected coordinates, with the services of
+        the scored vets loaded in batches; only the returned top_n are loaded
+        as vets and get exact geodesic distance_km.
+        """
+        
+        # Read before the snapshot, so tiles are never cached under a newer version than their vets
+        location_version = get_data_version(self.db, 'location_version')
+        snapshot = vet_snapshot.get(self.db)
+        
+        if not len(snapshot):
             return {'message': 'No vets found in database', 'recommendations': []}
         
-        recommendations = []
-        for vet in all_vets:
-            score_data = self.calculate_vet_score(
-                vet, user_location, required_services,
-                preferred_price, needs_emergency, max_distance_km
-            )
-            
-            if score_data:
-                recommendations.append(score_data)
+        allowed = None
+        if vet_ids is not None:
+            allowed = set(vet_ids)
+        if district is not None:
+            in_district = {vet_id for (vet_id,) in self.db.query(Vet.id).filter(Vet.district == district)}
+            allowed = in_district if allowed is None else allowed & in_district
+        
+        if open_at_minute is not None:
+            working_hours_index.ensure_loaded(self.db)
+        
+        ranker = get_ranker()
+        # The learned ranker re-orders the best RERANK_TOP_K linear candidates
+        needed = max(top_n, RERANK_TOP_K if ranker else 1)
+        
+        travel_times = get_travel_times() if max_travel_minutes is not None else None
+        
+        with timed('scoring'):
+            if travel_times:
+                recommendations, total_found = self.score_by_travel_time(
+                    snapshot, travel_times, user_location, required_services, preferred_price,
+                    needs_emergency, max_travel_minutes, needed, open_at_minute, allowed, location_version
+                )
+            elif max_distance_km <= MAX_RADIUS_KM:
+                recommendations, total_found = self.score_nearest_first(
+                    snapshot, user_location, required_services, preferred_price,
+                    needs_emergency, max_distance_km, needed, open_at_minute, allowed, location_version
+                )
+            else:
+                recommendations = []
+                origin = project(user_location['lat'], user_location['lon'])
+                distances = planar_km(*origin, snapshot.x, snapshot.y).tolist()
+                positions = [
+                    position for _, position in self._ordered(snapshot, snapshot.ids, open_at_minute, allowed)
+                ]
+                services = ServiceBatches(self.db, [int(snapshot.ids[position]) for position in positions])
+                for position in positions:
+                    score_data = self.score_snapshot_vet(
+                        snapshot, position, services, distances[position], required_services,
+                        preferred_price, needs_emergency, max_distance_km
+                    )
+                    
+                    if score_data:
+                        recommendations.append(score_data)
+                
+                recommendations.sort(key=lambda x: x['total_score'], reverse=True)
+                total_found = len(recommendations)
+        
+        if ranker and recommendations:
+            self.rerank(ranker, recommendations)
         
-        recommendations.sort(key=lambda x: x['total_score'], reverse=True)
+        recommendations = self.add_vet_details(recommendations[:top_n])
+        for recommendation in recommendations:
+            location = recommendation['vet_details']['location']
+            recommendation['distance_km'] = round(self.calculate_distance(
+                user_location['lat'], user_location['lon'], location['lat'], location['lon']
+            ), 2)
         
         return {
-            'total_found': len(recommendations),
-            'showing_top': min(top_n, len(recommendations)),
+            'total_found': total_found,
+            'showing_top': min(top_n, total_found),
             'user_location': user_location,
             'filters': {
                 'required_services': required_services,
                 'preferred_price': preferred_price,
                 'needs_emergency': needs_emergency,
-                'max_distance_km': max_distance_km
+                'max_distance_km': max_distance_km,
+                'open_at_minute': open_at_minute,
+                **({'max_travel_minutes': max_travel_minutes} if travel_times else {}),
+                **({'district': district} if district is not None else {})
             },
-            'recommendations': recommendations[:top_n]
+            'ranking': 'learned' if ranker and recommendations else 'linear',
+            'recommendations': recommendations
         }
     
+    def score_best_first(self, candidates, needed: int, score, in_range) -> tuple:
+        """Score candidates given in order of non-increasing best possible distance score.
+        
+        candidates yields (position in the snapshot, best distance score in
+        [0, 1], key). Once `needed` vets are scored, a candidate is only
+        scored with score(position, key) if full marks on everything but
+        distance could still make the top `needed`; the rest are only
+        counted when in_range(position, key). Returns the scored vets, best
+        first and in the same order a full scan would give, and the number in range.
+        """
+        best = []  # min-heap of (total_score, -position) of the top `needed`
+        scored = []
+        total_found = 0
+        for position, best_distance_score, key in candidates:
+            if len(best) >= needed and round((best_distance_score * 0.30 + 0.70) * 100, 2) < best[0][0]:
+                if in_range(position, key):
+                    total_found += 1
+                continue
+            
+            score_data = score(position, key)
+            if not score_data:
+                continue
+            
+            total_found += 1
+            scored.append((position, score_data))
+            rank = (score_data['total_score'], -position)
+            if len(best) < needed:
+                heappush(best, rank)
+            elif rank > best[0]:
+                heapreplace(best, rank)
+        
+        scored.sort(key=lambda item: (-item[1]['total_score'], item[0]))
+        return [score_data for _, score_data in scored], total_found
+    
+    def _ordered(self, snapshot, vet_ids, open_at_minute: int = None, allowed: set = None) -> list:
+        """(index in vet_ids, snapshot position) of known, allowed and open vets, in vet_ids order"""
+        vet_ids = np.asarray(vet_ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(snapshot.ids, vet_ids), len(snapshot) - 1)
+        known = (snapshot.ids[positions] == vet_ids).tolist()
+        ordered = []
+        for i, (vet_id, position) in enumerate(zip(vet_ids.tolist(), positions.tolist())):
+            if not known[i] or (allowed is not None and vet_id not in allowed):
+                continue
+            if open_at_minute is not None and not working_hours_index.is_open(vet_id, open_at_minute):
+                continue
+            ordered.append((i, position))
+        return ordered
+    
+    def score_nearest_first(
+        self,
+        snapshot,
+        user_location: dict,
+        required_services: list,
+        preferred_price: str,
+        needs_emergency: bool,
+        max_distance_km: float,
+        needed: int,
+        open_at_minute: int = None,
+        allowed: set = None,
+        location_version: int = None
+    ) -> tuple:
+        """Score vets nearest first from the origin's distance tile (see app.ml.tiles).
+        
+        Tiles always hold all vets, so allowed (vet ids) is applied while walking them.
+        """
+        origin = project(user_location['lat'], user_location['lon'])
+        tile = distance_tiles.get(
+            user_location['lat'], user_location['lon'],
+            zip(snapshot.ids.tolist(), snapshot.x.tolist(), snapshot.y.tolist()), location_version
+        )
+        count = tile.candidates(max_distance_km)
+        distances = tile.distances_from(*origin, count).tolist()
+        
+        ordered = self._ordered(snapshot, tile.vet_ids[:count], open_at_minute, allowed)
+        services = ServiceBatches(self.db, [tile.vet_ids[i] for i, _ in ordered])
+        candidates = (
+            (position, max(0, 1.0 - tile.min_distance(i) / max_distance_km), i)
+            for i, position in ordered
+        )
+        return self.score_best_first(
+            candidates, needed,
+            lambda position, i: self.score_snapshot_vet(
+                snapshot, position, services, distances[i], required_services, preferred_price,
+                needs_emergency, max_distance_km
+            ),
+            lambda position, i: distances[i] <= max_distance_km
+        )
+    
+    def score_by_travel_time(
+        self,
+        snapshot,
+        travel_times,
+        user_location: dict,
+        required_services: list,
+        preferred_price: str,
+        needs_emergency: bool,
+        max_travel_minutes: float,
+        needed: int,
+        open_at_minute: int = None,
+        allowed: set = None,
+        location_version: int = None
+    ) -> tuple:
+        """Score vets quickest to reach first, from the origin's travel tile (see app.ml.routing)"""
+        origin = project(user_location['lat'], user_location['lon'])
+        tile = travel_times.from_origin(
+            user_location['lat'], user_location['lon'],
+            zip(snapshot.ids.tolist(), snapshot.lat.tolist(), snapshot.lon.tolist()), location_version
+        )
+        ordered = self._ordered(snapshot, tile.vet_ids, open_at_minute, allowed)
+        services = ServiceBatches(self.db, [tile.vet_ids[i] for i, _ in ordered])
+        candidates = (
+            (position, max(0, 1.0 - tile.minutes[i] / max_travel_minutes), tile.minutes[i])
+            for i, position in ordered
+        )
+        return self.score_best_first(
+            candidates, needed,
+            lambda position, minutes: self.score_snapshot_vet(
+                snapshot, position, services,
+                float(planar_km(*origin, snapshot.x[position], snapshot.y[position])),
+                required_services, preferred_price, needs_emergency,
+                travel_minutes=minutes, max_travel_minutes=max_travel_minutes
+            ),
+            lambda position, minutes: minutes <= max_travel_minutes
+        )
+    
+    def review_counts(self, vet_ids: list) -> dict:
+        """Current review count of each vet in vet_ids (vets without reviews are missing)"""
+        return dict(
+            self.db.query(Review.vet_id, func.count(Review.id))
+            .filter(Review.vet_id.in_(vet_ids))
+            .group_by(Review.vet_id)
+            .all()
+        )
+    
+    def rerank(self, ranker, recommendations: list):
+        """Re-order the best RERANK_TOP_K linear candidates by learned relevance, in place.
+        
+        Their total_score becomes the model's relevance (0-100); candidates
+        beyond the top K keep their linear order and scores.
+        """
+        candidates = recommendations[:RERANK_TOP_K]
+        review_counts = self.review_counts([c['vet_id'] for c in candidates])
+        with timed('ranking'):
+            scores = ranker.predict([feature_row(c, review_counts.get(c['vet_id'], 0)) for c in candidates])
+            for candidate, score in zip(candidates, scores):
+                candidate['total_score'] = round(float(score) * 100, 2)
+            candidates.sort(key=lambda x: x['total_score'], reverse=True)
+        recommendations[:len(candidates)] = candidates
+    
     def get_similar_vets(self, vet_id: int, top_n: int = 3) -> dict:
-        """Find similar vets based on services"""
+        """Find similar vets based on services.
+        
+        Scores every vet at once from the service bitmasks and price ranges
+        of the vet snapshot (see app.ml.snapshot); only the top_n are loaded.
+        """
         
         target_vet = self.db.query(Vet).filter(Vet.id == vet_id).first()
         if not target_vet:
             return {'error': 'Vet not found'}
         
-        all_vets = self.db.query(Vet).filter(Vet.id != vet_id).all()
-        target_services = self.db.query(Service).filter(Service.vet_id == vet_id).all()
+        snapshot = vet_snapshot.get(self.db)
+        target = snapshot.position(vet_id)
+        if target is None:
+            # Added after the snapshot was taken
+            return {'reference_vet': target_vet.name, 'similar_vets': []}
         
-        similarities = []
-        for vet in all_vets:
-            vet_services = self.db.query(Service).filter(Service.vet_id == vet.id).all()
-            
-            similarity_score = self.calculate_service_similarity(target_services, vet_services)
-            price_similarity = 1.0 if vet.price_range == target_vet.price_range else 0.5
-            total_similarity = (similarity_score * 0.7) + (price_similarity * 0.3)
-            
-            similarities.append({
+        with timed('scoring'):
+            price_similarity = np.where(snapshot.price == snapshot.price[target], 1.0, 0.5)
+            total_similarity = snapshot.service_similarity(target) * 0.7 + price_similarity * 0.3
+            scores = np.array([round(value * 100, 2) for value in total_similarity.tolist()])
+            scores[target] = -np.inf
+            # Stable, so ties keep id order
+            best = np.argsort(-scores, kind='stable')[:min(top_n, len(snapshot) - 1)]
+        
+        top_ids = snapshot.ids[best].tolist()
+        vets = {vet.id: vet for vet in self.db.query(Vet).filter(Vet.id.in_(top_ids))}
+        similar_vets = [
+            {
                 'vet_id': vet.id,
                 'vet_name': vet.name,
-                'similarity_score': round(total_similarity * 100, 2),
+                'similarity_score': float(scores[i]),
                 'rating': vet.rating,
                 'price_range': vet.price_range,
                 'phone': vet.phone,
                 'address': vet.address
-            })
-        
-        similarities.sort(key=lambda x: x['similarity_score'], reverse=True)
+            }
+            for i, vet in ((i, vets.get(vet_id)) for i, vet_id in zip(best.tolist(), top_ids))
+            if vet is not None
+        ]
         
         return {
             'reference_vet': target_vet.name,
-            'similar_vets': similarities[:top_n]
+            'similar_vets': similar_vets
         }
     
     def calculate_service_similarity(self, services1: list, services2: list) -> float:
@@ -201,11 +573,8 @@ class VetRecommendationEngine:
         if not services1 or not services2:
             return 0.0
         
-        features = ['hotel_cats', 'hotel_dogs', 'grooming', 'wild_animals', 
-                   'surgery', 'vaccination', 'dental_care']
-        
-        vec1 = [any(getattr(s, f, False) for s in services1) for f in features]
-        vec2 = [any(getattr(s, f, False) for s in services2) for f in features]
+        vec1 = [any(getattr(s, f, False) for s in services1) for f in SERVICE_FEATURES]
+        vec2 = [any(getattr(s, f, False) for s in services2) for f in SERVICE_FEATURES]
         
         intersection = sum(a and b for a, b in zip(vec1, vec2))
         union = sum(a or b for a, b in zip(vec1, vec2))
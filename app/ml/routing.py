@@ -0,0 +1,226 @@
+"""Road travel times from a local OpenStreetMap extract.
+
+Set VET_OSM_FILE to an .osm XML extract (optionally .gz or .bz2 compressed;
+nothing is downloaded) to enable travel-time recommendations. Drivable
+ways become a CSR graph weighted by travel seconds, and only its largest
+strongly connected part is kept. Clinics and origins snap to the nearest
+graph node, and the stretch to that node is driven at CONNECTOR_KMH.
+
+Like the distance tiles, travel times are cached per origin geohash cell
+(precision 7, about 150 m): the first request from a cell runs one
+single-source Dijkstra from the node nearest its centre, bounded by
+MAX_TRAVEL_MINUTES, and keeps the clinics it reaches sorted by time.
+Full clinic-to-node tables would need n_clinics x n_nodes memory.
+"""
+from array import array
+import bz2
+import gzip
+import logging
+import os
+import threading
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+import numpy as np
+
+from app.ml.tiles import EARTH_RADIUS_KM, DistanceTileCache, geohash_bounds
+
+logger = logging.getLogger(__name__)
+
+# Typical urban driving speeds per highway type
+SPEEDS_KMH = {
+    'motorway': 90, 'motorway_link': 50,
+    'trunk': 70, 'trunk_link': 40,
+    'primary': 50, 'primary_link': 35,
+    'secondary': 40, 'secondary_link': 30,
+    'tertiary': 35, 'tertiary_link': 25,
+    'unclassified': 30, 'residential': 25, 'road': 25,
+    'living_street': 10, 'service': 15,
+}
+CONNECTOR_KMH = 15
+MAX_TRAVEL_MINUTES = 60
+TRAVEL_PRECISION = 7
+
+def _open(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.pbf'):
+        raise ValueError("PBF extracts are not supported, convert them to .osm XML (e.g. with osmium cat)")
+    return open(path, 'rb')
+
+def _speed(tags: dict) -> Optional[float]:
+    speed = SPEEDS_KMH.get(tags.get('highway'))
+    if speed is None or tags.get('access') in ('no', 'private') or tags.get('motor_vehicle') == 'no':
+        return None
+    maxspeed = tags.get('maxspeed', '').split(' ')[0]
+    if maxspeed.isdigit():
+        # Posted limits are rarely reached in town
+        speed = min(speed, int(maxspeed) * 0.8)
+    return speed
+
+def _direction(tags: dict) -> int:
+    """1 one way, -1 one way against the node order, 0 both ways"""
+    oneway = tags.get('oneway')
+    if oneway in ('yes', 'true', '1') or tags.get('junction') == 'roundabout' or tags.get('highway') == 'motorway':
+        return 1
+    if oneway == '-1':
+        return -1
+    return 0
+
+class RoadNetwork:
+    """Directed road graph in CSR form with a KD-tree for snapping coordinates to nodes"""
+
+    def __init__(self, lats, lons, sources, targets, seconds):
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import cKDTree
+
+        n = len(lats)
+        # Keep the fastest of parallel edges (csr_matrix would add them up)
+        order = np.lexsort((seconds, targets, sources))
+        sources, targets, seconds = sources[order], targets[order], seconds[order]
+        first = np.ones(len(sources), dtype=bool)
+        first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        self.graph = csr_matrix((seconds[first], (sources[first], targets[first])), shape=(n, n))
+
+        _, labels = connected_components(self.graph, directed=True, connection='strong')
+        largest = np.argmax(np.bincount(labels))
+        self.routable = np.flatnonzero(labels == largest)
+        self.lats, self.lons = lats, lons
+        self._scale = np.cos(np.radians(np.mean(lats))) if n else 1.0
+        self._tree = cKDTree(np.column_stack([lats[self.routable], lons[self.routable] * self._scale]))
+
+    @property
+    def node_count(self) -> int:
+        return self.graph.shape[0]
+
+    @classmethod
+    def from_osm(cls, path: str) -> 'RoadNetwork':
+        """Parse drivable ways of an OSM XML extract"""
+        node_ids, node_lats, node_lons = array('q'), array('d'), array('d')
+        edge_from, edge_to, edge_speed = array('q'), array('q'), array('d')
+
+        with _open(path) as f:
+            context = ET.iterparse(f, events=('start', 'end'))
+            _, root = next(context)
+            way_nodes, tags = [], {}
+            for event, element in context:
+                if event != 'end':
+                    continue
+                if element.tag == 'nd':
+                    way_nodes.append(int(element.get('ref')))
+                elif element.tag == 'tag':
+                    tags[element.get('k')] = element.get('v')
+                elif element.tag in ('node', 'way', 'relation'):
+                    if element.tag == 'node':
+                        node_ids.append(int(element.get('id')))
+                        node_lats.append(float(element.get('lat')))
+                        node_lons.append(float(element.get('lon')))
+                    elif element.tag == 'way' and _speed(tags):
+                        speed, direction = _speed(tags), _direction(tags)
+                        for a, b in zip(way_nodes, way_nodes[1:]):
+                            for u, v, wanted in ((a, b, direction >= 0), (b, a, direction <= 0)):
+                                if wanted:
+                                    edge_from.append(u)
+                                    edge_to.append(v)
+                                    edge_speed.append(speed)
+                    way_nodes, tags = [], {}
+                    # Drop parsed elements to keep memory flat on large extracts
+                    root.clear()
+
+        if not len(node_ids) or not len(edge_from):
+            raise ValueError(f"No drivable roads in {path}")
+        ids = np.frombuffer(node_ids, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        ids, lats, lons = ids[order], np.frombuffer(node_lats)[order], np.frombuffer(node_lons)[order]
+
+        edge_from = np.frombuffer(edge_from, dtype=np.int64)
+        edge_to = np.frombuffer(edge_to, dtype=np.int64)
+        from_pos = np.minimum(np.searchsorted(ids, edge_from), len(ids) - 1)
+        to_pos = np.minimum(np.searchsorted(ids, edge_to), len(ids) - 1)
+        known = (ids[from_pos] == edge_from) & (ids[to_pos] == edge_to)
+        from_pos, to_pos = from_pos[known], to_pos[known]
+        speeds = np.frombuffer(edge_speed)[known]
+
+        # Renumber the nodes used by drivable ways compactly
+        used, inverse = np.unique(np.concatenate([from_pos, to_pos]), return_inverse=True)
+        sources, targets = inverse[:len(from_pos)], inverse[len(from_pos):]
+        lats, lons = lats[used], lons[used]
+        lengths = haversine_km_pairs(lats[sources], lons[sources], lats[targets], lons[targets])
+        # Zero-length edges (duplicate nodes) would read as missing edges in the sparse graph
+        seconds = np.maximum(lengths / speeds * 3600, 0.01)
+        network = cls(lats, lons, sources, targets, seconds)
+        logger.info(f"Loaded road network from {path}: {network.node_count} nodes, {network.graph.nnz} edges")
+        return network
+
+    def snap(self, lats, lons):
+        """Nearest routable node of each point and the seconds to drive there"""
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        _, nearest = self._tree.query(np.column_stack([lats, lons * self._scale]))
+        nodes = self.routable[nearest]
+        seconds = haversine_km_pairs(lats, lons, self.lats[nodes], self.lons[nodes]) / CONNECTOR_KMH * 3600
+        return nodes, seconds
+
+    def seconds_from(self, node: int, limit_seconds: float) -> np.ndarray:
+        """Travel seconds from a node to every node (inf beyond limit_seconds)"""
+        from scipy.sparse.csgraph import dijkstra
+
+        return dijkstra(self.graph, directed=True, indices=node, limit=limit_seconds)
+
+def haversine_km_pairs(lats1, lons1, lats2, lons2):
+    """Element-wise great-circle distances between two arrays of points"""
+    lats1, lons1, lats2, lons2 = map(np.radians, (lats1, lons1, lats2, lons2))
+    a = np.sin((lats2 - lats1) / 2) ** 2 + np.cos(lats1) * np.cos(lats2) * np.sin((lons2 - lons1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class TravelTile:
+    """Vets reachable within MAX_TRAVEL_MINUTES from an origin cell, sorted by travel time"""
+
+    def __init__(self, geohash: str, vets: list, network: RoadNetwork):
+        min_lat, max_lat, min_lon, max_lon = geohash_bounds(geohash)
+        (origin,), (access,) = network.snap([(min_lat + max_lat) / 2], [(min_lon + max_lon) / 2])
+        limit = MAX_TRAVEL_MINUTES * 60
+        seconds = network.seconds_from(origin, limit)
+
+        self.vet_ids, self.minutes = [], []
+        if vets:
+            nodes, egress = network.snap([v[1] for v in vets], [v[2] for v in vets])
+            totals = access + seconds[nodes] + egress
+            order = np.argsort(totals, kind='stable')
+            reachable = order[totals[order] <= limit]
+            self.vet_ids = [vets[i][0] for i in reachable]
+            self.minutes = (totals[reachable] / 60).tolist()
+
+class TravelTimes:
+    """Road network plus the per-cell travel tile cache"""
+
+    def __init__(self, network: RoadNetwork):
+        self.network = network
+        self.tiles = DistanceTileCache(
+            precision=TRAVEL_PRECISION,
+            factory=lambda geohash, vets: TravelTile(geohash, vets, network)
+        )
+
+    def from_origin(self, lat: float, lon: float, vets, version=None) -> TravelTile:
+        return self.tiles.get(lat, lon, vets, version)
+
+_travel_times = None
+_travel_loaded = False
+_travel_lock = threading.Lock()
+
+def get_travel_times() -> Optional[TravelTimes]:
+    """Travel times over the VET_OSM_FILE network, loaded on first use (None if not configured)"""
+    global _travel_times, _travel_loaded
+    if not _travel_loaded:
+        with _travel_lock:
+            if not _travel_loaded:
+                path = os.environ.get('VET_OSM_FILE')
+                if path:
+                    try:
+                        _travel_times = TravelTimes(RoadNetwork.from_osm(path))
+                    except Exception as e:
+                        logger.error(f"Could not load road network {path}: {e}")
+                _travel_loaded = True
+    return _travel_times
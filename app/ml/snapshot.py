@@ -0,0 +1,274 @@
+"""Columnar, memory-mapped snapshot of the vet data used for scoring.
+
+Per-vet columns (ids, coordinates, rating, price range, emergency flag)
+and a bitmask of the SERVICE_FEATURES each vet offers are stored as
+one .npy file per column in a directory named after the API's scoring
+version (bumped by the writes that change these columns, see
+app.http_cache) and the vet count and largest id, which catch rows
+written behind the API's back:
+
+    <VET_SNAPSHOT_DIR>/s<scoring_version>-<vet_count>-<max_id>/{manifest.json, ids.npy, ...}
+
+(VET_SNAPSHOT_DIR defaults to vet_platform.snapshot next to the
+database). Workers np.load them with mmap_mode='r': nothing is parsed,
+and the pages are shared by every process through the page cache. The
+process that makes a write rebuilds the snapshot in a background task
+after the response (refresh), and the directory is renamed into place,
+so readers never see a partial snapshot. Readers only build one
+themselves when none matches the database, e.g. after writes made
+outside the API.
+"""
+from datetime import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import connect_raw, engine
+from app.geo.projection import project_many
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+KEEP_VERSIONS = 2
+
+SERVICE_FEATURES = ('hotel_cats', 'hotel_dogs', 'grooming', 'wild_animals', 'surgery', 'vaccination', 'dental_care')
+
+# Vet fields stored in the snapshot: updates of these bump the scoring version
+VET_FIELDS = ('location_lat', 'location_lon', 'rating', 'price_range', 'emergency_service')
+
+COLUMNS = ('ids', 'lat', 'lon', 'x', 'y', 'rating', 'price', 'emergency', 'has_services', 'features')
+
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+KEY_SQL = "SELECT (SELECT scoring_version FROM data_version WHERE id = 1), count(*), max(id) FROM vets"
+
+def snapshot_key(scoring_version: Optional[int], vet_count: int, max_id: Optional[int]) -> str:
+    return f"s{scoring_version or 0}-{vet_count}-{max_id or 0}"
+
+def parse_key(name: str) -> Optional[tuple]:
+    """(scoring version, vet count, max id) of a snapshot directory name, or None for other entries"""
+    parts = name[1:].split('-')
+    if not name.startswith('s') or len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    return tuple(int(part) for part in parts)
+
+def default_directory() -> str:
+    return os.environ.get('VET_SNAPSHOT_DIR') or os.path.splitext(os.path.abspath(engine.url.database))[0] + '.snapshot'
+
+class VetSnapshot:
+    """Read-only vet columns, sorted by id"""
+
+    def __init__(self, manifest: dict, columns: dict):
+        self.manifest = manifest
+        self.scoring_version = manifest['scoring_version']
+        # Price ranges are stored as indexes into this list (-1 for none)
+        self.price_ranges = manifest['price_ranges']
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def key(self) -> str:
+        return snapshot_key(self.scoring_version, self.manifest['vet_count'], self.manifest['max_id'])
+
+    def position(self, vet_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.ids, vet_id))
+        return i if i < len(self.ids) and self.ids[i] == vet_id else None
+
+    def service_similarity(self, i: int) -> np.ndarray:
+        """Jaccard similarity of every vet's service features to those of the i-th vet"""
+        if not self.has_services[i]:
+            return np.zeros(len(self.ids))
+        target = self.features[i]
+        intersection = POPCOUNT[self.features & target].astype(np.float64)
+        union = POPCOUNT[self.features | target].astype(np.float64)
+        similarity = np.divide(intersection, union, out=np.zeros(len(self.ids)), where=union > 0)
+        return np.where(self.has_services, similarity, 0.0)
+
+def build_snapshot(conn) -> VetSnapshot:
+    """Read the snapshot columns from a plain sqlite3 connection to the API database, in one read transaction"""
+    # sqlite3 only opens transactions for writes; without one each SELECT could see a different state
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+    try:
+        scoring_version, _, _ = conn.execute(KEY_SQL).fetchone()
+        rows = conn.execute("""
+            SELECT id, location_lat, location_lon, location_x, location_y, rating, price_range, emergency_service
+            FROM vets ORDER BY id
+        """).fetchall()
+        service_rows = conn.execute(f"SELECT vet_id, {', '.join(SERVICE_FEATURES)} FROM services").fetchall()
+    finally:
+        conn.rollback()
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    lat = np.array([row[1] for row in rows], dtype=np.float64)
+    lon = np.array([row[2] for row in rows], dtype=np.float64)
+    x = np.array([np.nan if row[3] is None else row[3] for row in rows], dtype=np.float64)
+    y = np.array([np.nan if row[4] is None else row[4] for row in rows], dtype=np.float64)
+    missing = np.isnan(x) | np.isnan(y)
+    if missing.any():
+        x[missing], y[missing] = project_many(lat[missing], lon[missing])
+
+    price_ranges = sorted({row[6] for row in rows if row[6] is not None})
+    codes = {price_range: code for code, price_range in enumerate(price_ranges)}
+
+    features = np.zeros(len(ids), dtype=np.uint8)
+    has_services = np.zeros(len(ids), dtype=bool)
+    if service_rows and len(ids):
+        vet_ids = np.array([row[0] for row in service_rows], dtype=np.int64)
+        positions = np.searchsorted(ids, vet_ids)
+        known = (positions < len(ids)) & (ids[np.minimum(positions, len(ids) - 1)] == vet_ids)
+        masks = np.array([
+            sum(1 << bit for bit, value in enumerate(row[1:]) if value) for row in service_rows
+        ], dtype=np.uint8)
+        np.bitwise_or.at(features, positions[known], masks[known])
+        has_services[positions[known]] = True
+
+    columns = {
+        'ids': ids,
+        'lat': lat,
+        'lon': lon,
+        'x': x,
+        'y': y,
+        'rating': np.array([np.nan if row[5] is None else row[5] for row in rows], dtype=np.float64),
+        'price': np.array([codes.get(row[6], -1) for row in rows], dtype=np.int8),
+        'emergency': np.array([bool(row[7]) for row in rows], dtype=bool),
+        'has_services': has_services,
+        'features': features,
+    }
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'scoring_version': scoring_version or 0,
+        'vet_count': len(ids),
+        'max_id': int(ids[-1]) if len(ids) else None,
+        'price_ranges': price_ranges,
+        'service_features': list(SERVICE_FEATURES),
+        'columns': list(COLUMNS),
+        'created_at': datetime.utcnow().isoformat(),
+    }
+    return VetSnapshot(manifest, columns)
+
+def write_snapshot(snapshot: VetSnapshot, directory: str) -> str:
+    """Write a snapshot under directory, unless another process already did"""
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, snapshot.key)
+    if os.path.exists(target):
+        return target
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=directory)
+    try:
+        for name in COLUMNS:
+            np.save(os.path.join(staging, f"{name}.npy"), getattr(snapshot, name))
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(snapshot.manifest, f)
+        os.rename(staging, target)
+    except OSError:
+        # Lost the race to another worker writing the same version
+        if not os.path.exists(target):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _remove_old_versions(directory)
+    return target
+
+def _written(directory: str) -> list:
+    """Paths of the written snapshots in directory, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    # Ordered by name, not mtime: another worker may remove a directory while we list them
+    keyed = [(parse_key(name), name) for name in os.listdir(directory)]
+    keyed = sorted(((key, name) for key, name in keyed if key is not None), reverse=True)
+    return [os.path.join(directory, name) for _, name in keyed]
+
+def _remove_old_versions(directory: str):
+    # Workers still mapping an old version keep their pages until they unmap them
+    keep = set(_written(directory)[:KEEP_VERSIONS])
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if path not in keep and not name.startswith('.staging-'):
+            # Older versions, and snapshots of an earlier format
+            shutil.rmtree(path, ignore_errors=True)
+
+def open_snapshot(path: str) -> Optional[VetSnapshot]:
+    """Memory-map a written snapshot, or None if it is missing or of another format"""
+    if not os.path.isdir(path):
+        return None
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('service_features') != list(SERVICE_FEATURES):
+            return None
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in COLUMNS}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not open vet snapshot {path}: {e}")
+        return None
+    return VetSnapshot(manifest, columns)
+
+class SnapshotStore:
+    """The current snapshot of this process, checked against the data version on every get"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _directory(self) -> str:
+        return self.directory or default_directory()
+
+    def open_latest(self) -> Optional[VetSnapshot]:
+        """Map the newest snapshot on disk (at startup, before any request)"""
+        for path in _written(self._directory()):
+            snapshot = open_snapshot(path)
+            if snapshot is not None:
+                self._snapshot = snapshot
+                logger.info(f"Mapped vet snapshot {snapshot.key} ({len(snapshot)} vets)")
+                return snapshot
+        return None
+
+    def _load(self, key: str) -> VetSnapshot:
+        """The snapshot for key: the current one, mapped from disk, or built and written"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.key == key:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.key == key:
+                return snapshot
+            snapshot = open_snapshot(os.path.join(self._directory(), key))
+            if snapshot is None:
+                conn = connect_raw()
+                try:
+                    snapshot = build_snapshot(conn)
+                finally:
+                    conn.close()
+                try:
+                    snapshot = open_snapshot(write_snapshot(snapshot, self._directory())) or snapshot
+                except OSError as e:
+                    logger.warning(f"Could not write vet snapshot: {e}")
+            self._snapshot = snapshot
+            return snapshot
+
+    def get(self, db: Session) -> VetSnapshot:
+        """A snapshot matching the database; normally already written by refresh"""
+        return self._load(snapshot_key(*db.execute(text(KEY_SQL)).one()))
+
+    def refresh(self):
+        """Write the snapshot for the current data unless it exists (a background task after writes)"""
+        conn = connect_raw()
+        try:
+            key = snapshot_key(*conn.execute(KEY_SQL).fetchone())
+        finally:
+            conn.close()
+        self._load(key)
+
+vet_snapshot = SnapshotStore()
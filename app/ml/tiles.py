@@ -0,0 +1,189 @@
+"""Cached, distance-sorted vet lists per geohash tile of user origins.
+
+Most requests come from a few neighbourhoods, so for each origin tile
+that is actually requested we keep every vet within MAX_RADIUS_KM of the
+tile centre, sorted by distance, with their projected coordinates (see
+app.geo.projection). Recommendation scoring computes planar distances from
+the origin to the leading candidates in one vectorized call, walks them
+nearest first, and can stop as soon as no farther vet could beat the
+current top results. Tiles are kept in an LRU and dropped whenever vets
+are added, moved or deleted: right away in the process that made the
+change, and in every other process as soon as it sees a new location
+version (app.http_cache). Other writes leave them alone.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from heapq import heappop, heappush
+import math
+import threading
+
+import numpy as np
+
+from app.geo.projection import planar_km, project, project_many
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Precision 6 cells are about 0.9 x 0.6 km in Sofia
+PRECISION = 6
+MAX_TILES = 1024
+MAX_RADIUS_KM = 100.0
+
+EARTH_RADIUS_KM = 6371.0088
+# Cell edges are very nearly straight in the projection; pad the cell radius for the rest
+CELL_MARGIN = 0.001
+
+def geohash_encode(lat: float, lon: float, precision: int = PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+def geohash_bounds(geohash: str):
+    """(min_lat, max_lat, min_lon, max_lon) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+class DistanceTile:
+    """Vets sorted by planar distance from a tile centre, with bounds on the distance from any point in the tile.
+    
+    vets are (id, x, y) rows of projected coordinates in metres.
+    """
+
+    def __init__(self, geohash: str, vets: list):
+        min_lat, max_lat, min_lon, max_lon = geohash_bounds(geohash)
+        center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        self.geohash = geohash
+        self.center = project(center_lat, center_lon)
+        # Farthest a point of the cell (corners and edge midpoints) can be from its centre
+        edge_xs, edge_ys = project_many(
+            [min_lat, min_lat, max_lat, max_lat, min_lat, max_lat, center_lat, center_lat],
+            [min_lon, max_lon, min_lon, max_lon, center_lon, center_lon, min_lon, max_lon]
+        )
+        self.radius_km = float(planar_km(*self.center, edge_xs, edge_ys).max()) * (1 + CELL_MARGIN)
+
+        ids = np.array([vet_id for vet_id, _, _ in vets], dtype=np.int64)
+        xs = np.array([v[1] for v in vets], dtype=float)
+        ys = np.array([v[2] for v in vets], dtype=float)
+        distances = planar_km(*self.center, xs, ys)
+        keep = distances <= MAX_RADIUS_KM + self.radius_km
+        order = np.argsort(distances[keep], kind='stable')
+        self.vet_ids = ids[keep][order].tolist()
+        self.distances = distances[keep][order].tolist()
+        self.xs, self.ys = xs[keep][order], ys[keep][order]
+
+    def min_distance(self, i: int) -> float:
+        """Lower bound on the planar distance from any origin in the tile to the i-th vet"""
+        return max(0.0, self.distances[i] - self.radius_km)
+
+    def candidates(self, max_distance_km: float) -> int:
+        """Number of leading vets that may be within max_distance_km of an origin in the tile"""
+        return bisect_right(self.distances, max_distance_km + self.radius_km)
+
+    def distances_from(self, x: float, y: float, count: int) -> np.ndarray:
+        """Planar distances in km from a projected origin to the first count vets"""
+        return planar_km(x, y, self.xs[:count], self.ys[:count])
+
+    def nearest_first(self, x: float, y: float, max_distance_km: float):
+        """Yield (distance, index) of the vets within max_distance_km of a projected origin, nearest first.
+        
+        An expanding ring search: vets enter a heap in tile order, and each
+        is released as soon as the ring of the next one (its lower bound)
+        has grown past it, so the first results come without ordering them all.
+        """
+        count = self.candidates(max_distance_km)
+        distances = self.distances_from(x, y, count).tolist()
+        ring = []
+        for i, distance in enumerate(distances):
+            radius = self.min_distance(i)
+            while ring and ring[0][0] <= radius:
+                yield heappop(ring)
+            if distance <= max_distance_km:
+                heappush(ring, (distance, i))
+        while ring:
+            yield heappop(ring)
+
+_caches = []
+
+class DistanceTileCache:
+    """LRU of tiles by origin geohash, built by factory(geohash, vets), for one data version at a time"""
+
+    def __init__(self, precision: int = PRECISION, max_tiles: int = MAX_TILES, factory=DistanceTile):
+        self.precision = precision
+        self.max_tiles = max_tiles
+        self.factory = factory
+        self._tiles = OrderedDict()
+        self._generation = 0
+        self._version = None
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get(self, lat: float, lon: float, vets, version=None):
+        """The tile of an origin, built from vets ((id, coordinate, coordinate) rows) if not cached.
+        
+        version is the location version (app.http_cache) the vets were
+        read at; read it before the vets. Writes by other processes only
+        show up as a new version, which drops every tile built for another one.
+        """
+        geohash = geohash_encode(lat, lon, self.precision)
+        with self._lock:
+            if version is not None and version != self._version:
+                self._tiles.clear()
+                self._generation += 1
+                self._version = version
+            tile = self._tiles.get(geohash)
+            if tile is not None:
+                self._tiles.move_to_end(geohash)
+                return tile
+            generation = self._generation
+        tile = self.factory(geohash, [
+            (vet_id, a, b) for vet_id, a, b in vets
+            if a is not None and b is not None and math.isfinite(a) and math.isfinite(b)
+        ])
+        with self._lock:
+            if generation != self._generation:
+                # Vets changed while building; use the tile once but do not keep it
+                return tile
+            self._tiles[geohash] = tile
+            self._tiles.move_to_end(geohash)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def invalidate(self):
+        """Drop all tiles"""
+        with self._lock:
+            self._tiles.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._tiles)
+
+def invalidate_tiles():
+    """Drop the tiles of every cache (call after vets are added, moved or deleted)"""
+    for cache in _caches:
+        cache.invalidate()
+
+distance_tiles = DistanceTileCache()
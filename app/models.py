@@ -1,6 +1,6 @@
 """SQLAlchemy database models"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -14,17 +14,23 @@ class Vet(Base):
     address = Column(String(500))
     location_lat = Column(Float, nullable=False)
     location_lon = Column(Float, nullable=False)
+    # location projected to app.geo.projection.PROJECTED_CRS, in metres
+    location_x = Column(Float)
+    location_y = Column(Float)
     price_range = Column(String(50))
     rating = Column(Float, default=0.0)
     description = Column(Text)
     website = Column(String(255))
     emergency_service = Column(Boolean, default=False)
+    # Administrative district from VET_DISTRICTS_FILE (see app.geo.districts)
+    district = Column(String(100), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     services = relationship("Service", back_populates="vet", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="vet", cascade="all, delete-orphan")
     working_hours = relationship("WorkingHours", back_populates="vet", cascade="all, delete-orphan")
+    rating_histogram = relationship("RatingHistogram", back_populates="vet", uselist=False, cascade="all, delete-orphan")
 
 class Service(Base):
     __tablename__ = "services"
@@ -56,6 +62,25 @@ class Review(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     vet = relationship("Vet", back_populates="reviews")
+    
+    # Newest-first keyset pagination per vet
+    __table_args__ = (Index("ix_reviews_vet_id_created_at", "vet_id", "created_at", "id"),)
+
+class RatingHistogram(Base):
+    """Review counts per star rating, kept up to date on every review insert"""
+    __tablename__ = "vet_rating_histograms"
+    
+    vet_id = Column(Integer, ForeignKey("vets.id", ondelete="CASCADE"), primary_key=True)
+    stars_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    vet = relationship("Vet", back_populates="rating_histogram")
+    
+    def counts(self) -> dict:
+        return {stars: getattr(self, f"stars_{stars}") for stars in range(1, 6)}
 
 class WorkingHours(Base):
     __tablename__ = "working_hours"
@@ -67,4 +92,28 @@ class WorkingHours(Base):
     close_time = Column(String(10))
     is_closed = Column(Boolean, default=False)
     
-    vet = relationship("Vet", back_populates="working_hours")
\ No newline at end of file
+    vet = relationship("Vet", back_populates="working_hours")
+class DataVersion(Base):
+    """Counter bumped by every API write, used to build ETags, plus narrower counters for caches"""
+    __tablename__ = "data_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # Bumped when vets are added, moved or deleted
+    location_version = Column(Integer, nullable=False, default=0, server_default='0')
+    # Bumped when the vet snapshot columns change (app.ml.snapshot)
+    scoring_version = Column(Integer, nullable=False, default=0, server_default='0')
+    # Bumped when working hours change
+    hours_version = Column(Integer, nullable=False, default=0, server_default='0')
+
+class RecommendationEvent(Base):
+    """Append-only recommendation feedback: impressions and what users did with them"""
+    __tablename__ = "recommendation_events"
+    
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(20), nullable=False)
+    request_id = Column(String(32), nullable=False, index=True)
+    vet_id = Column(Integer, nullable=False)
+    position = Column(Integer)
+    payload = Column(Text)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,178 @@
+"""Opt-in cProfile capture of slow recommendation requests.
+
+Enabled by setting VET_PROFILE_SLOW_MS. A sampled fraction of requests
+under the profiled path prefix run under cProfile; those slower than the
+threshold are kept in a ring buffer readable through /admin/profiles
+(with the X-Admin-Token header matching VET_ADMIN_TOKEN).
+
+    VET_PROFILE_SLOW_MS      latency threshold in milliseconds (unset = off)
+    VET_PROFILE_SAMPLE_RATE  fraction of requests to profile (default 1.0)
+    VET_PROFILE_KEEP         number of profiles to keep (default 20)
+    VET_ADMIN_TOKEN          token for the admin endpoints (unset = disabled)
+"""
+from collections import deque
+from datetime import datetime
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# (category, predicate on a pstats (filename, line, function) key)
+CATEGORIES = [
+    ('geodesic', lambda f: 'geopy' in f[0]),
+    ('sql', lambda f: 'sqlalchemy/engine' in f[0] or f[2] in ("<method 'execute' of 'sqlite3.Cursor' objects>",
+                                                              "<method 'fetchall' of 'sqlite3.Cursor' objects>")),
+    ('orm_hydration', lambda f: 'sqlalchemy/orm/loading' in f[0]),
+    ('service_matching', lambda f: f[2] in ('get_service_match_score', 'calculate_service_similarity')),
+    ('sorting', lambda f: f[2] in ("<method 'sort' of 'list' objects>", '<built-in method builtins.sorted>')),
+]
+
+TOP_FUNCTIONS = 25
+
+def breakdown(stats: pstats.Stats) -> dict:
+    """Cumulative seconds per category, counting nested calls within a category once"""
+    result = {}
+    for category, matches in CATEGORIES:
+        total = 0.0
+        for func, (_, _, _, cumulative, callers) in stats.stats.items():
+            if matches(func) and not any(matches(caller) for caller in callers):
+                total += cumulative
+        result[category] = round(total, 6)
+    return result
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> list:
+    """The functions with the highest cumulative time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'own_seconds': round(own, 6),
+            'cumulative_seconds': round(cumulative, 6),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+class ProfileStore:
+    """Ring buffer of the last N slow-request profiles"""
+
+    def __init__(self, keep: int = 20):
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> dict:
+        with self._lock:
+            profile = {'id': next(self._ids), **profile}
+            self._profiles.append(profile)
+        return profile
+
+    def list(self) -> list:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id: int) -> Optional[dict]:
+        with self._lock:
+            return next((p for p in self._profiles if p['id'] == profile_id), None)
+
+store = ProfileStore(int(os.environ.get('VET_PROFILE_KEEP', 20)))
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled requests under a path prefix.
+
+    Only one request is profiled at a time (cProfile is per thread and the
+    event loop interleaves requests); others run unprofiled meanwhile.
+    """
+
+    def __init__(self, app, slow_ms: float, sample_rate: float = 1.0, path_prefix: str = '/recommendations'):
+        self.app = app
+        self.slow_seconds = slow_ms / 1000
+        self.sample_rate = sample_rate
+        self.path_prefix = path_prefix
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix)
+                or random.random() >= self.sample_rate or not self._busy.acquire(blocking=False)):
+            return await self.app(scope, receive, send)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.disable()
+        finally:
+            self._busy.release()
+            duration = time.perf_counter() - started
+            if duration >= self.slow_seconds:
+                self._keep(scope, duration, profiler)
+
+    def _keep(self, scope, duration, profiler):
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS * 2)
+        profile = store.add({
+            'timestamp': datetime.now().isoformat(),
+            'method': scope['method'],
+            'path': scope['path'],
+            'query': scope.get('query_string', b'').decode('latin-1'),
+            'duration_ms': round(duration * 1000, 2),
+            'breakdown': breakdown(stats),
+            'top_functions': top_functions(stats),
+            'report': text.getvalue(),
+        })
+        logger.warning(f"Slow request profiled ({profile['duration_ms']} ms): "
+                       f"{profile['method']} {profile['path']} -> /admin/profiles/{profile['id']}")
+
+def install(app):
+    """Add the profiling middleware if VET_PROFILE_SLOW_MS is set"""
+    slow_ms = os.environ.get('VET_PROFILE_SLOW_MS')
+    if slow_ms:
+        app.add_middleware(
+            ProfilingMiddleware,
+            slow_ms=float(slow_ms),
+            sample_rate=float(os.environ.get('VET_PROFILE_SAMPLE_RATE', 1.0))
+        )
+        logger.info(f"Profiling /recommendations requests slower than {slow_ms} ms")
+
+def _check_admin_token(token: Optional[str]):
+    expected = os.environ.get('VET_ADMIN_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if token != expected:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter()
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """List captured slow-request profiles (newest last), without the full reports"""
+    _check_admin_token(x_admin_token)
+    return {
+        'profiles': [
+            {key: value for key, value in profile.items() if key not in ('report', 'top_functions')}
+            for profile in store.list()
+        ]
+    }
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: int, x_admin_token: Optional[str] = Header(None)):
+    """Get one captured profile including its top functions and pstats report"""
+    _check_admin_token(x_admin_token)
+    profile = store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation"""
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class VetCreate(BaseModel):
@@ -43,6 +43,11 @@ class ReviewCreate(BaseModel):
     text: str = Field(..., min_length=10, max_length=2000)
     reviewer_name: str = Field(..., min_length=2, max_length=255)
 
+class FeedbackCreate(BaseModel):
+    request_id: str = Field(..., min_length=32, max_length=32)
+    vet_id: int
+    action: str = Field(..., pattern="^(open|call|website|directions)$")
+
 class WorkingHoursCreate(BaseModel):
     day_of_week: str
     open_time: Optional[str] = None
@@ -54,15 +59,225 @@ class VetResponse(BaseModel):
     name: str
     email: str
     phone: str
-    address: str
+    address: Optional[str]
     location_lat: float
     location_lon: float
-    price_range: str
-    rating: float
+    price_range: Optional[str]
+    rating: Optional[float]
     description: Optional[str]
     website: Optional[str]
-    emergency_service: bool
-    created_at: datetime
+    emergency_service: Optional[bool]
+    district: Optional[str] = None
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class ServiceResponse(BaseModel):
+    id: int
+    vet_id: int
+    condition: Optional[str]
+    equipment: Optional[str]
+    hotel_cats: Optional[bool]
+    hotel_dogs: Optional[bool]
+    grooming: Optional[bool]
+    wild_animals: Optional[bool]
+    special_food: Optional[str]
+    surgery: Optional[bool]
+    vaccination: Optional[bool]
+    dental_care: Optional[bool]
+    created_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class ReviewResponse(BaseModel):
+    id: int
+    vet_id: int
+    rating: int
+    text: Optional[str]
+    reviewer_name: Optional[str]
+    created_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class WorkingHoursResponse(BaseModel):
+    id: int
+    vet_id: int
+    day_of_week: str
+    open_time: Optional[str]
+    close_time: Optional[str]
+    is_closed: Optional[bool]
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class VetServicesResponse(BaseModel):
+    vet_name: str
+    services: List[ServiceResponse]
+
+class VetReviewsResponse(BaseModel):
+    vet_name: str
+    average_rating: Optional[float]
+    total_reviews: int
+    rating_histogram: Dict[int, int]
+    reviews: List[ReviewResponse]
+    next_cursor: Optional[str]
+
+class VetWorkingHoursResponse(BaseModel):
+    vet_name: str
+    working_hours: List[WorkingHoursResponse]
+
+class ReviewPage(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    items: List[ReviewResponse]
+
+class VetDetailResponse(BaseModel):
+    # Sections the client did not ask for are left out
+    vet: VetResponse
+    services: Optional[List[ServiceResponse]] = None
+    working_hours: Optional[List[WorkingHoursResponse]] = None
+    reviews: Optional[ReviewPage] = None
+
+class Location(BaseModel):
+    lat: float
+    lon: float
+
+class VetListItem(BaseModel):
+    id: int
+    name: str
+    phone: str
+    address: Optional[str]
+    rating: Optional[float]
+    price_range: Optional[str]
+    emergency_service: Optional[bool]
+    location: Location
+
+class VetListResponse(BaseModel):
+    total: int
+    vets: List[VetListItem]
+
+class DistrictCount(BaseModel):
+    name: str
+    vet_count: int
+
+class DistrictListResponse(BaseModel):
+    districts: List[DistrictCount]
+
+class VetSearchResult(BaseModel):
+    vet_id: int
+    name: str
+    address: Optional[str]
+    rating: Optional[float]
+    price_range: Optional[str]
+    emergency_service: Optional[bool]
+    score: float
+    distance_km: Optional[float] = None
+    location: Location
+
+class VetSearchResponse(BaseModel):
+    query: str
+    found: int
+    results: List[VetSearchResult]
+
+class VetDetails(BaseModel):
+    phone: str
+    address: Optional[str]
+    rating: Optional[float]
+    price_range: Optional[str]
+    emergency_service: Optional[bool]
+    website: Optional[str]
+    location: Location
+
+class Recommendation(BaseModel):
+    vet_id: int
+    vet_name: str
+    total_score: float
+    distance_km: float
+    distance_score: float
+    service_match_score: float
+    rating_score: float
+    price_match_score: float
+    emergency_score: float
+    travel_minutes: Optional[float] = None
+    vet_details: VetDetails
+
+class RecommendationFilters(BaseModel):
+    required_services: Optional[List[Dict[str, Any]]]
+    preferred_price: Optional[str]
+    needs_emergency: bool
+    max_distance_km: float
+    open_at_minute: Optional[int]
+    max_travel_minutes: Optional[float] = None
+    district: Optional[str] = None
+    polygon: Optional[str] = None
+
+class RecommendationsResponse(BaseModel):
+    # Only message and recommendations are set when there are no vets at all
+    message: Optional[str] = None
+    total_found: Optional[int] = None
+    showing_top: Optional[int] = None
+    user_location: Optional[Location] = None
+    filters: Optional[RecommendationFilters] = None
+    ranking: Optional[str] = None
+    request_id: Optional[str] = None
+    recommendations: List[Recommendation]
+
+class SimilarVet(BaseModel):
+    vet_id: int
+    vet_name: str
+    similarity_score: float
+    rating: Optional[float]
+    price_range: Optional[str]
+    phone: str
+    address: Optional[str]
+
+class SimilarVetsResponse(BaseModel):
+    # Only error is set when the reference vet does not exist
+    error: Optional[str] = None
+    reference_vet: Optional[str] = None
+    similar_vets: Optional[List[SimilarVet]] = None
+
+class PopularVet(BaseModel):
+    vet_id: int
+    name: str
+    rating: Optional[float]
+    review_count: int
+    popularity_score: float
+    phone: str
+    address: Optional[str]
+    price_range: Optional[str]
+    emergency_service: Optional[bool]
+
+class PopularVetsResponse(BaseModel):
+    top_popular_vets: List[PopularVet]
+
+class NearbyVet(BaseModel):
+    vet_id: int
+    name: str
+    distance_km: float
+    rating: Optional[float]
+    phone: str
+    address: Optional[str]
+    price_range: Optional[str]
+    location: Location
+
+class NearbyVetsResponse(BaseModel):
+    user_location: Location
+    radius_km: float
+    found: int
+    nearby_vets: List[NearbyVet]
+
+class AutocompleteSuggestion(BaseModel):
+    text: str
+    value: str
+    kind: str
+    distance: int
+
+class AutocompleteResponse(BaseModel):
+    query: str
+    suggestions: List[AutocompleteSuggestion]
@@ -0,0 +1 @@
+"""Benchmarks for the Sofia Vet Platform"""
@@ -0,0 +1,151 @@
+"""Synthetic Sofia clinic data for benchmarks"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.fts import bulk_load
+from app.geo.projection import project
+from app.models import Vet, Service, Review, WorkingHours, RatingHistogram
+
+# Roughly the Sofia city area
+LAT_RANGE = (42.62, 42.76)
+LON_RANGE = (23.20, 23.45)
+
+SERVICE_NAMES = [
+    "Cat Hotel", "Dog Hotel", "Grooming", "Deworming", "Prophylaxis", "Dental Care",
+    "Surgery", "Vaccination", "Ophthalmology", "Microchipping", "Travel Documents"
+]
+EQUIPMENT_NAMES = ["X-Ray", "Ultrasound", "Incubator", "Oxygen Machine"]
+LAB_TESTS = ["Blood tests", "Urine analysis", "Fecal examination", "Biochemistry panel"]
+CONDITIONS = ["dermatology", "cardiology", "orthopedics", "oncology", "exotic animals", "dentistry"]
+PRICE_RANGES = ["low", "med", "high"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+REVIEW_TEXTS = [
+    "Very friendly staff and quick appointment.",
+    "Great care for my cat, highly recommended.",
+    "A bit expensive but the doctor was excellent.",
+    "Long waiting time, otherwise fine.",
+]
+
+BATCH_SIZE = 5000
+
+def _random_location(rng):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+
+def _insert_batches(session, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+def populate_api(session: Session, n_vets: int, seed: int = 42):
+    """Fill the API tables (vets, services, reviews, working_hours, rating histograms) with n_vets clinics"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    vets, services, reviews, hours, histograms = [], [], [], [], []
+    for vet_id in range(1, n_vets + 1):
+        lat, lon = _random_location(rng)
+        x, y = project(lat, lon)
+        vets.append({
+            'id': vet_id,
+            'name': f"Vet Clinic {vet_id}",
+            'email': f"clinic{vet_id}@example.bg",
+            'phone': f"+3592{vet_id:07d}",
+            'address': f"{rng.randint(1, 200)} Bulgaria Blvd, Sofia",
+            'location_lat': lat,
+            'location_lon': lon,
+            'location_x': x,
+            'location_y': y,
+            'price_range': rng.choice(PRICE_RANGES),
+            'rating': round(rng.uniform(1, 5), 2),
+            'description': "Small animal clinic",
+            'emergency_service': rng.random() < 0.2,
+            'created_at': now,
+            'updated_at': now
+        })
+
+        for _ in range(rng.randint(1, 3)):
+            services.append({
+                'vet_id': vet_id,
+                'condition': rng.choice(CONDITIONS),
+                'equipment': rng.choice(EQUIPMENT_NAMES),
+                'hotel_cats': rng.random() < 0.3,
+                'hotel_dogs': rng.random() < 0.3,
+                'grooming': rng.random() < 0.4,
+                'wild_animals': rng.random() < 0.1,
+                'surgery': rng.random() < 0.5,
+                'vaccination': rng.random() < 0.8,
+                'dental_care': rng.random() < 0.4,
+                'created_at': now
+            })
+
+        histogram = {f"stars_{stars}": 0 for stars in range(1, 6)}
+        for _ in range(rng.randint(0, 10)):
+            rating = rng.randint(1, 5)
+            histogram[f"stars_{rating}"] += 1
+            reviews.append({
+                'vet_id': vet_id,
+                'rating': rating,
+                'text': rng.choice(REVIEW_TEXTS),
+                'reviewer_name': f"User {rng.randint(1, 10**6)}",
+                'created_at': now - timedelta(days=rng.randint(0, 1000))
+            })
+        histograms.append({'vet_id': vet_id, **histogram})
+
+        for day in DAYS:
+            hours.append({
+                'vet_id': vet_id,
+                'day_of_week': day,
+                'open_time': "09:00",
+                'close_time': "19:00" if day != "Sunday" else "13:00",
+                'is_closed': False
+            })
+
+    # The session's sqlite3 connection, so search indexing can be paused in the same transaction
+    with bulk_load(session.connection().connection.driver_connection, 'vets_fts'):
+        _insert_batches(session, Vet, vets)
+        _insert_batches(session, Service, services)
+        _insert_batches(session, Review, reviews)
+        _insert_batches(session, WorkingHours, hours)
+        _insert_batches(session, RatingHistogram, histograms)
+        session.commit()
+
+def populate_clinics(conn, n_clinics: int, seed: int = 42):
+    """Fill the Streamlit tables (clinics, services, equipment, lab_tests, reviews)"""
+    rng = random.Random(seed)
+
+    clinics, services, equipment, lab_tests, reviews = [], [], [], [], []
+    for clinic_id in range(1, n_clinics + 1):
+        lat, lon = _random_location(rng)
+        clinics.append((
+            clinic_id, f"Vet Clinic {clinic_id}", f"{rng.randint(1, 200)} Vitosha Blvd, Sofia",
+            f"+3592{clinic_id:07d}", f"clinic{clinic_id}@example.bg", lat, lon,
+            round(rng.uniform(1, 5), 2), int(rng.random() < 0.2), int(rng.random() < 0.3),
+            int(rng.random() < 0.1)
+        ))
+        services.extend((clinic_id, name) for name in rng.sample(SERVICE_NAMES, rng.randint(1, 5)))
+        equipment.extend((clinic_id, name) for name in rng.sample(EQUIPMENT_NAMES, rng.randint(0, 3)))
+        lab_tests.extend((clinic_id, name) for name in rng.sample(LAB_TESTS, rng.randint(0, 3)))
+        reviews.extend(
+            (clinic_id, rng.randint(1, 5), rng.choice(REVIEW_TEXTS), rng.randint(1, 3))
+            for _ in range(rng.randint(0, 10))
+        )
+
+    with bulk_load(conn, 'clinics_fts'):
+        _insert_clinic_rows(conn, clinics, services, equipment, lab_tests, reviews)
+
+def _insert_clinic_rows(conn, clinics, services, equipment, lab_tests, reviews):
+    conn.executemany("""
+        INSERT INTO clinics (
+            id, name, address, phone, email, latitude, longitude, rating,
+            emergency_available, inpatient_care, wild_animal_care
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, clinics)
+    conn.executemany("INSERT INTO services (clinic_id, service_name) VALUES (?, ?)", services)
+    conn.executemany("INSERT INTO equipment (clinic_id, equipment_name) VALUES (?, ?)", equipment)
+    conn.executemany("INSERT INTO lab_tests (clinic_id, test_name) VALUES (?, ?)", lab_tests)
+    conn.executemany(
+        "INSERT INTO reviews (clinic_id, rating, comment, price_rating) VALUES (?, ?, ?, ?)",
+        reviews
+    )
@@ -0,0 +1,107 @@
+"""Cold-start import time of the API and Streamlit entry points.
+
+Runs the module-level imports of each entry point in a fresh interpreter
+under `python -X importtime` (the scripts themselves are not executed) and
+reports the median total import time and the slowest top-level imports.
+Heavy optional subsystems (map rendering, ML, geo) are imported on first
+use, so the check fails if any of LAZY_MODULES is imported at startup, or
+if an entry point is slower than --budget-ms:
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 1500 --output importtime.json
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    'api': 'main.py',
+    'streamlit': 'streamlit_app.py',
+}
+
+# Only imported on first use, never at startup
+LAZY_MODULES = ('folium', 'geopy', 'geopandas', 'shapely', 'pyproj', 'pyogrio', 'sklearn', 'scipy', 'joblib')
+
+def entry_imports(path: str) -> str:
+    """The module-level import statements of a script, as code"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def measure(code: str) -> dict:
+    """Cumulative import time (us) of each top-level import of code, and every module it imported"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{result.stderr[-2000:]}")
+    top_level, modules = {}, set()
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        modules.add(name.strip())
+        # Nested imports are indented by two spaces per level
+        if not name.startswith('  '):
+            top_level[name.strip()] = int(parts[1])
+    return {'top_level': top_level, 'modules': modules}
+
+def benchmark(entry: str, repeat: int, top: int) -> dict:
+    code = entry_imports(os.path.join(ROOT, ENTRY_POINTS[entry]))
+    # Interpreter startup imports (site, encodings, ...) are not the entry point's
+    startup = set(measure('pass')['top_level'])
+    totals, runs = [], []
+    for _ in range(repeat):
+        run = measure(code)
+        imports = {name: us for name, us in run['top_level'].items() if name not in startup}
+        totals.append(sum(imports.values()) / 1000)
+        runs.append((imports, run['modules']))
+    imports, modules = runs[-1]
+    return {
+        'entry': ENTRY_POINTS[entry],
+        'median_ms': round(statistics.median(totals), 1),
+        'min_ms': round(min(totals), 1),
+        'slowest': [
+            {'module': name, 'ms': round(us / 1000, 1)}
+            for name, us in sorted(imports.items(), key=lambda item: -item[1])[:top]
+        ],
+        'eager_heavy_modules': sorted({name.split('.')[0] for name in modules} & set(LAZY_MODULES)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', choices=sorted(ENTRY_POINTS), nargs='+', help='entry points to measure')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per entry point')
+    parser.add_argument('--top', type=int, default=8, help='slowest top-level imports to list')
+    parser.add_argument('--budget-ms', type=float, help='fail if an entry point median exceeds this')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = {entry: benchmark(entry, args.repeat, args.top) for entry in args.only or sorted(ENTRY_POINTS)}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for entry, result in results.items():
+        print(f"{entry} ({result['entry']}): median {result['median_ms']} ms, min {result['min_ms']} ms")
+        for item in result['slowest']:
+            print(f"    {item['ms']:8.1f} ms  {item['module']}")
+        if result['eager_heavy_modules']:
+            print(f"  FAIL: imported at startup: {', '.join(result['eager_heavy_modules'])}")
+            failed = True
+        if args.budget_ms is not None and result['median_ms'] > args.budget_ms:
+            print(f"  FAIL: over the {args.budget_ms} ms budget")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""Load generator for the FastAPI service.
+
+Replays a mix of realistic traffic (recommendations and nearby lookups from
+random Sofia coordinates, popular vets, review posts and vet updates) at a
+fixed concurrency and reports latency percentiles, throughput and error
+rates per endpoint.
+
+By default a scratch database is populated and the API is started locally
+with uvicorn; pass --url to load an already running server instead:
+
+    python -m benchmarks.loadtest --vets 1000 --concurrency 32 --duration 30 --workers 4
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from benchmarks.datagen import CONDITIONS, LAT_RANGE, LON_RANGE, PRICE_RANGES, REVIEW_TEXTS
+
+# (name, weight) of the request mix
+DEFAULT_MIX = {
+    'recommendations': 35,
+    'nearby': 25,
+    'popular': 15,
+    'review': 15,
+    'update_vet': 10,
+}
+
+def _random_point(rng):
+    return round(rng.uniform(*LAT_RANGE), 5), round(rng.uniform(*LON_RANGE), 5)
+
+def build_request(name, rng, vet_ids):
+    """(method, path, params, json body) for one request of the given kind"""
+    if name == 'recommendations':
+        lat, lon = _random_point(rng)
+        params = {'user_lat': lat, 'user_lon': lon, 'max_distance_km': rng.choice([5, 10, 20]), 'top_n': 5}
+        if rng.random() < 0.5:
+            params['conditions'] = rng.choice(CONDITIONS)
+        if rng.random() < 0.3:
+            params['vaccination'] = 'true'
+        if rng.random() < 0.2:
+            params['open_now'] = 'true'
+        return 'POST', '/recommendations', params, None
+    if name == 'nearby':
+        lat, lon = _random_point(rng)
+        return 'GET', '/recommendations/nearby', {'user_lat': lat, 'user_lon': lon, 'radius_km': rng.choice([2, 5, 10])}, None
+    if name == 'popular':
+        return 'GET', '/recommendations/popular', {'top_n': rng.choice([5, 10])}, None
+    if name == 'review':
+        body = {
+            'rating': rng.randint(1, 5),
+            'text': rng.choice(REVIEW_TEXTS),
+            'reviewer_name': f"Load Tester {rng.randint(1, 10**6)}"
+        }
+        return 'POST', f"/vets/{rng.choice(vet_ids)}/reviews", None, body
+    if name == 'update_vet':
+        body = {'price_range': rng.choice(PRICE_RANGES), 'description': f"Updated {datetime.now().isoformat()}"}
+        return 'PUT', f"/vets/{rng.choice(vet_ids)}", None, body
+    raise ValueError(f"Unknown request kind: {name}")
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(samples, elapsed):
+    """Per-endpoint and overall statistics from (name, seconds, ok) samples"""
+    per_endpoint = {}
+    for name, seconds, ok in samples:
+        per_endpoint.setdefault(name, []).append((seconds, ok))
+    per_endpoint['total'] = [(seconds, ok) for _, seconds, ok in samples]
+
+    summary = {}
+    for name, results in per_endpoint.items():
+        latencies = sorted(seconds for seconds, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        summary[name] = {
+            'requests': len(results),
+            'errors': errors,
+            'error_rate': errors / len(results) if results else 0.0,
+            'throughput': len(results) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+    return summary
+
+async def _worker(client, deadline, mix, vet_ids, rng, samples, errors):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path, params, body = build_request(name, rng, vet_ids)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, json=body)
+            ok = response.status_code < 400
+            if not ok:
+                errors.setdefault(f"{name} {response.status_code}", response.text[:200])
+        except httpx.HTTPError as e:
+            ok = False
+            errors.setdefault(f"{name} {type(e).__name__}", str(e))
+        samples.append((name, time.perf_counter() - started, ok))
+
+async def run_load(base_url, concurrency, duration, mix, seed=42, warmup=2.0):
+    """Drive base_url with concurrency workers for duration seconds"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        response = await client.get('/vets', params={'limit': 1000})
+        response.raise_for_status()
+        vet_ids = [vet['id'] for vet in response.json()['vets']]
+        if not vet_ids:
+            raise RuntimeError(f"No vets found at {base_url}; populate the database first")
+
+        if warmup:
+            await asyncio.gather(*(
+                _worker(client, time.perf_counter() + warmup, mix, vet_ids, random.Random(seed - i - 1), [], {})
+                for i in range(concurrency)
+            ))
+
+        samples, errors = [], {}
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _worker(client, deadline, mix, vet_ids, random.Random(seed + i), samples, errors)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return summarize(samples, elapsed), errors
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _child_env():
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [repo_root, os.environ.get('PYTHONPATH')]))}
+
+def populate(n_vets):
+    """Populate the API database of the current directory with n_vets clinics"""
+    from app.database import SessionLocal, init_db
+    from benchmarks.datagen import populate_api
+
+    init_db()
+    with SessionLocal() as session:
+        populate_api(session, n_vets)
+
+def prepare_database(workdir, n_vets):
+    """Populate an API database in workdir.
+
+    Runs in a child process, since the API engine resolves vet_platform.db
+    relative to the working directory when it is created.
+    """
+    subprocess.run(
+        [sys.executable, '-m', 'benchmarks.loadtest', '--populate', str(n_vets)],
+        cwd=workdir, env=_child_env(), check=True
+    )
+
+def start_server(workdir, port, workers):
+    """Start create_app under uvicorn in a child process and wait until it answers"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.api:create_app', '--factory',
+         '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers), '--log-level', 'warning'],
+        cwd=workdir, env=_child_env()
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"API server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/vets", params={'limit': 1}).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("API server did not start within 60 seconds")
+
+def print_report(summary, errors):
+    print(f"{'endpoint':<16} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in summary.items():
+        print(f"{name:<16} {stats['requests']:>9} {stats['throughput']:>8.1f} {stats['error_rate']:>7.1%} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+    for key, message in errors.items():
+        print(f"  first error for {key}: {message}")
+
+def _parse_mix(values):
+    mix = dict(DEFAULT_MIX)
+    for value in values or []:
+        name, _, weight = value.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request kind: {name}")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='load an already running API instead of starting one')
+    parser.add_argument('--vets', type=int, default=1000, help='clinics to generate for the local server')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes for the local server')
+    parser.add_argument('--workdir', help='directory for the generated database (default: a temp dir)')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of measured load')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds of unmeasured load first')
+    parser.add_argument('--mix', nargs='+', metavar='KIND=WEIGHT',
+                        help=f"override request weights (kinds: {', '.join(DEFAULT_MIX)})")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--populate', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.populate:
+        populate(args.populate)
+        return
+
+    mix = _parse_mix(args.mix)
+    server = None
+    base_url = args.url
+    if not base_url:
+        workdir = args.workdir or tempfile.mkdtemp(prefix='vet-load-')
+        prepare_database(workdir, args.vets)
+        server, base_url = start_server(workdir, _free_port(), args.workers)
+
+    try:
+        summary, errors = asyncio.run(
+            run_load(base_url, args.concurrency, args.duration, mix, args.seed, args.warmup)
+        )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_report(summary, errors)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'url': args.url,
+                    'vets': None if args.url else args.vets,
+                    'workers': None if args.url else args.workers,
+                    'concurrency': args.concurrency,
+                    'duration': args.duration,
+                    'mix': mix,
+                    'timestamp': datetime.now().isoformat(),
+                },
+                'results': summary,
+                'errors': errors,
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""Benchmark runner for the recommendation, search and backup hot paths.
+
+Each size runs in its own worker process with a scratch directory holding a
+vet_platform.db for the API and one for the Streamlit app (the two schemas
+both define services and reviews tables, so they cannot share a file), so
+no in-process cache carries over between sizes. Results are written as JSON
+so runs can be compared across commits:
+
+    python -m benchmarks.run --sizes 100 1000 10000 --output before.json
+    python -m benchmarks.run --sizes 100 1000 10000 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from fastapi import Request
+
+from app import clinic_db
+from app.api import recommendations, vets
+from app.backup import write_backup
+from app.database import SessionLocal, init_db
+from app.ml.recommender import VetRecommendationEngine
+from benchmarks.datagen import populate_api, populate_clinics
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# Sofia center
+USER_LAT = 42.6977
+USER_LON = 23.3219
+
+def _with_session(func):
+    def run():
+        with SessionLocal() as session:
+            return func(session)
+    return run
+
+def _first_stream_line(db):
+    """Time to the first NDJSON line of /nearby/stream"""
+    async def first_line():
+        response = await recommendations.stream_nearby_vets(
+            request=Request({'type': 'http', 'headers': []}),
+            user_lat=USER_LAT, user_lon=USER_LON, radius_km=5, open_now=False, open_at=None, db=db
+        )
+        async for line in response.body_iterator:
+            return line
+    return asyncio.run(first_line())
+
+def api_benchmarks():
+    """(name, callable) pairs exercising the API hot paths"""
+    return [
+        ('api.get_recommendations', _with_session(lambda db: VetRecommendationEngine(db).get_recommendations(
+            user_location={'lat': USER_LAT, 'lon': USER_LON},
+            required_services=[{'condition': 'dermatology'}, {'vaccination': True}],
+            max_distance_km=10,
+            top_n=5
+        ))),
+        ('api.get_similar_vets', _with_session(lambda db: VetRecommendationEngine(db).get_similar_vets(1, top_n=3))),
+        ('api.popular', _with_session(lambda db: asyncio.run(
+            recommendations.get_popular_vets(top_n=5, db=db)
+        ))),
+        ('api.nearby', _with_session(lambda db: asyncio.run(recommendations.get_nearby_vets(
+            user_lat=USER_LAT, user_lon=USER_LON, radius_km=5, open_now=False, open_at=None, db=db
+        )))),
+        ('api.nearby_stream_first_line', _with_session(_first_stream_line)),
+        ('api.list_vets', _with_session(lambda db: asyncio.run(vets.list_vets(
+            skip=0, limit=100, price_range=None, emergency_only=False, district=None, polygon=None, db=db
+        )))),
+    ]
+
+def clinic_benchmarks(conn):
+    """(name, callable) pairs exercising the Streamlit SQL and backup paths"""
+    backup = io.BytesIO()
+    write_backup(conn, backup)
+    backup_bytes = backup.getvalue()
+
+    return [
+        ('clinics.search_all', lambda: clinic_db.search_clinics(conn)),
+        ('clinics.search_filtered', lambda: clinic_db.search_clinics(
+            conn, services=['Vaccination'], equipment=['X-Ray'], min_rating=3.0
+        )),
+        ('clinics.backup', lambda: write_backup(conn, io.BytesIO())),
+        ('clinics.restore', lambda: clinic_db.restore_clinics(conn, io.BytesIO(backup_bytes))),
+    ]
+
+def time_benchmark(func, repeat, max_seconds):
+    """Run func up to repeat times (at least once, stopping after max_seconds)"""
+    timings = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run_started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - run_started)
+        if time.perf_counter() - started > max_seconds:
+            break
+    return {
+        'runs': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+    }
+
+def run_size(size, repeat, max_seconds, only=None):
+    """Generate data for one size and run the benchmarks against it.
+
+    Must run in a fresh process whose working directory is the API
+    scratch directory, since the API engine resolves vet_platform.db
+    when it is created.
+    """
+    started = time.perf_counter()
+    init_db()
+    with SessionLocal() as session:
+        populate_api(session, size)
+
+    clinics_dir = os.path.join(os.getcwd(), '..', f'clinics-{size}')
+    os.makedirs(clinics_dir, exist_ok=True)
+    clinic_db.DB_PATH = os.path.abspath(os.path.join(clinics_dir, 'vet_platform.db'))
+    clinic_db.init_db()
+    conn = clinic_db.get_db_connection()
+    populate_clinics(conn, size)
+    print(f"   generated data in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    results = []
+    try:
+        for name, func in api_benchmarks() + clinic_benchmarks(conn):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            stats = time_benchmark(func, repeat, max_seconds)
+            results.append({'benchmark': name, 'size': size, **stats})
+            print(f"   {name:<28} median {stats['median'] * 1000:10.2f} ms  ({stats['runs']} runs)", file=sys.stderr)
+    finally:
+        conn.close()
+    return results
+
+def run(sizes, repeat, max_seconds, only=None, workdir=None):
+    """Run every size in a separate worker process and collect the results"""
+    workdir = workdir or tempfile.mkdtemp(prefix='vet-bench-')
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [repo_root, os.environ.get('PYTHONPATH')]))}
+
+    results = []
+    for size in sizes:
+        print(f"== {size} clinics", file=sys.stderr)
+        api_dir = os.path.join(workdir, f'api-{size}')
+        os.makedirs(api_dir, exist_ok=True)
+
+        command = [sys.executable, '-m', 'benchmarks.run', '--worker', str(size),
+                   '--repeat', str(repeat), '--max-seconds', str(max_seconds)]
+        if only:
+            command += ['--only', *only]
+        output = subprocess.run(command, cwd=api_dir, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results.extend(json.loads(output))
+
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """Print median ratios against a previous results file"""
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+
+    print(f"{'benchmark':<28} {'size':>7} {'before ms':>12} {'after ms':>12} {'ratio':>7}")
+    for result in results:
+        before = baseline.get((result['benchmark'], result['size']))
+        if not before:
+            continue
+        ratio = result['median'] / before['median'] if before['median'] else float('inf')
+        print(f"{result['benchmark']:<28} {result['size']:>7} {before['median'] * 1000:>12.2f} "
+              f"{result['median'] * 1000:>12.2f} {ratio:>7.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='clinic counts to benchmark (e.g. 100 1000 10000 100000)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per benchmark')
+    parser.add_argument('--max-seconds', type=float, default=30.0,
+                        help='stop repeating a benchmark after this many seconds')
+    parser.add_argument('--only', nargs='+', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--workdir', help='directory for the generated databases (default: a temp dir)')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='previous JSON results to compare against')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(run_size(args.worker, args.repeat, args.max_seconds, args.only), sys.stdout)
+        return
+
+    results = run(args.sizes, args.repeat, args.max_seconds, args.only, args.workdir)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
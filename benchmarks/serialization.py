@@ -0,0 +1,121 @@
+"""Response serialization benchmark: jsonable_encoder + JSONResponse vs typed models + ORJSONResponse.
+
+Mirrors what FastAPI does for an endpoint without a response model (generic
+jsonable_encoder, then json.dumps) and with one (pydantic validation and
+serialization, then orjson), on 1k-item /nearby, /vets and ORM payloads:
+
+    python -m benchmarks.serialization --items 1000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models import Vet
+from app.schemas import NearbyVetsResponse, RecommendationsResponse, VetListResponse, VetResponse
+from benchmarks.datagen import LAT_RANGE, LON_RANGE, PRICE_RANGES
+
+def _vet(rng, vet_id):
+    return {
+        'id': vet_id,
+        'name': f"Vet Clinic {vet_id}",
+        'phone': f"+3592{vet_id:07d}",
+        'address': f"{rng.randint(1, 200)} Bulgaria Blvd, Sofia",
+        'rating': round(rng.uniform(1, 5), 2),
+        'price_range': rng.choice(PRICE_RANGES),
+        'emergency_service': rng.random() < 0.2,
+        'location': {'lat': rng.uniform(*LAT_RANGE), 'lon': rng.uniform(*LON_RANGE)},
+    }
+
+def nearby_payload(rng, n):
+    vets = [_vet(rng, i) for i in range(1, n + 1)]
+    return {
+        'user_location': {'lat': 42.6977, 'lon': 23.3219},
+        'radius_km': 10,
+        'found': n,
+        'nearby_vets': [
+            {'vet_id': v['id'], 'name': v['name'], 'distance_km': round(rng.uniform(0, 10), 2), 'rating': v['rating'],
+             'phone': v['phone'], 'address': v['address'], 'price_range': v['price_range'], 'location': v['location']}
+            for v in vets
+        ]
+    }
+
+def list_payload(rng, n):
+    return {'total': n, 'vets': [_vet(rng, i) for i in range(1, n + 1)]}
+
+def recommendations_payload(rng, n):
+    recommendations = []
+    for vet in (_vet(rng, i) for i in range(1, n + 1)):
+        recommendations.append({
+            'vet_id': vet['id'], 'vet_name': vet['name'], 'total_score': round(rng.uniform(0, 100), 2),
+            'distance_km': round(rng.uniform(0, 10), 2), 'distance_score': 50.0, 'service_match_score': 100.0,
+            'rating_score': 80.0, 'price_match_score': 100.0, 'emergency_score': 100.0,
+            'vet_details': {key: vet[key] for key in ('phone', 'address', 'rating', 'price_range', 'emergency_service', 'location')}
+                           | {'website': None}
+        })
+    return {
+        'total_found': n, 'showing_top': n, 'user_location': {'lat': 42.6977, 'lon': 23.3219},
+        'filters': {'required_services': [{'condition': 'dermatology'}], 'preferred_price': None,
+                    'needs_emergency': False, 'max_distance_km': 50, 'open_at_minute': None},
+        'recommendations': recommendations
+    }
+
+def orm_payload(rng, n):
+    now = datetime.utcnow()
+    return [
+        Vet(id=i, name=f"Vet Clinic {i}", email=f"clinic{i}@example.bg", phone=f"+3592{i:07d}",
+            address="1 Vitosha Blvd, Sofia", location_lat=rng.uniform(*LAT_RANGE), location_lon=rng.uniform(*LON_RANGE),
+            price_range=rng.choice(PRICE_RANGES), rating=round(rng.uniform(1, 5), 2), description="Small animal clinic",
+            website=None, emergency_service=False, created_at=now, updated_at=now)
+        for i in range(1, n + 1)
+    ]
+
+def encode_generic(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+def typed_encoder(model):
+    adapter = TypeAdapter(model)
+
+    def encode(payload):
+        value = adapter.validate_python(payload, from_attributes=True)
+        return ORJSONResponse(adapter.dump_python(value, mode='json')).body
+    return encode
+
+def _median_ms(func, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000, help='items per payload')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    cases = [
+        ('/recommendations/nearby', nearby_payload(rng, args.items), NearbyVetsResponse),
+        ('/vets', list_payload(rng, args.items), VetListResponse),
+        ('/recommendations', recommendations_payload(rng, args.items), RecommendationsResponse),
+        ('ORM vets', orm_payload(rng, args.items), List[VetResponse]),
+    ]
+
+    print(f"{'payload':<26} {'generic ms':>11} {'typed+orjson ms':>16} {'speedup':>8}")
+    for name, payload, model in cases:
+        typed = typed_encoder(model)
+        assert typed(payload) and encode_generic(payload)
+        before = _median_ms(encode_generic, payload, args.repeat)
+        after = _median_ms(typed, payload, args.repeat)
+        print(f"{name:<26} {before:>11.2f} {after:>16.2f} {before / after:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
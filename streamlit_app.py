@@ -1,13 +1,16 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 from datetime import datetime
 import os
-import folium
-from streamlit_folium import st_folium
-from geopy.distance import geodesic
-import json
-import base64
+import numpy as np
+import tempfile
+from app.backup import record_backup, write_backup
+from app.autocomplete import AutocompleteIndex
+from app.clinic_db import get_db_connection, init_db, load_autocomplete, restore_clinics, search_clinics
+from app.i18n import (
+    t, available_languages, language_name, translate_service_name, translate_equipment_name,
+    service_from_display, equipment_from_display
+)
 
 # Page configuration
 st.set_page_config(
@@ -16,412 +19,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# Translation dictionary
-TRANSLATIONS = {
-    'en': {
-        # Page titles
-        'app_title': 'Sofia Vet Platform',
-        'app_subtitle': 'Find the best veterinary clinic for your pet',
-        'navigation': 'Navigation',
-        'search_clinics': 'Search Clinics',
-        'add_clinic': 'Add Clinic',
-        'add_review': 'Add Review',
-        'view_all_clinics': 'View All Clinics',
-        
-        # AI Recommendations page
-        'ai_recommendations': 'AI Recommendations',
-        'ai_recommendations_header': 'AI-Powered Clinic Recommendations',
-        'ai_recommendations_subtitle': 'Get personalized clinic recommendations based on your needs',
-        'your_preferences': 'Your Preferences',
-        'match_score': 'Match Score',
-        'score_breakdown': 'Score Breakdown',
-        'distance_score': 'Distance Score',
-        'service_match': 'Service Match',
-        'rating_score': 'Rating Score',
-        'price_match': 'Price Match',
-        'emergency_score': 'Emergency Score',
-        'get_recommendations': 'Get Recommendations',
-        'top_recommendations': 'Top Recommendations for You',
-        'showing_results': 'Showing top {count} matches',
-        'no_recommendations': 'No clinics found matching your criteria. Try adjusting your preferences.',
-        'recommendation_for': 'Recommendation #{num}',
-        'overall_match': 'Overall Match',
-        'why_recommended': 'Why This Clinic?',
-        'max_price_pref': 'Maximum Price Preference',
-        'any_price': 'Any Price',
-        
-        # Search page
-        'search_header': 'Search for Veterinary Clinics',
-        'your_location': 'Your Location (Optional)',
-        'location_help': 'Enter your location to find the nearest clinics and see distances',
-        'your_latitude': 'Your Latitude',
-        'your_longitude': 'Your Longitude',
-        'max_distance': 'Max Distance (km)',
-        'search_by_location': 'Search by location (find nearest clinics)',
-        'search_filters': 'Search Filters',
-        'quick_searches': 'Quick Searches (Click to auto-fill)',
-        'common_searches': 'Common Searches:',
-        'hotels_btn': 'Hotels',
-        'vaccination_btn': 'Vaccination',
-        'diagnostics_btn': 'Diagnostics',
-        'emergency_btn': 'Emergency',
-        'services': 'Services',
-        'equipment': 'Equipment',
-        'available': 'available',
-        'select_services': 'Select services (leave empty for all)',
-        'select_equipment': 'Select equipment (leave empty for all)',
-        'service_help': 'Select one or more services you\'re looking for',
-        'equipment_help': 'Select equipment the clinic should have',
-        'emergency_care': 'Emergency Care',
-        'inpatient_care': 'Inpatient Care',
-        'wild_animal_care': 'Wild Animal Care',
-        'minimum_rating': 'Minimum rating',
-        'search_btn': 'Search',
-        'clear_btn': 'Clear',
-        'found_clinics': 'Found {count} clinic(s)',
-        'active_filters': 'Active Filters:',
-        'rating_filter': 'Rating',
-        'clinic_locations': 'Clinic Locations',
-        'clinic_details': 'Clinic Details',
-        'no_clinics_found': 'No clinics found matching your criteria',
-        'adjust_filters': 'Try adjusting your search filters or expanding the search radius.',
-        'use_search_filters': 'Use the search filters above and click \'Search\' to find veterinary clinics',
-        'km_away': '{distance:.2f} km away',
-        
-        # Clinic details
-        'contact_info': 'Contact Information',
-        'address': 'Address',
-        'phone': 'Phone',
-        'email': 'Email',
-        'location': 'Location',
-        'coordinates': 'Coordinates',
-        'distance_from_you': 'Distance from you',
-        'services_offered': 'Services Offered',
-        'equipment_available': 'Equipment Available',
-        'lab_tests': 'Laboratory Tests',
-        'not_specified': 'Not specified',
-        'and_more': '...and {count} more',
-        'standard_care': 'Standard Care',
-        
-        # Add clinic page
-        'register_clinic': 'Register New Clinic',
-        'basic_info': 'Basic Information',
-        'clinic_name': 'Clinic Name*',
-        'clinic_name_placeholder': 'e.g., Sofia Pet Care',
-        'address_placeholder': 'e.g., 123 Iveto St, Sofia',
-        'phone_placeholder': 'e.g., +359 2 123 4567',
-        'email_placeholder': 'e.g., info@sofiavetcare.com',
-        'latitude': 'Latitude',
-        'longitude': 'Longitude',
-        'care_types': 'Care Types Available',
-        'services_offered_label': 'Services Offered',
-        'other_services': 'Other Services (comma-separated)',
-        'other_services_placeholder': 'e.g., behavioral training, nutritional counseling',
-        'equipment_available_label': 'Equipment Available',
-        'other_equipment': 'Other Equipment (comma-separated)',
-        'other_equipment_placeholder': 'e.g., ECG machine, anesthesia machine',
-        'lab_tests_label': 'Laboratory Tests Available',
-        'lab_tests_placeholder': 'Blood tests\nUrine analysis\nFecal examination\nBiochemistry panel\nX-ray imaging\nUltrasound diagnostics',
-        
-        # Service name translations
-        'service_cat_hotel': 'Cat Hotel',
-        'service_dog_hotel': 'Dog Hotel',
-        'service_grooming': 'Grooming',
-        'service_deworming': 'Deworming',
-        'service_prophylaxis': 'Prophylaxis',
-        'service_dental_care': 'Dental Care',
-        'service_surgery': 'Surgery',
-        'service_vaccination': 'Vaccination',
-        'service_ophthalmology': 'Ophthalmology',
-        'service_microchipping': 'Microchipping',
-        'service_travel_documents': 'Travel Documents',
-        
-        # Equipment name translations
-        'equipment_xray': 'X-Ray',
-        'equipment_ultrasound': 'Ultrasound',
-        'equipment_incubator': 'Incubator',
-        'equipment_oxygen': 'Oxygen Machine',
-        'register_btn': 'Register Clinic',
-        'clinic_registered': 'Clinic \'{name}\' registered successfully!',
-        'added_items': 'Added {services} services, {equipment} equipment items, and {tests} lab tests.',
-        'fill_required': 'Please fill in all required fields (marked with *)',
-        'registration_error': 'Error registering clinic: {error}',
-        'check_db': 'Please check if the database has the correct structure. Try deleting vet_platform.db and restart the app.',
-        
-        # Review page
-        'add_review_header': 'Add a Review',
-        'select_clinic': 'Select Clinic',
-        'rating': 'Rating',
-        'price_rating': 'Price Rating',
-        'price_rating_help': 'How expensive is this clinic?',
-        'price_cheap': '$ - Affordable',
-        'price_moderate': '$$ - Moderate',
-        'price_expensive': '$$$ - Expensive',
-        'your_review': 'Your review',
-        'review_placeholder': 'Share your experience...',
-        'submit_review': 'Submit Review',
-        'review_submitted': 'Review submitted successfully!',
-        'no_clinics_yet': 'No clinics available yet. Please add a clinic first.',
-        
-        # View all page
-        'all_clinics_header': 'All Registered Clinics',
-        'clinics_list': 'Clinics List',
-        'clinic_name_col': 'Clinic Name',
-        'address_col': 'Address',
-        'phone_col': 'Phone',
-        'rating_col': 'Rating',
-        'care_types_col': 'Care Types Available',
-        'detailed_info': 'Detailed Clinic Information',
-        'select_clinic_details': 'Select a clinic to view details:',
-        'clinic_location': 'Clinic Location',
-        'platform_stats': 'Platform Statistics',
-        'total_clinics': 'Total Clinics',
-        'average_rating': 'Average Rating',
-        'emergency_clinics': 'Emergency Clinics',
-        'inpatient_clinics': 'Inpatient Care',
-        'no_clinics_registered': 'No clinics registered yet. Add your first clinic!',
-        
-        # Backup features
-        'backup_restore': 'Backup & Restore',
-        'download_backup': 'Download Database Backup',
-        'upload_backup': 'Upload Database Backup',
-        'backup_success': 'Database backed up successfully!',
-        'restore_success': 'Database restored successfully!',
-        'restore_error': 'Error restoring database',
-        
-        # About
-        'about': 'About',
-        'about_text': 'Sofia Vet Platform - Find the best veterinary care for your pet. Search clinics by services, location, and ratings.',
-    },
-    'bg': {
-        # Page titles
-        'app_title': 'София Вет Платформа',
-        'app_subtitle': 'Намерете най-добрата ветеринарна клиника за вашия любимец',
-        'navigation': 'Навигация',
-        'search_clinics': 'Търсене на клиники',
-        'add_clinic': 'Добави клиника',
-        'add_review': 'Добави отзив',
-        'view_all_clinics': 'Всички клиники',
-        
-        # AI Recommendations page
-        'ai_recommendations': 'AI Препоръки',
-        'ai_recommendations_header': 'AI препоръки за клиники',
-        'ai_recommendations_subtitle': 'Получете персонализирани препоръки за клиники според вашите нужди',
-        'your_preferences': 'Вашите предпочитания',
-        'match_score': 'Съвпадение',
-        'score_breakdown': 'Разбивка на оценката',
-        'distance_score': 'Оценка за разстояние',
-        'service_match': 'Съвпадение на услуги',
-        'rating_score': 'Оценка на рейтинг',
-        'price_match': 'Ценово съвпадение',
-        'emergency_score': 'Оценка за спешност',
-        'get_recommendations': 'Вземи препоръки',
-        'top_recommendations': 'Топ препоръки за вас',
-        'showing_results': 'Показване на топ {count} резултата',
-        'no_recommendations': 'Не са намерени клиники, отговарящи на критериите. Опитайте да промените предпочитанията си.',
-        'recommendation_for': 'Препоръка #{num}',
-        'overall_match': 'Общо съвпадение',
-        'why_recommended': 'Защо тази клиника?',
-        'max_price_pref': 'Максимално ценово предпочитание',
-        'any_price': 'Всяка цена',
-        
-        # Search page
-        'search_header': 'Търсене на ветеринарни клиники',
-        'your_location': 'Вашето местоположение (по избор)',
-        'location_help': 'Въведете вашето местоположение, за да намерите най-близките клиники и да видите разстоянията',
-        'your_latitude': 'Вашата географскаширина',
-        'your_longitude': 'Вашата географска дължина',
-        'max_distance': 'Макс. разстояние (км)',
-        'search_by_location': 'Търсене по местоположение (намери най-близки клиники)',
-        'search_filters': 'Филтри за търсене',
-        'quick_searches': 'Бързо търсене (Кликнете за автоматично попълване)',
-        'common_searches': 'Често търсени:',
-        'hotels_btn': 'Хотели',
-        'vaccination_btn': 'Ваксинация',
-        'diagnostics_btn': 'Диагностика',
-        'emergency_btn': 'Спешни',
-        'services': 'Услуги',
-        'equipment': 'Оборудване',
-        'available': 'налични',
-        'select_services': 'Изберете услуги (оставете празно за всички)',
-        'select_equipment': 'Изберете оборудване (оставете празно за всички)',
-        'service_help': 'Изберете една или повече услуги, които търсите',
-        'equipment_help': 'Изберете оборудването, което клиниката трябва да има',
-        'emergency_care': 'Спешна помощ',
-        'inpatient_care': 'Болнична грижа',
-        'wild_animal_care': 'Грижа за диви животни',
-        'minimum_rating': 'Минимална оценка',
-        'search_btn': 'Търси',
-        'clear_btn': 'Изчисти',
-        'found_clinics': 'Намерени {count} клиники',
-        'active_filters': 'Активни филтри:',
-        'rating_filter': 'Оценка',
-        'clinic_locations': 'Местоположения на клиники',
-        'clinic_details': 'Детайли за клиниките',
-        'no_clinics_found': 'Не са намерени клиники, отговарящи на критериите',
-        'adjust_filters': 'Опитайте да промените филтрите за търсене или да увеличите радиуса на търсене.',
-        'use_search_filters': 'Използвайте филтрите по-горе и натиснете \'Търси\', за да намерите ветеринарни клиники',
-        'km_away': '{distance:.2f} км разстояние',
-        
-        # Clinic details
-        'contact_info': 'Информация за контакт',
-        'address': 'Адрес',
-        'phone': 'Телефон',
-        'email': 'Имейл',
-        'location': 'Местоположение',
-        'coordinates': 'Координати',
-        'distance_from_you': 'Разстояние от вас',
-        'services_offered': 'Предлагани услуги',
-        'equipment_available': 'Налично оборудване',
-        'lab_tests': 'Лабораторни изследвания',
-        'not_specified': 'Не е посочено',
-        'and_more': '...и още {count}',
-        'standard_care': 'Стандартна грижа',
-        
-        # Add clinic page
-        'register_clinic': 'Регистрирай нова клиника',
-        'basic_info': 'Основна информация',
-        'clinic_name': 'Име на клиниката*',
-        'clinic_name_placeholder': 'напр., София Пет Кеър',
-        'address_placeholder': 'напр., ул. Главна 123, София',
-        'phone_placeholder': 'напр., +359 2 123 4567',
-        'email_placeholder': 'напр., info@sofiavetcare.com',
-        'latitude': 'Географска широчина',
-        'longitude': 'Географска дължина',
-        'care_types': 'Видове грижи',
-        'services_offered_label': 'Предлагани услуги',
-        'other_services': 'Други услуги (разделени със запетая)',
-        'other_services_placeholder': 'напр., поведенческо обучение, хранителни консултации',
-        'equipment_available_label': 'Налично оборудване',
-        'other_equipment': 'Друго оборудване (разделено със запетая)',
-        'other_equipment_placeholder': 'напр., ЕКГ апарат, апарат за анестезия',
-        'lab_tests_label': 'Налични лабораторни изследвания',
-        'lab_tests_placeholder': 'Кръвни изследвания\nУринен анализ\nИзследване на фецес\nБиохимичен панел\nРентгенови снимки\nУлтразвукова диагностика',
-        
-        # Service name translations
-        'service_cat_hotel': 'Котешки хотел',
-        'service_dog_hotel': 'Кучешки хотел',
-        'service_grooming': 'Груминг',
-        'service_deworming': 'Обезпаразитяване',
-        'service_prophylaxis': 'Профилактика',
-        'service_dental_care': 'Дентална грижа',
-        'service_surgery': 'Хирургия',
-        'service_vaccination': 'Ваксинация',
-        'service_ophthalmology': 'Офталмология',
-        'service_microchipping': 'Чипиране',
-        'service_travel_documents': 'Пътни документи',
-        
-        # Equipment name translations
-        'equipment_xray': 'Рентген',
-        'equipment_ultrasound': 'Ултразвук',
-        'equipment_incubator': 'Инкубатор',
-        'equipment_oxygen': 'Кислородна машина',
-        
-        # Additional translations
-        'register_btn': 'Регистрирай клиника',
-        'clinic_registered': 'Клиниката \'{name}\' е регистрирана успешно!',
-        'added_items': 'Добавени {services} услуги, {equipment} единици оборудване и {tests} лабораторни изследвания.',
-        'fill_required': 'Моля, попълнете всички задължителни полета (означени с *)',
-        'registration_error': 'Грешка при регистрация на клиника: {error}',
-        'check_db': 'Моля, проверете дали базата данни има правилната структура. Опитайте да изтриете vet_platform.db и рестартирайте приложението.',
-        
-        # Review page
-        'add_review_header': 'Добави отзив',
-        'select_clinic': 'Изберете клиника',
-        'rating': 'Оценка',
-        'price_rating': 'Ценова категория',
-        'price_rating_help': 'Колко скъпа е тази клиника?',
-        'price_cheap': '$ - Достъпна',
-        'price_moderate': '$$ - Средна',
-        'price_expensive': '$$$ - Скъпа',
-        'your_review': 'Вашият отзив',
-        'review_placeholder': 'Споделете вашия опит...',
-        'submit_review': 'Изпрати отзив',
-        'review_submitted': 'Отзивът е изпратен успешно!',
-        'no_clinics_yet': 'Все още няма налични клиники. Моля, първо добавете клиника.',
-        
-        # View all page
-        'all_clinics_header': 'Всички регистрирани клиники',
-        'clinics_list': 'Списък на клиниките',
-        'clinic_name_col': 'Име на клиниката',
-        'address_col': 'Адрес',
-        'phone_col': 'Телефон',
-        'rating_col': 'Оценка',
-        'care_types_col': 'Налични видове грижи',
-        'detailed_info': 'Подробна информация за клиниката',
-        'select_clinic_details': 'Изберете клиника за детайли:',
-        'clinic_location': 'Местоположение на клиниката',
-        'platform_stats': 'Статистики на платформата',
-        'total_clinics': 'Общо клиники',
-        'average_rating': 'Средна оценка',
-        'emergency_clinics': 'Спешни клиники',
-        'inpatient_clinics': 'Болнична грижа',
-        'no_clinics_registered': 'Все още няма регистрирани клиники. Добавете първата си клиника!',
-        
-        # Backup features
-        'backup_restore': 'Архивиране и възстановяване',
-        'download_backup': 'Изтегли архив на базата данни',
-        'upload_backup': 'Качи архив на базата данни',
-        'backup_success': 'Базата данни е архивирана успешно!',
-        'restore_success': 'Базата данни е възстановена успешно!',
-        'restore_error': 'Грешка при възстановяване на базата данни',
-        
-        # About
-        'about': 'За нас',
-        'about_text': 'София Вет Платформа - Намерете най-добрата ветеринарна грижа за вашия любимец. Търсете клиники по услуги, местоположение и оценки.',
-    }
-}
-
-def t(key, lang=None, **kwargs):
-    """Translation helper function"""
-    if lang is None:
-        lang = st.session_state.get('language', 'en')
-    text = TRANSLATIONS.get(lang, TRANSLATIONS['en']).get(key, key)
-    if kwargs:
-        return text.format(**kwargs)
-    return text
-
-def translate_service_name(english_name, lang):
-    """Translate service name from English to selected language"""
-    # Create a mapping of English names to translation keys
-    service_map = {
-        'Cat Hotel': 'service_cat_hotel',
-        'Dog Hotel': 'service_dog_hotel',
-        'Grooming': 'service_grooming',
-        'Deworming': 'service_deworming',
-        'Prophylaxis': 'service_prophylaxis',
-        'Dental Care': 'service_dental_care',
-        'Surgery': 'service_surgery',
-        'Vaccination': 'service_vaccination',
-        'Ophthalmology': 'service_ophthalmology',
-        'Microchipping': 'service_microchipping',
-        'Travel Documents': 'service_travel_documents',
-    }
-    
-    # Get translation key
-    key = service_map.get(english_name)
-    
-    # Return translated name if found, otherwise return original
-    if key:
-        return t(key, lang)
-    else:
-        return english_name  # Return original if not in map
-
-def translate_equipment_name(english_name, lang):
-    """Translate equipment name from English to selected language"""
-    equipment_map = {
-        'X-Ray': 'equipment_xray',
-        'Ultrasound': 'equipment_ultrasound',
-        'Incubator': 'equipment_incubator',
-        'Oxygen Machine': 'equipment_oxygen',
-    }
-    
-    key = equipment_map.get(english_name)
-    if key:
-        return t(key, lang)
-    else:
-        return english_name
-
 def get_price_rating_display(price_rating):
     """Convert numeric price rating to $ symbols"""
     if price_rating == 1:
@@ -442,6 +39,8 @@ class VetRecommendationEngine:
     
     def calculate_distance(self, lat1, lon1, lat2, lon2):
         """Calculate distance between two points in kilometers"""
+        from geopy.distance import geodesic
+        
         try:
             return geodesic((lat1, lon1), (lat2, lon2)).kilometers
         except:
@@ -615,24 +214,37 @@ class VetRecommendationEngine:
         
         return recommendations[:top_n]
 
-# Database connection
-DB_PATH = "vet_platform.db"
-
-def get_db_connection():
-    """Create a database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def calculate_distance(lat1, lon1, lat2, lon2):
     """Calculate distance between two coordinates in kilometers"""
+    from geopy.distance import geodesic
+    
     try:
         return geodesic((lat1, lon1), (lat2, lon2)).kilometers
     except:
         return None
 
-def create_clinic_map(clinics_df, user_location=None, zoom_start=12):
-    """Create a folium map with clinic markers"""
+# Leaflet marker factory used by FastMarkerCluster: row = [lat, lon, popup, tooltip, color]
+CLINIC_MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'plus', prefix: 'fa', markerColor: row[4]});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 300});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+def create_clinic_map(clinics_df, user_location=None, zoom_start=12, lang='en'):
+    """Create a folium map with clustered clinic markers.
+
+    All clinic markers are shipped to the browser as a single
+    FastMarkerCluster data payload instead of one folium.Marker per clinic,
+    and popups are built with vectorized column operations.
+    """
+    # Imported here so pages without a map do not pay for folium
+    import folium
+    from folium.plugins import FastMarkerCluster
+    
     # Default center (Sofia, Bulgaria)
     center_lat = 42.6977
     center_lon = 23.3219
@@ -654,219 +266,125 @@ def create_clinic_map(clinics_df, user_location=None, zoom_start=12):
     if user_location:
         folium.Marker(
             location=user_location,
-            popup="Your Location",
-            tooltip="You are here",
+            popup=t('your_location_marker', lang),
+            tooltip=t('you_are_here', lang),
             icon=folium.Icon(color='red', icon='home', prefix='fa')
         ).add_to(m)
     
-    # Add clinic markers
-    for _, clinic in clinics_df.iterrows():
-        if pd.notna(clinic['latitude']) and pd.notna(clinic['longitude']):
-            # Create popup content
-            popup_html = f"""
-            <div style="width: 250px;">
-                <h4>{clinic['name']}</h4>
-                <p><b>Rating:</b> ⭐ {clinic['rating']:.1f}</p>
-                <p><b>Address:</b> {clinic['address']}</p>
-                <p><b>Phone:</b> {clinic['phone']}</p>
-            """
-            
-            if 'distance' in clinic and pd.notna(clinic['distance']):
-                popup_html += f"<p><b>Distance:</b> {clinic['distance']:.2f} km</p>"
-            
-            # Add care type badges
-            badges = []
-            if clinic.get('emergency_available', 0):
-                badges.append('🚨 Emergency')
-            if clinic.get('inpatient_care', 0):
-                badges.append('🏨 Inpatient')
-            if clinic.get('wild_animal_care', 0):
-                badges.append('🦊 Wild Animal')
-            
-            if badges:
-                popup_html += f"<p><b>Care Types:</b><br>{'<br>'.join(badges)}</p>"
-            
-            popup_html += "</div>"
-            
-            # Choose marker color based on rating
-            if clinic['rating'] >= 4.5:
-                color = 'green'
-            elif clinic['rating'] >= 3.5:
-                color = 'blue'
-            else:
-                color = 'gray'
-            
-            # Add marker
-            folium.Marker(
-                location=[clinic['latitude'], clinic['longitude']],
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=clinic['name'],
-                icon=folium.Icon(color=color, icon='plus', prefix='fa')
-            ).add_to(m)
+    clinics_df = clinics_df[clinics_df['latitude'].notna() & clinics_df['longitude'].notna()]
+    if len(clinics_df) == 0:
+        return m
+    
+    # Build popup content for all clinics at once
+    rating = clinics_df['rating'].fillna(0).astype(float)
+    popups = (
+        '<div style="width: 250px;"><h4>' + clinics_df['name'].astype(str) + '</h4>'
+        + f"<p><b>{t('rating', lang)}:</b> ⭐ " + rating.map('{:.1f}'.format) + '</p>'
+        + f"<p><b>{t('address', lang)}:</b> " + clinics_df['address'].fillna('').astype(str) + '</p>'
+        + f"<p><b>{t('phone', lang)}:</b> " + clinics_df['phone'].fillna('').astype(str) + '</p>'
+    )
+    
+    if 'distance' in clinics_df:
+        distance = clinics_df['distance']
+        popups += np.where(
+            distance.notna(),
+            f"<p><b>{t('distance_from_you', lang)}:</b> " + distance.fillna(0).map('{:.2f}'.format) + ' km</p>',
+            ''
+        )
+    
+    # Add care type badges
+    badges = pd.Series('', index=clinics_df.index)
+    for column, label in (
+        ('emergency_available', '🚨 ' + t('emergency_care', lang)),
+        ('inpatient_care', '🏨 ' + t('inpatient_care', lang)),
+        ('wild_animal_care', '🦊 ' + t('wild_animal_care', lang)),
+    ):
+        if column in clinics_df:
+            flags = clinics_df[column].fillna(0).astype(bool)
+            badges += np.where(flags & (badges != ''), '<br>', '')
+            badges += np.where(flags, label, '')
+    popups += np.where(badges != '', f"<p><b>{t('care_types', lang)}:</b><br>" + badges + '</p>', '')
+    popups += '</div>'
+    
+    # Choose marker color based on rating
+    colors = np.select([rating >= 4.5, rating >= 3.5], ['green', 'blue'], default='gray')
+    
+    data = pd.DataFrame({
+        'lat': clinics_df['latitude'].astype(float),
+        'lon': clinics_df['longitude'].astype(float),
+        'popup': popups,
+        'tooltip': clinics_df['name'].astype(str),
+        'color': colors,
+    })
+    
+    FastMarkerCluster(
+        data.values.tolist(),
+        callback=CLINIC_MARKER_CALLBACK,
+        disableClusteringAtZoom=15
+    ).add_to(m)
     
     return m
 
-def get_table_columns(table_name):
-    """Get column names for a table"""
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_clinic_map_html(clinic_ids, lang, user_location=None, zoom_start=12, _clinics_df=None):
+    """Render a clinic map to HTML, cached on the result set's clinic ids and language"""
+    clinic_map = create_clinic_map(_clinics_df, user_location=user_location, zoom_start=zoom_start, lang=lang)
+    return clinic_map.get_root().render()
+
+def show_clinic_map(clinics_df, lang, user_location=None, zoom_start=12, height=500):
+    """Display a (cached) clinic map"""
+    import streamlit.components.v1 as components
+    
+    clinic_ids = tuple(clinics_df['id'].tolist())
+    if user_location:
+        user_location = tuple(user_location)
+    html = render_clinic_map_html(clinic_ids, lang, user_location, zoom_start, _clinics_df=clinics_df)
+    components.html(html, height=height)
+
+# Initialize database
+init_db()
+
+@st.cache_resource(show_spinner=False)
+def get_autocomplete_index():
+    """Autocomplete index over the clinic directory, shared by all sessions and updated as clinics are added"""
+    index = AutocompleteIndex()
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [row[1] for row in cursor.fetchall()]
+        index.ensure_loaded(load_autocomplete, conn)
+    finally:
         conn.close()
-        return columns
-    except:
-        return []
+    return index
 
-def init_db():
-    """Initialize database - create tables if they don't exist"""
+def backup_database(incremental=False):
+    """Write a compressed (optionally incremental) backup to a temporary file.
+
+    Returns the file path and the backup manifest.
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create tables (basic structure)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS clinics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            address TEXT,
-            phone TEXT,
-            email TEXT,
-            latitude REAL,
-            longitude REAL,
-            rating REAL DEFAULT 0,
-            emergency_available INTEGER DEFAULT 0,
-            inpatient_care INTEGER DEFAULT 0,
-            wild_animal_care INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS services (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            clinic_id INTEGER,
-            service_name TEXT NOT NULL,
-            price REAL,
-            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS equipment (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            clinic_id INTEGER,
-            equipment_name TEXT NOT NULL,
-            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS lab_tests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            clinic_id INTEGER,
-            test_name TEXT NOT NULL,
-            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reviews (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            clinic_id INTEGER,
-            rating INTEGER,
-            comment TEXT,
-            price_rating INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics (id)
-        )
-    """)
-    
-    # Add new columns to existing clinics table if they don't exist
     try:
-        cursor.execute("ALTER TABLE clinics ADD COLUMN inpatient_care INTEGER DEFAULT 0")
-    except:
-        pass
-    
-    try:
-        cursor.execute("ALTER TABLE clinics ADD COLUMN wild_animal_care INTEGER DEFAULT 0")
-    except:
-        pass
-    
-    # Add price_rating column to existing reviews table if it doesn't exist
-    try:
-        cursor.execute("ALTER TABLE reviews ADD COLUMN price_rating INTEGER")
-    except:
-        pass
-    
-    conn.commit()
-    conn.close()
+        with tempfile.NamedTemporaryFile(suffix='.ndjson.gz', delete=False) as backup_file:
+            manifest = write_backup(conn, backup_file, incremental=incremental)
+    finally:
+        conn.close()
+    return backup_file.name, manifest
 
-# Initialize database
-init_db()
-def backup_database():
-    """Create a backup of the database as JSON"""
+def record_downloaded_backup(manifest):
+    """Make a downloaded backup the parent of the next incremental backup"""
     conn = get_db_connection()
-    
-    # Export all tables
-    backup_data = {
-        'clinics': pd.read_sql_query("SELECT * FROM clinics", conn).to_dict('records'),
-        'services': pd.read_sql_query("SELECT * FROM services", conn).to_dict('records'),
-        'equipment': pd.read_sql_query("SELECT * FROM equipment", conn).to_dict('records'),
-        'lab_tests': pd.read_sql_query("SELECT * FROM lab_tests", conn).to_dict('records'),
-        'reviews': pd.read_sql_query("SELECT * FROM reviews", conn).to_dict('records'),
-        'backup_date': datetime.now().isoformat()
-    }
-    
-    conn.close()
-    return json.dumps(backup_data, indent=2, default=str)
+    try:
+        record_backup(conn, manifest)
+    finally:
+        conn.close()
 
-def restore_database(backup_json):
-    """Restore database from JSON backup"""
+def restore_database(*backup_files):
+    """Restore database from a full backup file plus any incremental backups"""
     try:
-        backup_data = json.loads(backup_json)
-        
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Clear existing data
-        cursor.execute("DELETE FROM reviews")
-        cursor.execute("DELETE FROM lab_tests")
-        cursor.execute("DELETE FROM equipment")
-        cursor.execute("DELETE FROM services")
-        cursor.execute("DELETE FROM clinics")
-        
-        # Restore clinics
-        for clinic in backup_data.get('clinics', []):
-            columns = ', '.join(clinic.keys())
-            placeholders = ', '.join(['?' for _ in clinic])
-            cursor.execute(f"INSERT INTO clinics ({columns}) VALUES ({placeholders})", list(clinic.values()))
-        
-        # Restore services
-        for service in backup_data.get('services', []):
-            columns = ', '.join(service.keys())
-            placeholders = ', '.join(['?' for _ in service])
-            cursor.execute(f"INSERT INTO services ({columns}) VALUES ({placeholders})", list(service.values()))
-        
-        # Restore equipment
-        for equip in backup_data.get('equipment', []):
-            columns = ', '.join(equip.keys())
-            placeholders = ', '.join(['?' for _ in equip])
-            cursor.execute(f"INSERT INTO equipment ({columns}) VALUES ({placeholders})", list(equip.values()))
-        
-        # Restore lab_tests
-        for test in backup_data.get('lab_tests', []):
-            columns = ', '.join(test.keys())
-            placeholders = ', '.join(['?' for _ in test])
-            cursor.execute(f"INSERT INTO lab_tests ({columns}) VALUES ({placeholders})", list(test.values()))
-        
-        # Restore reviews
-        for review in backup_data.get('reviews', []):
-            columns = ', '.join(review.keys())
-            placeholders = ', '.join(['?' for _ in review])
-            cursor.execute(f"INSERT INTO reviews ({columns}) VALUES ({placeholders})", list(review.values()))
-        
-        conn.commit()
-        conn.close()
+        try:
+            restore_clinics(conn, *backup_files)
+        finally:
+            conn.close()
+        get_autocomplete_index.clear()
         return True
     except Exception as e:
         st.error(f"Error restoring database: {e}")
@@ -889,6 +407,14 @@ with col_lang2:
         st.session_state.language = 'bg'
         st.rerun()
 
+# Additional languages loaded from VET_LOCALES_DIR
+for extra_lang in available_languages():
+    if extra_lang in ('en', 'bg'):
+        continue
+    if st.sidebar.button(language_name(extra_lang), use_container_width=True, type="primary" if st.session_state.language == extra_lang else "secondary"):
+        st.session_state.language = extra_lang
+        st.rerun()
+
 st.sidebar.markdown("---")
 
 # Get current language
@@ -935,28 +461,29 @@ if page == t('search_clinics', lang):
     
     st.markdown("---")
     
-    # Get available services and equipment from database for autocomplete
-    conn = get_db_connection()
-    all_services = pd.read_sql_query("""
-        SELECT DISTINCT service_name 
-        FROM services 
-        WHERE service_name IS NOT NULL 
-        ORDER BY service_name
-    """, conn)
-    all_equipment = pd.read_sql_query("""
-        SELECT DISTINCT equipment_name 
-        FROM equipment 
-        WHERE equipment_name IS NOT NULL 
-        ORDER BY equipment_name
-    """, conn)
-    conn.close()
-    
-    service_options = all_services['service_name'].tolist()
-    equipment_options = all_equipment['equipment_name'].tolist()
+    # Available services and equipment for autocomplete
+    autocomplete_index = get_autocomplete_index()
+    service_options = autocomplete_index.values('service')
+    equipment_options = autocomplete_index.values('equipment')
     
     # Search filters
     st.subheader("🔍 Search Filters")
     
+    search_text = st.text_input(t('text_search', lang), placeholder=t('text_search_placeholder', lang), key='search_text')
+    
+    # Typo-tolerant suggestions for the text typed so far
+    if search_text:
+        suggestions = [
+            s['text'] for s in autocomplete_index.suggest(search_text, lang=lang, limit=5)
+            if s['text'].lower() != search_text.strip().lower()
+        ]
+        if suggestions:
+            st.caption(t('did_you_mean', lang))
+            suggestion_cols = st.columns(len(suggestions))
+            for col, suggestion in zip(suggestion_cols, suggestions):
+                col.button(suggestion, key=f"suggestion_{suggestion}", on_click=st.session_state.update,
+                           kwargs={'search_text': suggestion})
+    
     # Quick search shortcuts
     with st.expander(f"⚡ {t('quick_searches', lang)}", expanded=False):
         st.markdown(f"**{t('common_searches', lang)}**")
@@ -991,12 +518,6 @@ if page == t('search_clinics', lang):
             # Create translated options for display
             service_options_translated = [translate_service_name(s, lang) for s in service_options]
             
-            # Create mapping for reverse lookup (translated name -> English name)
-            service_display_to_english = {
-                translate_service_name(s, lang): s 
-                for s in service_options
-            }
-            
             # Use quick search if available (translate defaults)
             default_services_english = [s for s in st.session_state.quick_search_services if s in service_options]
             default_services_translated = [translate_service_name(s, lang) for s in default_services_english]
@@ -1010,7 +531,7 @@ if page == t('search_clinics', lang):
             
             # Convert displayed names back to English for database query
             selected_services = [
-                service_display_to_english[s] 
+                service_from_display(s, lang)
                 for s in selected_services_display
             ]
             
@@ -1027,12 +548,6 @@ if page == t('search_clinics', lang):
             # Create translated options for display
             equipment_options_translated = [translate_equipment_name(e, lang) for e in equipment_options]
             
-            # Create mapping for reverse lookup
-            equipment_display_to_english = {
-                translate_equipment_name(e, lang): e 
-                for e in equipment_options
-            }
-            
             # Use quick search if available (translate defaults)
             default_equipment_english = [e for e in st.session_state.quick_search_equipment if e in equipment_options]
             default_equipment_translated = [translate_equipment_name(e, lang) for e in default_equipment_english]
@@ -1046,7 +561,7 @@ if page == t('search_clinics', lang):
             
             # Convert displayed names back to English for database query
             selected_equipment = [
-                equipment_display_to_english[e] 
+                equipment_from_display(e, lang)
                 for e in selected_equipment_display
             ]
             
@@ -1085,61 +600,16 @@ if page == t('search_clinics', lang):
     if search_clicked:
         conn = get_db_connection()
         
-        # Build query with subqueries for service and equipment filtering
-        query = """
-            SELECT DISTINCT c.*, 
-                   AVG(r.price_rating) as avg_price_rating,
-                   GROUP_CONCAT(DISTINCT s.service_name) as services,
-                   GROUP_CONCAT(DISTINCT e.equipment_name) as equipment,
-                   GROUP_CONCAT(DISTINCT l.test_name) as lab_tests
-            FROM clinics c
-            LEFT JOIN reviews r ON c.id = r.clinic_id
-            LEFT JOIN services s ON c.id = s.clinic_id
-            LEFT JOIN equipment e ON c.id = e.clinic_id
-            LEFT JOIN lab_tests l ON c.id = l.clinic_id
-            WHERE 1=1
-        """
-        params = []
-        
-        # Filter by selected services (clinic must have ALL selected services)
-        if selected_services:
-            service_conditions = []
-            for service in selected_services:
-                service_conditions.append("""
-                    c.id IN (
-                        SELECT clinic_id FROM services WHERE service_name = ?
-                    )
-                """)
-                params.append(service)
-            query += " AND " + " AND ".join(service_conditions)
-        
-        # Filter by selected equipment (clinic must have ALL selected equipment)
-        if selected_equipment:
-            equipment_conditions = []
-            for equip in selected_equipment:
-                equipment_conditions.append("""
-                    c.id IN (
-                        SELECT clinic_id FROM equipment WHERE equipment_name = ?
-                    )
-                """)
-                params.append(equip)
-            query += " AND " + " AND ".join(equipment_conditions)
-        
-        if emergency_only:
-            query += " AND c.emergency_available = 1"
-        
-        if inpatient_only:
-            query += " AND c.inpatient_care = 1"
-        
-        if wild_animal_only:
-            query += " AND c.wild_animal_care = 1"
-        
-        query += " AND c.rating >= ?"
-        params.append(min_rating)
-        
-        query += " GROUP BY c.id"
-        
-        results = pd.read_sql_query(query, conn, params=params)
+        results = search_clinics(
+            conn,
+            services=selected_services,
+            equipment=selected_equipment,
+            emergency_only=emergency_only,
+            inpatient_only=inpatient_only,
+            wild_animal_only=wild_animal_only,
+            min_rating=min_rating,
+            text=search_text
+        )
         conn.close()
         
         # Calculate distances if location search is enabled
@@ -1152,8 +622,8 @@ if page == t('search_clinics', lang):
             results = results[results['distance'] <= max_distance]
             # Sort by distance
             results = results.sort_values('distance')
-        else:
-            # Sort by rating if not using location
+        elif 'text_rank' not in results:
+            # Sort by rating if not using location (text matches keep their relevance order)
             results = results.sort_values('rating', ascending=False)
         
         # Store results in session state
@@ -1170,6 +640,8 @@ if page == t('search_clinics', lang):
             
             # Show active filters
             active_filters = []
+            if search_text:
+                active_filters.append(f"**🔎** {search_text}")
             if selected_services:
                 active_filters.append(f"**Services:** {', '.join(selected_services)}")
             if selected_equipment:
@@ -1190,8 +662,7 @@ if page == t('search_clinics', lang):
             
             # Display map
             st.subheader("🗺️ Clinic Locations")
-            clinic_map = create_clinic_map(results, user_location=user_location)
-            st_folium(clinic_map, width=None, height=500)
+            show_clinic_map(results, lang, user_location=user_location)
             
             st.markdown("---")
             st.subheader("📋 Clinic Details")
@@ -1301,15 +772,9 @@ elif page == t('ai_recommendations', lang):
     with col1:
         st.markdown(f"**{t('services', lang)}**")
         
-        # Get available services
-        conn = get_db_connection()
-        services_df = pd.read_sql_query("SELECT DISTINCT service_name FROM services ORDER BY service_name", conn)
-        conn.close()
-        
-        if len(services_df) > 0:
-            service_list = services_df['service_name'].tolist()
+        service_list = get_autocomplete_index().values('service')
+        if service_list:
             service_options_translated = [translate_service_name(s, lang) for s in service_list]
-            service_display_to_english = {translate_service_name(s, lang): s for s in service_list}
             
             selected_services_display = st.multiselect(
                 t('select_services', lang),
@@ -1317,22 +782,16 @@ elif page == t('ai_recommendations', lang):
                 key='ai_services'
             )
             
-            selected_services = [service_display_to_english[s] for s in selected_services_display]
+            selected_services = [service_from_display(s, lang) for s in selected_services_display]
         else:
             selected_services = []
     
     with col2:
         st.markdown(f"**{t('equipment', lang)}**")
         
-        # Get available equipment
-        conn = get_db_connection()
-        equipment_df = pd.read_sql_query("SELECT DISTINCT equipment_name FROM equipment ORDER BY equipment_name", conn)
-        conn.close()
-        
-        if len(equipment_df) > 0:
-            equipment_list = equipment_df['equipment_name'].tolist()
+        equipment_list = get_autocomplete_index().values('equipment')
+        if equipment_list:
             equipment_options_translated = [translate_equipment_name(e, lang) for e in equipment_list]
-            equipment_display_to_english = {translate_equipment_name(e, lang): e for e in equipment_list}
             
             selected_equipment_display = st.multiselect(
                 t('select_equipment', lang),
@@ -1340,7 +799,7 @@ elif page == t('ai_recommendations', lang):
                 key='ai_equipment'
             )
             
-            selected_equipment = [equipment_display_to_english[e] for e in selected_equipment_display]
+            selected_equipment = [equipment_from_display(e, lang) for e in selected_equipment_display]
         else:
             selected_equipment = []
     
@@ -1405,8 +864,7 @@ elif page == t('ai_recommendations', lang):
                 map_data.append(clinic)
             
             rec_df = pd.DataFrame(map_data)
-            rec_map = create_clinic_map(rec_df, user_location=(user_lat, user_lon), zoom_start=12)
-            st_folium(rec_map, width=None, height=500)
+            show_clinic_map(rec_df, lang, user_location=(user_lat, user_lon), zoom_start=12)
             
             st.markdown("---")
             st.subheader(f"🏆 {t('top_recommendations', lang)}")
@@ -1602,49 +1060,17 @@ elif page == t('add_clinic', lang):
                     inpatient_int = 1 if inpatient else 0
                     wild_animal_int = 1 if wild_animal else 0
                     
-                    # Get available columns
-                    columns = get_table_columns('clinics')
-                    
-                    # Build insert query based on available columns
-                    insert_cols = ['name', 'address']
-                    insert_vals = [name, address]
-                    
-                    if phone and 'phone' in columns:
-                        insert_cols.append('phone')
-                        insert_vals.append(phone)
-                    
-                    if email and 'email' in columns:
-                        insert_cols.append('email')
-                        insert_vals.append(email)
-                    
-                    if 'latitude' in columns:
-                        insert_cols.append('latitude')
-                        insert_vals.append(latitude)
-                    
-                    if 'longitude' in columns:
-                        insert_cols.append('longitude')
-                        insert_vals.append(longitude)
-                    
-                    if 'emergency_available' in columns:
-                        insert_cols.append('emergency_available')
-                        insert_vals.append(emergency_int)
-                    
-                    if 'inpatient_care' in columns:
-                        insert_cols.append('inpatient_care')
-                        insert_vals.append(inpatient_int)
-                    
-                    if 'wild_animal_care' in columns:
-                        insert_cols.append('wild_animal_care')
-                        insert_vals.append(wild_animal_int)
-                    
                     # Insert clinic
-                    placeholders = ', '.join(['?'] * len(insert_vals))
-                    cols_str = ', '.join(insert_cols)
-                    
-                    cursor.execute(f"""
-                        INSERT INTO clinics ({cols_str})
-                        VALUES ({placeholders})
-                    """, tuple(insert_vals))
+                    cursor.execute("""
+                        INSERT INTO clinics (
+                            name, address, phone, email, latitude, longitude,
+                            emergency_available, inpatient_care, wild_animal_care
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        name, address, phone or None, email or None, latitude, longitude,
+                        emergency_int, inpatient_int, wild_animal_int
+                    ))
                     
                     clinic_id = cursor.lastrowid
                 
@@ -1681,6 +1107,16 @@ elif page == t('add_clinic', lang):
                     
                     conn.commit()
                     conn.close()
+                    render_clinic_map_html.clear()
+                    
+                    autocomplete_index = get_autocomplete_index()
+                    autocomplete_index.add('clinic', name)
+                    for service in all_services:
+                        autocomplete_index.add('service', service)
+                    for equip in all_equipment:
+                        autocomplete_index.add('equipment', equip)
+                    for test in (test_list if lab_tests else []):
+                        autocomplete_index.add('lab_test', test)
                     
                     st.success(f"✅ Clinic '{name}' registered successfully!")
                     st.info(f"Added {len(all_services)} services, {len(all_equipment)} equipment items, and {len(test_list) if lab_tests else 0} lab tests.")
@@ -1749,6 +1185,7 @@ elif page == t('add_review', lang):
                 
                 conn.commit()
                 conn.close()
+                render_clinic_map_html.clear()
                 
                 st.success(t('review_submitted', lang))
     else:
@@ -1784,8 +1221,7 @@ elif page == t('view_all_clinics', lang):
         
         # Display map first
         st.subheader(f"🗺️ {t('clinic_locations', lang)}")
-        all_clinics_map = create_clinic_map(clinics, zoom_start=11)
-        st_folium(all_clinics_map, width=None, height=500)
+        show_clinic_map(clinics, lang, zoom_start=11)
         
         st.markdown("---")
         
@@ -1832,8 +1268,7 @@ elif page == t('view_all_clinics', lang):
             if pd.notna(clinic['latitude']) and pd.notna(clinic['longitude']):
                 st.markdown(f"#### 📍 {t('clinic_location', lang)}")
                 clinic_df = pd.DataFrame([clinic])
-                single_clinic_map = create_clinic_map(clinic_df, zoom_start=15)
-                st_folium(single_clinic_map, width=None, height=300)
+                show_clinic_map(clinic_df, lang, zoom_start=15, height=300)
                 st.markdown("---")
             
             col1, col2 = st.columns(2)
@@ -1916,23 +1351,42 @@ elif page == t('backup_restore', lang):
     with col1:
         st.subheader("📥 " + t('download_backup', lang))
         st.markdown("Download a backup of your entire database (all clinics, reviews, etc.)")
-        
-        if st.button("Create Backup", type="primary"):
-            backup_json = backup_database()
-            b64 = base64.b64encode(backup_json.encode()).decode()
-            href = f'<a href="data:application/json;base64,{b64}" download="vet_platform_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json">Click here to download backup</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        st.markdown("An incremental backup only contains changes since the last downloaded backup; keep it together with the full backup it builds on.")
+        
+        col_full, col_delta = st.columns(2)
+        with col_full:
+            full_clicked = st.button("Create Backup", type="primary")
+        with col_delta:
+            incremental_clicked = st.button("Create Incremental Backup")
+        
+        if full_clicked or incremental_clicked:
+            backup_path, manifest = backup_database(incremental=incremental_clicked)
+            kind = "delta" if manifest['kind'] == 'delta' else "full"
+            try:
+                with open(backup_path, 'rb') as backup_file:
+                    st.download_button(
+                        "Click here to download backup",
+                        data=backup_file,
+                        file_name=f"vet_platform_backup_{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson.gz",
+                        mime="application/gzip",
+                        on_click=record_downloaded_backup,
+                        args=(manifest,)
+                    )
+            finally:
+                os.remove(backup_path)
+            if incremental_clicked and manifest['kind'] == 'full':
+                st.info("No previous backup found, so a full backup was created.")
             st.success(t('backup_success', lang))
     
     with col2:
         st.subheader("📤 " + t('upload_backup', lang))
-        st.markdown("Restore your database from a previously downloaded backup file")
+        st.markdown("Restore your database from a previously downloaded full backup, plus any incremental backups taken after it")
         
-        uploaded_file = st.file_uploader("Choose a backup file", type=['json'])
-        if uploaded_file is not None:
+        uploaded_files = st.file_uploader("Choose backup files", type=['gz', 'json'], accept_multiple_files=True)
+        if uploaded_files:
             if st.button("Restore from Backup", type="secondary"):
-                backup_content = uploaded_file.read().decode('utf-8')
-                if restore_database(backup_content):
+                if restore_database(*uploaded_files):
+                    render_clinic_map_html.clear()
                     st.success(t('restore_success', lang))
                     st.rerun()
                 else: